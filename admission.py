@@ -0,0 +1,77 @@
+"""Bounds on how much work one tick may ask of the server.
+
+- Requests with bodies over `max_body` bytes are refused before parsing.
+- Each entity category is capped to its nearest N entities, with the order
+  of the ones kept unchanged.
+- A tick with too many entities before capping, or arriving while recent
+  ticks have run over the latency budget, is handled in overload mode. That
+  mode uses a cheap nearest-target heuristic instead of full scoring.
+
+Every time a limit triggers it is counted, and GET /admission reports the
+counts.
+"""
+
+import os
+from collections import Counter
+
+import numpy as np
+
+CATEGORIES = ("items", "enemies", "players", "hazards")
+
+
+class Admission:
+    def __init__(self, max_body=None, smoothing=0.2):
+        if max_body is None:
+            max_body = int(os.environ.get("MAX_BODY_BYTES", 4_000_000))
+        self.max_body = max_body
+        self.smoothing = smoothing
+        self.latency_ms = 0.0
+        self.counts = Counter()
+
+    def body_allowed(self, size: int) -> bool:
+        if size > self.max_body:
+            self.counts["body_too_large"] += 1
+            return False
+        return True
+
+    def nearest(self, category: str, position: dict, entities: list, cap: int):
+        """The `cap` entities closest to `position`, in their original order."""
+        if len(entities) <= cap:
+            return entities
+        self.counts[f"capped_{category}"] += 1
+        xy = np.array(
+            [(e["position"]["x"], e["position"]["y"]) for e in entities], dtype=float
+        )
+        distances = ((xy - (position["x"], position["y"])) ** 2).sum(axis=1)
+        keep = np.sort(np.argpartition(distances, cap - 1)[:cap]) if cap else []
+        return [entities[i] for i in keep]
+
+    def admit(self, level_data, caps: dict) -> int:
+        """Cap `level_data`'s entity lists in place; returns the uncapped count."""
+        self.counts["ticks"] += 1
+        position = level_data.own_player["position"]
+        total = 0
+        for category in CATEGORIES:
+            entities = getattr(level_data, category)
+            total += len(entities)
+            if category in caps:
+                capped = self.nearest(category, position, entities, caps[category])
+                setattr(level_data, category, capped)
+        return total
+
+    def overloaded(self, entities: int, max_entities: int, latency_ms: float) -> bool:
+        if entities > max_entities:
+            self.counts["overload_entities"] += 1
+            return True
+        # Overload ticks are cheap, so they pull the average back down
+        if self.latency_ms > latency_ms:
+            self.counts["overload_latency"] += 1
+            return True
+        return False
+
+    def observe(self, seconds: float):
+        """Fold a finished tick's latency into the moving average."""
+        self.latency_ms += self.smoothing * (seconds * 1000 - self.latency_ms)
+
+    def report(self) -> dict:
+        return dict(self.counts, latency_ms=self.latency_ms, max_body=self.max_body)
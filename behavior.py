@@ -0,0 +1,96 @@
+"""A small behavior-tree engine compiled to a flat dispatch table.
+
+Trees are built from Sequence / Selector composites over Condition and Action
+leaves, then `compile_tree` flattens them once into a list of
+(kind, name, fn, on_success, on_failure) rows. Running a tick is a loop over
+that table: each row is called and control jumps straight to the next
+relevant row, so failed conditions skip whole branches without walking the
+tree. Condition results are cached on the blackboard for the rest of the tick.
+"""
+
+SUCCESS = -1
+FAILURE = -2
+
+CONDITION = 0
+ACTION = 1
+
+
+class Condition:
+    def __init__(self, name, fn):
+        self.name = name
+        self.fn = fn
+
+
+class Action:
+    """Runs `fn(tick)`; returning None counts as success."""
+
+    def __init__(self, name, fn):
+        self.name = name
+        self.fn = fn
+
+
+class Sequence:
+    def __init__(self, *children):
+        self.children = children
+
+
+class Selector:
+    def __init__(self, *children):
+        self.children = children
+
+
+class Blackboard:
+    """Per-tick state shared by the nodes, plus a cache for conditions."""
+
+    def __init__(self, **values):
+        self.__dict__.update(values)
+        self.cache = {}
+
+    def value(self, name, fn):
+        if name not in self.cache:
+            self.cache[name] = fn(self)
+        return self.cache[name]
+
+
+def compile_tree(root) -> tuple:
+    """Flatten a tree into (table, entry)."""
+    table = []
+
+    def emit(node, on_success, on_failure):
+        if isinstance(node, (Condition, Action)):
+            kind = CONDITION if isinstance(node, Condition) else ACTION
+            table.append((kind, node.name, node.fn, on_success, on_failure))
+            return len(table) - 1
+        if isinstance(node, Sequence):
+            entry = on_success
+            for child in reversed(node.children):
+                entry = emit(child, entry, on_failure)
+            return entry
+        if isinstance(node, Selector):
+            entry = on_failure
+            for child in reversed(node.children):
+                entry = emit(child, on_success, entry)
+            return entry
+        raise TypeError(f"not a behavior tree node: {node!r}")
+
+    entry = emit(root, SUCCESS, FAILURE)
+    return tuple(table), entry
+
+
+def run(compiled: tuple, tick: Blackboard, visited: list = None) -> bool:
+    """Run one tick; names of passed conditions and actions that ran are
+    appended to `visited` if given."""
+    table, pc = compiled
+    cache = tick.cache
+    while pc >= 0:
+        kind, name, fn, on_success, on_failure = table[pc]
+        if kind == CONDITION:
+            if name not in cache:
+                cache[name] = bool(fn(tick))
+            result = cache[name]
+        else:
+            result = fn(tick) is not False
+        if visited is not None and result:
+            visited.append(name)
+        pc = on_success if result else on_failure
+    return pc == SUCCESS
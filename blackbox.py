@@ -0,0 +1,161 @@
+"""A flight recorder for the ticks leading up to a death.
+
+Each bot keeps a preallocated ring of the last `capacity` ticks. A tick is
+stored as one fixed-size record (our own state and the moves we sent) plus up
+to `max_entities` of the nearest entities as compact binary rows. Recording
+only writes into existing arrays, so it costs no allocations and no I/O. On
+death the ring is copied out in order and written to an .npz file on a
+background thread, and play() does not wait for the write.
+
+> python blackbox.py /tmp/deaths/<bot>-<timestamp>.npz
+
+prints a dump back as a table.
+"""
+
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+KINDS = (
+    "",
+    "coin",
+    "big_potion",
+    "speed_zapper",
+    "ring",
+    "chest",
+    "power_up",
+    "wolf",
+    "ghoul",
+    "tiny",
+    "minotaur",
+    "player",
+    "bomb",
+    "icicle",
+)
+KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+
+TICK = np.dtype(
+    [
+        ("time", "f8"),
+        ("x", "f4"),
+        ("y", "f4"),
+        ("health", "f4"),
+        ("potions", "u1"),
+        ("entities", "u2"),
+        ("moves", "S512"),
+    ]
+)
+ENTITY = np.dtype(
+    [
+        ("kind", "u1"),
+        ("x", "f4"),
+        ("y", "f4"),
+        ("distance", "f4"),
+        ("health", "f4"),
+        ("attack_damage", "f4"),
+        ("xp", "f4"),
+    ]
+)
+
+# One writer is enough: dumps only happen on death
+WRITER = ThreadPoolExecutor(max_workers=1)
+
+
+class BlackBox:
+    def __init__(self, capacity=64, max_entities=96):
+        self.capacity = capacity
+        self.max_entities = max_entities
+        self.ticks = np.zeros(capacity, dtype=TICK)
+        self.entities = np.zeros((capacity, max_entities), dtype=ENTITY)
+        self.head = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def record(self, own_player: dict, entities: list):
+        """Store a tick's world in the next slot, overwriting the oldest."""
+        slot = self.head
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+        if len(entities) > self.max_entities:
+            entities = sorted(entities, key=lambda e: e.get("distance", 0))
+            entities = entities[: self.max_entities]
+
+        tick = self.ticks[slot]
+        tick["time"] = time.time()
+        tick["x"] = own_player["position"]["x"]
+        tick["y"] = own_player["position"]["y"]
+        tick["health"] = own_player["health"]
+        tick["potions"] = len(own_player["items"]["big_potions"])
+        tick["entities"] = len(entities)
+        tick["moves"] = b""
+
+        rows = self.entities[slot]
+        for i, entity in enumerate(entities):
+            rows[i] = (
+                KIND_CODES.get(entity.get("type"), 0),
+                entity["position"]["x"],
+                entity["position"]["y"],
+                entity.get("distance", 0),
+                entity.get("health") or 0,
+                entity.get("attack_damage") or 0,
+                entity.get("xp") or 0,
+            )
+
+    def decided(self, moves: list) -> list:
+        """Attach the moves sent back to the latest recorded tick."""
+        if self.count:
+            encoded = json.dumps(moves, separators=(",", ":"), default=float)
+            limit = TICK["moves"].itemsize
+            self.ticks[self.head - 1]["moves"] = encoded.encode()[:limit]
+        return moves
+
+    def ordered(self) -> tuple:
+        """Copies of the recorded ticks and entities, oldest first."""
+        order = (np.arange(self.count) + self.head - self.count) % self.capacity
+        return self.ticks[order], self.entities[order]
+
+    def dump(self, path: str):
+        """Write the ring to `path` in the background and start a new one.
+
+        Returns the write's Future.
+        """
+        ticks, entities = self.ordered()
+        self.head = 0
+        self.count = 0
+        return WRITER.submit(write, path, ticks, entities)
+
+
+def write(path: str, ticks: np.ndarray, entities: np.ndarray):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    np.savez_compressed(path, ticks=ticks, entities=entities)
+
+
+def load(path: str) -> tuple:
+    with np.load(path) as data:
+        return data["ticks"], data["entities"]
+
+
+def frame(ticks: np.ndarray, entities: np.ndarray) -> pd.DataFrame:
+    """One row per recorded entity, next to its tick's own state and moves."""
+    frames = []
+    for i, tick in enumerate(ticks):
+        df = pd.DataFrame(entities[i, : tick["entities"]])
+        df["kind"] = [KINDS[code] for code in df["kind"]]
+        df.insert(0, "tick", i - len(ticks) + 1)
+        df["own_health"] = tick["health"]
+        df["moves"] = tick["moves"].decode()
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+if __name__ == "__main__":
+    with pd.option_context("display.max_rows", None, "display.width", 200):
+        print(frame(*load(sys.argv[1])))
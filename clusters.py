@@ -0,0 +1,73 @@
+"""Per-tick grouping of items into clumps.
+
+Two items belong to the same cluster when a chain of items links them, with
+each link shorter than the neighbour radius. Items are bucketed into grid
+cells one radius wide, so each one is only compared with its own and
+adjacent cells and the whole pass is about linear in the number of items.
+"""
+
+import numpy as np
+
+# Half of the 3x3 neighbourhood; the other half is covered from the other side
+FORWARD = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+
+
+class Cluster:
+    def __init__(self, members: list, xy: np.ndarray, xp: float):
+        self.members = members
+        self.xp = xp
+        self.centroid = xy.mean(axis=0)
+        # Squared distance of each member from the centroid
+        self.offsets = ((xy - self.centroid) ** 2).sum(axis=1)
+
+    def __len__(self):
+        return len(self.members)
+
+    def spread(self, exponent: float) -> float:
+        """Travel effort, before speed, to visit every member from the middle."""
+        return float((self.offsets**exponent).sum())
+
+
+def connected_components(xy: np.ndarray, radius: float) -> np.ndarray:
+    """Component label per point, linking points closer than squared `radius`."""
+    parent = np.arange(len(xy))
+
+    def find(i):
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+
+    cell_size = radius**0.5
+    cells = {}
+    for i, cell in enumerate(map(tuple, np.floor(xy / cell_size).astype(int))):
+        cells.setdefault(cell, []).append(i)
+
+    for (cx, cy), here in cells.items():
+        for dx, dy in FORWARD:
+            there = cells.get((cx + dx, cy + dy))
+            if there is None:
+                continue
+            d2 = ((xy[here][:, None, :] - xy[there][None, :, :]) ** 2).sum(axis=2)
+            for a, b in zip(*np.nonzero(d2 < radius)):
+                ra, rb = find(here[a]), find(there[b])
+                if ra != rb:
+                    parent[rb] = ra
+
+    return np.array([find(i) for i in range(len(xy))], dtype=int)
+
+
+def find_clusters(items: list, radius: float) -> list:
+    if not items:
+        return []
+    xy = np.array([(i["position"]["x"], i["position"]["y"]) for i in items], float)
+    xp = np.array([i["xp"] for i in items], dtype=float)
+    labels = connected_components(xy, radius)
+    order = np.argsort(labels, kind="stable")
+    starts = np.flatnonzero(np.diff(labels[order], prepend=-1))
+    clusters = []
+    for members in np.split(order, starts[1:]):
+        clusters.append(Cluster(members.tolist(), xy[members], xp[members].sum()))
+    return clusters
@@ -0,0 +1,118 @@
+"""Hot-reloadable, versioned Params for a running server.
+
+New values come from a JSON file of Params overrides, which is polled for
+changes, or from the admin endpoint. Each change is validated and then
+prepared on a background thread: `Params` is built and every registered
+derived table is precomputed. The result is queued as the next version.
+Request handlers call `take` at the start of a tick, so a new version is
+swapped in between ticks with one reference assignment. A tick never sees
+half a config, and no request waits for a rebuild.
+"""
+
+import json
+import os
+import threading
+
+from params import Params
+
+
+class Config:
+    def __init__(self, path=None, params=None, poll=1.0):
+        self.path = path
+        self.poll = poll
+        self.version = 0
+        self.active = 0
+        self.params = params or Params()
+        self.tables = {}
+        self.pending = None
+        self.error = None
+        self.lock = threading.Lock()
+        self.mtime = None
+        self.watcher = None
+
+    def register(self, name: str, build):
+        """Precompute `params.derived(name, build)` before every swap."""
+        self.tables[name] = build
+
+    def submit(self, overrides: dict, wait=False):
+        """Validate `overrides` now and prepare them in the background.
+
+        Raises KeyError for unknown names. Returns the preparing thread.
+        """
+        params = Params(**overrides)
+        with self.lock:
+            self.version += 1
+            version = self.version
+        thread = threading.Thread(
+            target=self._prepare, args=(version, params), daemon=True
+        )
+        thread.start()
+        if wait:
+            thread.join()
+        return thread
+
+    def _prepare(self, version: int, params: Params):
+        try:
+            for name, build in self.tables.items():
+                params.derived(name, build)
+        except Exception as e:
+            self.error = f"version {version}: {type(e).__name__}: {e}"
+            return
+        with self.lock:
+            # A later submission may have finished first
+            newest = self.pending[0] if self.pending else self.active
+            if version > newest:
+                self.pending = (version, params)
+                self.error = None
+
+    def take(self):
+        """The newly prepared Params if there are any, else None."""
+        if self.pending is None:
+            return None
+        with self.lock:
+            version, params = self.pending
+            self.pending = None
+            self.params = params
+            self.active = version
+        return params
+
+    def status(self) -> dict:
+        return {
+            "version": self.active,
+            "pending": self.pending[0] if self.pending else None,
+            "digest": self.params.digest(),
+            "path": self.path,
+            "error": self.error,
+            "values": self.params.as_dict(),
+        }
+
+    def reload(self, wait=False) -> bool:
+        """Submit the file's overrides if it changed since the last load."""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return False
+        if mtime == self.mtime:
+            return False
+        self.mtime = mtime
+        try:
+            with open(self.path) as fp:
+                overrides = json.load(fp)
+            self.submit(overrides, wait=wait)
+        except (ValueError, KeyError, TypeError) as e:
+            self.error = f"{self.path}: {type(e).__name__}: {e}"
+            return False
+        return True
+
+    def watch(self):
+        """Poll the file every `poll` seconds on a daemon thread."""
+        stop = threading.Event()
+
+        def loop():
+            while not stop.wait(self.poll):
+                self.reload()
+
+        self.reload()
+        self.watcher = threading.Thread(target=loop, daemon=True)
+        self.watcher.start()
+        return stop
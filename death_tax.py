@@ -0,0 +1,216 @@
+"""Death tax: odds of dying x the cost of losing that time.
+
+The live bot counts how many ticks it spends in each situation (nearby threat
+mix, health fraction, potion count) and appends those counts to
+/tmp/situations.log: on death with the ticks just before it marked, and with no
+deaths when a life ends some other way (the match ends or restarts) or every
+`FLUSH_TICKS` ticks, so surviving lives count toward the odds too. Running this
+module offline fits the probability of dying within `HORIZON` ticks for every
+situation and exports it as a small lookup table:
+
+> python death_tax.py [situations.log] [death_tax.npz]
+
+`get_best_item` loads the table at startup and discounts each candidate by
+odds * (xp/s * DEATH_SECONDS) with a single array lookup.
+"""
+
+import io
+import os
+import sys
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+HORIZON = 10
+DEATH_SECONDS = 5
+CELL_SIZE = 283  # ~sqrt(80000), the peripheral danger radius
+THREAT_BINS = np.array([0.25, 0.5, 1.0, 2.0])
+HEALTH_BINS = np.array([0.2, 0.4, 0.6, 0.8])
+MAX_POTIONS = 3
+SHAPE = (len(THREAT_BINS) + 1, 2, len(HEALTH_BINS) + 1, MAX_POTIONS + 1)
+COLUMNS = ["threat", "players", "health", "potions"]
+FLUSH_TICKS = 600
+
+LOG_PATH = "/tmp/situations.log"
+TABLE_PATH = os.environ.get(
+    "DEATH_TAX_TABLE", os.path.join(os.path.dirname(__file__), "death_tax.npz")
+)
+
+
+class DangerGrid:
+    """Attack damage of the tick's threats summed into coarse grid cells."""
+
+    def __init__(self, threats: list, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        for threat in threats:
+            cell = self.cell(threat["position"])
+            damage, players = self.cells.get(cell, (0, False))
+            self.cells[cell] = (
+                damage + threat.get("attack_damage", 0),
+                players or threat.get("type") == "player",
+            )
+
+    def cell(self, position: dict) -> tuple:
+        return (
+            int(position["x"] // self.cell_size),
+            int(position["y"] // self.cell_size),
+        )
+
+    def lookup(self, position: dict) -> tuple:
+        cx, cy = self.cell(position)
+        damage = 0
+        players = False
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                cell = self.cells.get((cx + dx, cy + dy))
+                if cell:
+                    damage += cell[0]
+                    players = players or cell[1]
+        return damage, players
+
+
+def situation(own_player: dict, damage: float, players: bool) -> tuple:
+    total_health = (
+        own_player["health"]
+        + len(own_player["items"]["big_potions"]) * own_player["max_health"]
+    )
+    threat = np.searchsorted(THREAT_BINS, damage / max(total_health, 1), "right")
+    health = np.searchsorted(
+        HEALTH_BINS, own_player["health"] / own_player["max_health"], "right"
+    )
+    potions = min(len(own_player["items"]["big_potions"]), MAX_POTIONS)
+    return int(threat), int(players), int(health), potions
+
+
+class DeathTax:
+    def __init__(self, table=None):
+        self.table = np.zeros(SHAPE) if table is None else table
+
+    @classmethod
+    def load(cls, path=TABLE_PATH):
+        if not os.path.exists(path):
+            return cls()
+        with np.load(path) as data:
+            return cls(data["odds"])
+
+    def odds(self, own_player: dict, danger: DangerGrid, position: dict) -> float:
+        damage, players = danger.lookup(position)
+        return float(self.table[situation(own_player, damage, players)])
+
+    def factor(self, own_player: dict, danger: DangerGrid, position: dict) -> float:
+        """Share of a candidate's XP rate left after paying the death tax."""
+        odds = self.odds(own_player, danger, position)
+        return 1 - min(1.0, odds * DEATH_SECONDS)
+
+
+class SituationLog:
+    """Per-life tick counts by situation, with the lead-up to a death marked."""
+
+    def __init__(self, flush_every=FLUSH_TICKS, restart_after=5):
+        self.ticks = np.zeros(SHAPE, dtype=np.int64)
+        self.recent = deque(maxlen=HORIZON)
+        self.flush_every = flush_every
+        self.restart_after = restart_after
+        self.pending = 0
+        self.match = None
+        self.clock = None
+
+    def record(self, own_player: dict, danger: DangerGrid):
+        index = situation(own_player, *danger.lookup(own_player["position"]))
+        self.ticks[index] += 1
+        self.recent.append(index)
+        self.pending += 1
+
+    def same_life(self, match, clock) -> bool:
+        """Whether a tick of `match` at `clock` continues the life being counted.
+
+        A different match, or a clock more than `restart_after` seconds behind
+        the last one seen, means the previous life ended without a death.
+        """
+        held_match, held_clock = self.match, self.clock
+        self.match, self.clock = match, clock
+        if held_match is not None and match != held_match:
+            return False
+        if held_clock is not None and clock is not None:
+            return clock <= held_clock + self.restart_after
+        return True
+
+    def due(self) -> bool:
+        return self.pending >= self.flush_every
+
+    def rows(self, died=True) -> pd.DataFrame:
+        deaths = np.zeros(SHAPE, dtype=np.int64)
+        if died:
+            for index in self.recent:
+                deaths[index] += 1
+        # The lead-up to a death may have been counted in an earlier flush
+        seen = np.argwhere((self.ticks > 0) | (deaths > 0))
+        df = pd.DataFrame(seen, columns=COLUMNS)
+        df["ticks"] = self.ticks[tuple(seen.T)]
+        df["deaths"] = deaths[tuple(seen.T)]
+        return df
+
+    def flush(self, path: str, timestamp, died=False):
+        """Append the counts so far to `path` as one block and zero them.
+
+        The recent ticks are kept, so a death after a flush still marks them.
+        """
+        df = self.rows(died)
+        if not df.empty:
+            df["timestamp"] = timestamp
+            with open(path, "a") as f:
+                f.write(df.to_csv(index=False))
+        self.ticks[:] = 0
+        self.pending = 0
+
+    def reset(self):
+        self.ticks[:] = 0
+        self.recent.clear()
+        self.pending = 0
+
+
+def read_log(path: str) -> pd.DataFrame:
+    """Read a death log made of CSV blocks that each start with a header."""
+    with open(path) as fp:
+        lines = fp.readlines()
+
+    blocks = []
+    block = []
+    for line in lines:
+        if line.rstrip("\n").split(",")[-1] == "timestamp" and block:
+            blocks.append(block)
+            block = []
+        block.append(line)
+    if block:
+        blocks.append(block)
+
+    frames = [pd.read_csv(io.StringIO("".join(block))) for block in blocks]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def fit(df: pd.DataFrame, prior_strength=20) -> np.ndarray:
+    ticks = np.zeros(SHAPE)
+    deaths = np.zeros(SHAPE)
+    if not df.empty:
+        grouped = df.groupby(COLUMNS)[["ticks", "deaths"]].sum()
+        index = tuple(np.array(grouped.index.tolist()).T)
+        ticks[index] = grouped["ticks"].to_numpy()
+        deaths[index] = grouped["deaths"].to_numpy()
+
+    # Shrink sparse situations toward the overall rate
+    base_rate = deaths.sum() / max(ticks.sum(), 1)
+    return (deaths + prior_strength * base_rate) / (ticks + prior_strength)
+
+
+def main(argv: list):
+    log_path = argv[1] if len(argv) > 1 else LOG_PATH
+    table_path = argv[2] if len(argv) > 2 else TABLE_PATH
+    odds = fit(read_log(log_path))
+    np.savez_compressed(table_path, odds=odds.astype(np.float32))
+    print(f"wrote {table_path}: {odds.size} situations")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
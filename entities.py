@@ -0,0 +1,55 @@
+"""Read-only views over the parsed entity dicts.
+
+Scoring and avoidance hand back `evolve(entity, ...)` instead of writing to
+the dicts they were given, so the parsed world state stays untouched and can
+be cached or shared between bots. A view keeps a reference to its base dict
+plus its own changes; nothing is copied.
+"""
+
+from collections.abc import Mapping
+
+
+class EntityView(Mapping):
+    __slots__ = ("_base", "_changes")
+
+    def __init__(self, base: Mapping, changes: dict = None):
+        if isinstance(base, EntityView):
+            changes = {**base._changes, **(changes or {})}
+            base = base._base
+        self._base = base
+        self._changes = changes or {}
+
+    def __getitem__(self, key):
+        if key in self._changes:
+            value = self._changes[key]
+        else:
+            value = self._base[key]
+        if isinstance(value, dict):
+            return EntityView(value)
+        return value
+
+    def __iter__(self):
+        yield from self._changes
+        for key in self._base:
+            if key not in self._changes:
+                yield key
+
+    def __len__(self):
+        return len(self._base.keys() | self._changes.keys())
+
+    def __repr__(self):
+        return f"EntityView({dict(self)})"
+
+    def evolve(self, **changes) -> "EntityView":
+        return EntityView(self, changes)
+
+    def to_dict(self) -> dict:
+        return {
+            key: value.to_dict() if isinstance(value, EntityView) else value
+            for key, value in self.items()
+        }
+
+
+def evolve(entity: Mapping, **changes) -> EntityView:
+    """A view of `entity` with some keys replaced."""
+    return EntityView(entity, changes)
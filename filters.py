@@ -0,0 +1,231 @@
+"""Candidate filters run as a vectorized pipeline, cheapest rejection first.
+
+Each filter takes the surviving slice of the candidate batch and returns a
+boolean "reject" mask. The pipeline keeps per-filter timing and rejection
+counts and periodically re-orders the filters by expected cost per rejected
+candidate (seconds per candidate / rejection rate), so the cheap and
+selective ones thin the batch before the expensive ones see it.
+"""
+
+import time
+
+import numpy as np
+
+from tracking import threat_position
+
+COLUMNS = ("types", "xy", "health", "attack_damage", "distance", "power", "special")
+
+
+class CandidateBatch:
+    """Column arrays over the tick's candidates, built once per tick."""
+
+    def __init__(self, candidates: list):
+        n = len(candidates)
+        self.types = np.array([c["type"] for c in candidates], dtype=object)
+        self.xy = np.empty((n, 2))
+        self.health = np.full(n, np.nan)
+        self.attack_damage = np.full(n, np.nan)
+        self.distance = np.empty(n)
+        self.power = np.array([c.get("power") for c in candidates], dtype=object)
+        self.special = np.array(
+            [c.get("special_equipped") for c in candidates], dtype=object
+        )
+        for i, c in enumerate(candidates):
+            self.xy[i] = c["position"]["x"], c["position"]["y"]
+            if c.get("health") is not None:
+                self.health[i] = c["health"]
+            if c.get("attack_damage") is not None:
+                self.attack_damage[i] = c["attack_damage"]
+            self.distance[i] = c["distance"]
+        self.index = np.arange(n)
+
+    def __len__(self):
+        return len(self.index)
+
+    def take(self, keep: np.ndarray) -> "CandidateBatch":
+        batch = CandidateBatch.__new__(CandidateBatch)
+        for name in COLUMNS:
+            setattr(batch, name, getattr(self, name)[keep])
+        batch.index = self.index[keep]
+        return batch
+
+
+class FilterContext:
+    def __init__(
+        self, own_player, enemies, players, hazards, game_info, radii=(80000, 60000)
+    ):
+        self.own_player = own_player
+        self.enemies = enemies
+        self.players = players
+        self.hazards = hazards
+        self.game_info = game_info
+        # Squared danger radius of enemies and players, and of hazards
+        self.radii = radii
+        self._threats = None
+
+    def threats(self):
+        """Predicted threat positions, damage and squared danger radius."""
+        if self._threats is None:
+            threat_radius, hazard_radius = self.radii
+            rows = [
+                (*self._xy(t), t["attack_damage"], threat_radius)
+                for t in self.enemies + self.players
+            ]
+            rows += [
+                (*self._xy(h), h["attack_damage"], hazard_radius) for h in self.hazards
+            ]
+            self._threats = np.array(rows, dtype=float).reshape(-1, 4)
+        return self._threats
+
+    def _xy(self, threat):
+        position = threat_position(threat, True)
+        return position["x"], position["y"]
+
+
+def dead(batch, ctx):
+    return batch.health <= 0
+
+
+def losing_battle(batch, ctx):
+    with np.errstate(invalid="ignore"):
+        return batch.attack_damage * 1.2 > ctx.own_player["health"]
+
+
+def stock_full(batch, ctx):
+    items = ctx.own_player["items"]
+    return (
+        ((batch.types == "ring") & (len(items["rings"]) >= 2))
+        | ((batch.types == "speed_zapper") & (len(items["speed_zappers"]) >= 2))
+        | ((batch.types == "big_potion") & (len(items["big_potions"]) >= 5))
+    )
+
+
+def player_unprepared(batch, ctx):
+    own_player = ctx.own_player
+    if len(own_player["items"]["big_potions"]) == 0 and own_player["health"] < 85:
+        return batch.types != "big_potion"
+    if own_player["special_equipped"]:
+        pickup = np.isin(batch.types, ["chest", "power_up"])
+        if own_player["special_equipped"] != "bomb":
+            return (batch.power == "shockwave") & ~pickup
+        return batch.power == "shockwave"
+    return np.zeros(len(batch), dtype=bool)
+
+
+def time_remaining(batch, ctx):
+    remaining = ctx.game_info.get("time_remaining_s")
+    if remaining is None:
+        return np.zeros(len(batch), dtype=bool)
+    fighter = ~np.isnan(batch.attack_damage)
+    with np.errstate(invalid="ignore"):
+        # Early on, leave the big fights for later
+        early = (
+            (remaining > 1680)
+            & np.isin(batch.types, ["minotaur", "player"])
+            & (batch.health > ctx.own_player["attack_damage"] * 3)
+        )
+    # Late in the game, don't chase far-away fights
+    late = (remaining < 1020) & (batch.types != "minotaur") & (batch.distance > 240000)
+    return fighter & (early | late)
+
+
+def freeze_risk(batch, ctx):
+    if len(ctx.own_player["items"]["big_potions"]):
+        return np.zeros(len(batch), dtype=bool)
+    with np.errstate(invalid="ignore"):
+        return (batch.special == "freeze") & (
+            batch.health > ctx.own_player["attack_damage"] * 3
+        )
+
+
+def peripheral_danger(batch, ctx):
+    threats = ctx.threats()
+    own_player = ctx.own_player
+    total_health = (
+        own_player["health"]
+        + len(own_player["items"]["big_potions"]) * own_player["max_health"]
+    )
+    if not len(threats) or not len(batch):
+        return np.zeros(len(batch), dtype=bool)
+    d2 = ((batch.xy[:, None, :] - threats[None, :, :2]) ** 2).sum(axis=2)
+    danger = ((d2 < threats[None, :, 3]) * threats[None, :, 2]).sum(axis=1)
+    return danger > total_health
+
+
+ALL_FILTERS = [
+    dead,
+    stock_full,
+    player_unprepared,
+    losing_battle,
+    time_remaining,
+    freeze_risk,
+    peripheral_danger,
+]
+
+
+class FilterPipeline:
+    def __init__(self, filters=None, reorder_every=50):
+        self.filters = list(ALL_FILTERS if filters is None else filters)
+        self.reorder_every = reorder_every
+        self.runs = 0
+        self.stats = {
+            f.__name__: {"calls": 0, "evaluated": 0, "rejected": 0, "seconds": 0.0}
+            for f in self.filters
+        }
+
+    def apply(self, candidates: list, ctx: FilterContext, enabled=None) -> np.ndarray:
+        """Boolean mask over `candidates` of the ones every filter allows.
+
+        `enabled` limits the run to the named filters.
+        """
+        allowed = np.zeros(len(candidates), dtype=bool)
+        batch = CandidateBatch(candidates)
+        for f in self.filters:
+            if not len(batch):
+                break
+            if enabled is not None and f.__name__ not in enabled:
+                continue
+            start = time.perf_counter()
+            reject = np.asarray(f(batch, ctx), dtype=bool)
+            stats = self.stats[f.__name__]
+            stats["seconds"] += time.perf_counter() - start
+            stats["calls"] += 1
+            stats["evaluated"] += len(batch)
+            stats["rejected"] += int(reject.sum())
+            if reject.any():
+                batch = batch.take(~reject)
+        allowed[batch.index] = True
+
+        self.runs += 1
+        if self.runs % self.reorder_every == 0:
+            self.reorder()
+        return allowed
+
+    def cost(self, name: str) -> float:
+        """Expected seconds spent per candidate rejected."""
+        stats = self.stats[name]
+        if not stats["evaluated"]:
+            return 0.0
+        per_candidate = stats["seconds"] / stats["evaluated"]
+        rejection_rate = stats["rejected"] / stats["evaluated"]
+        return per_candidate / max(rejection_rate, 1e-6)
+
+    def reorder(self):
+        self.filters.sort(key=lambda f: self.cost(f.__name__))
+
+    def report(self) -> list:
+        report = []
+        for f in self.filters:
+            stats = self.stats[f.__name__]
+            evaluated = max(stats["evaluated"], 1)
+            report.append(
+                {
+                    "filter": f.__name__,
+                    "calls": stats["calls"],
+                    "evaluated": stats["evaluated"],
+                    "rejected": stats["rejected"],
+                    "rejection_rate": stats["rejected"] / evaluated,
+                    "us_per_candidate": stats["seconds"] / evaluated * 1e6,
+                }
+            )
+        return report
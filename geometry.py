@@ -0,0 +1,74 @@
+"""Batched geometry between us, the target and every nearby threat.
+
+`assess` does one NumPy pass over all threat positions and returns the
+pieces avoidance decisions are built from: offsets, squared distances and
+angles to each threat, whether it sits between us and the target, whether
+it sits behind us, and the combined directions to step aside or run away.
+No slopes are divided, so threats level with us or straight above us are
+handled like any other.
+"""
+
+import numpy as np
+
+
+def xy(position) -> np.ndarray:
+    return np.array([position["x"], position["y"]], dtype=float)
+
+
+def positions(entities: list) -> np.ndarray:
+    return np.array(
+        [(e["position"]["x"], e["position"]["y"]) for e in entities], dtype=float
+    ).reshape(-1, 2)
+
+
+def unit(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def cross(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0]
+
+
+class Geometry:
+    def __init__(self, origin: np.ndarray, target: np.ndarray, points: np.ndarray):
+        self.origin = origin
+        self.target = target
+        self.to_target = target - origin
+        self.offsets = points - origin
+        self.d2 = (self.offsets**2).sum(axis=1)
+        self.angles = np.arctan2(self.offsets[:, 1], self.offsets[:, 0])
+
+        # Strictly inside the box spanned by us and the target, on both axes
+        beyond = target - points
+        self.between = ((self.offsets * beyond) > 0).all(axis=1)
+        # Strictly in the quadrant opposite the target, on both axes
+        self.behind = ((self.offsets * self.to_target) < 0).all(axis=1)
+        # > 0 when the threat is counter-clockwise of the line to the target
+        self.side = cross(self.to_target, self.offsets)
+
+    def weights(self, mask=None) -> np.ndarray:
+        weights = np.divide(
+            1.0, np.sqrt(self.d2), out=np.zeros_like(self.d2), where=self.d2 > 0
+        )
+        if mask is not None:
+            weights = weights * mask
+        return weights
+
+    def escape(self, mask=None) -> np.ndarray:
+        """Unit direction away from the threats, nearer ones counting more."""
+        away = -unit(self.offsets) * self.weights(mask)[:, None]
+        return unit(away.sum(axis=0))
+
+    def sidestep(self, mask=None) -> np.ndarray:
+        """Unit direction past the threats, to the side of the target line
+        away from each of them."""
+        directions = unit(self.offsets)
+        clockwise = np.stack([directions[:, 1], -directions[:, 0]], axis=1)
+        turn = np.where(self.side >= 0, 1.0, -1.0)[:, None]
+        steps = clockwise * turn * self.weights(mask)[:, None]
+        return unit(steps.sum(axis=0))
+
+
+def assess(origin: dict, target: dict, points: np.ndarray) -> Geometry:
+    return Geometry(xy(origin), xy(target), np.asarray(points, dtype=float))
@@ -0,0 +1,121 @@
+"""Where things tend to spawn on a map, for bots with nothing to chase.
+
+Each new item, enemy or chest adds its xp to a coarse grid cell the first
+time its id is seen. Every game tick the whole grid decays, so old spawn
+areas fade as the match moves on. Every bot of ours on the map shares one
+heatmap, so it goes by the match clock rather than by how many bots report.
+That clock only counts whole seconds: each second it advances decays the grid
+`ticks_per_second` times, and the ticks within a second are not told apart.
+The richest cells are re-ranked every `refresh_every` ticks into a short
+waypoint list. An idle bot reads that list instead of searching the grid.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+
+class SpawnHeatmap:
+    def __init__(
+        self,
+        cell_size=200,
+        shape=(64, 64),
+        decay=0.995,
+        n_waypoints=8,
+        refresh_every=20,
+        memory=4096,
+        restart_after=5,
+        ticks_per_second=4,
+    ):
+        self.cell_size = cell_size
+        self.grid = np.zeros(shape)
+        self.decay = decay
+        self.n_waypoints = n_waypoints
+        self.refresh_every = refresh_every
+        self.memory = memory
+        self.seen = OrderedDict()
+        self.waypoints = []
+        self.ticks = 0
+        self.clock = None
+        self.restart_after = restart_after
+        self.ticks_per_second = ticks_per_second
+
+    def cell(self, position: dict) -> tuple:
+        i = int(position["x"] // self.cell_size)
+        j = int(position["y"] // self.cell_size)
+        return (
+            min(max(i, 0), self.grid.shape[0] - 1),
+            min(max(j, 0), self.grid.shape[1] - 1),
+        )
+
+    def center(self, cell: tuple) -> dict:
+        return {
+            "x": (cell[0] + 0.5) * self.cell_size,
+            "y": (cell[1] + 0.5) * self.cell_size,
+        }
+
+    def elapsed(self, clock) -> int:
+        """Game ticks since the latest match clock seen, given `clock`.
+
+        Without a clock every call is a tick. As in MatchWorld.refresh, a
+        clock slightly behind ours is a bot lagging behind, and one far behind
+        is a new match, which counts as a single tick.
+        """
+        if clock is None or self.clock is None:
+            self.clock = clock
+            return 1
+        if clock > self.clock + self.restart_after:
+            self.clock = clock
+            return 1
+        if clock < self.clock:
+            ticks = round((self.clock - clock) * self.ticks_per_second)
+            self.clock = clock
+            return ticks
+        return 0
+
+    def observe(self, sightings: list, clock=None):
+        """Add first sightings, decaying first for the ticks since the last."""
+        ticks = self.elapsed(clock)
+        if ticks:
+            self.grid *= self.decay**ticks
+        for entity in sightings:
+            entity_id = entity.get("id")
+            if entity_id is None or entity_id in self.seen:
+                continue
+            self.seen[entity_id] = True
+            if len(self.seen) > self.memory:
+                self.seen.popitem(last=False)
+            self.grid[self.cell(entity["position"])] += max(entity.get("xp", 0), 1)
+
+        before = self.ticks
+        self.ticks += ticks
+        refreshes = self.ticks // self.refresh_every - before // self.refresh_every
+        if refreshes or not self.waypoints:
+            self.refresh()
+
+    def refresh(self):
+        n = min(self.n_waypoints, self.grid.size)
+        flat = self.grid.ravel()
+        top = np.argpartition(flat, -n)[-n:]
+        top = top[np.argsort(flat[top])[::-1]]
+        self.waypoints = [
+            self.center(np.unravel_index(i, self.grid.shape))
+            for i in top
+            if flat[i] > 0
+        ]
+
+    def waypoint(self, position: dict, reached=40000) -> dict:
+        """The richest waypoint we are not already standing on.
+
+        Reaching a waypoint with nothing worth chasing around clears its
+        cell, so an idle bot tours the list instead of pacing between two.
+        """
+        while self.waypoints:
+            waypoint = self.waypoints[0]
+            dx = waypoint["x"] - position["x"]
+            dy = waypoint["y"] - position["y"]
+            if dx * dx + dy * dy > reached:
+                return waypoint
+            self.grid[self.cell(waypoint)] = 0
+            self.waypoints.pop(0)
+        return {}
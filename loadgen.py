@@ -0,0 +1,200 @@
+"""Load test the bot server with many simulated bots at once.
+
+Each simulated bot posts its own stream of `LevelData` ticks to / (or
+/steering), one request at a time, and paces itself to the game's tick rate
+unless --tick is 0. The ticks come from seeded simulator worlds, or from
+a recorded NDJSON file with one LevelData per line, replayed under a
+different player id per bot. Payloads are serialized up front so the client
+measures the server, not json.dumps.
+
+Against a running server:
+
+> python loadgen.py --url http://localhost:3000 --concurrency 1,8,32,128
+
+Or start local servers with 1, 2 and 4 uvicorn workers in turn:
+
+> python loadgen.py --workers 1,2,4 --concurrency 8,32,128 --ticks 200
+
+Each level reports throughput, latency percentiles, the error rate and the
+share of requests slower than the tick budget.
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+import numpy as np
+
+from simulator import TICK_SECONDS, World
+
+
+def synthetic_payloads(seed: int, ticks: int) -> list:
+    """A seeded world's ticks from our player's side, moved by the simple
+    opponent policy so the situation keeps changing."""
+    world = World(seed)
+    payloads = []
+    for tick in range(ticks):
+        payloads.append(json.dumps(world.level_data(world.me, tick)).encode())
+        world.step(lambda level_data: world._opponent_moves(world.me), ticks)
+    return payloads
+
+
+def recorded_payloads(records: list, bot: int, ticks: int) -> list:
+    """`ticks` of the recorded LevelData, from a per-bot offset and under a
+    per-bot player id."""
+    payloads = []
+    for tick in range(ticks):
+        level_data = copy.deepcopy(records[(bot * 7 + tick) % len(records)])
+        level_data["own_player"]["id"] = f'{level_data["own_player"]["id"]}-{bot}'
+        payloads.append(json.dumps(level_data).encode())
+    return payloads
+
+
+def read_records(path: str) -> list:
+    with open(path) as fp:
+        return [json.loads(line) for line in fp if line.strip()]
+
+
+async def run_bot(client, path: str, payloads: list, tick_seconds: float) -> list:
+    """(latency, ok) for each of a bot's ticks, sent one after another."""
+    results = []
+    headers = {"content-type": "application/json"}
+    next_tick = time.perf_counter()
+    for payload in payloads:
+        start = time.perf_counter()
+        try:
+            response = await client.post(path, content=payload, headers=headers)
+            ok = response.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        results.append((time.perf_counter() - start, ok))
+        if tick_seconds:
+            next_tick += tick_seconds
+            await asyncio.sleep(max(next_tick - time.perf_counter(), 0))
+    return results
+
+
+async def run_level(client, path: str, bots: list, tick_seconds: float) -> dict:
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(run_bot(client, path, payloads, tick_seconds) for payloads in bots)
+    )
+    elapsed = time.perf_counter() - start
+    return summarize([r for bot in results for r in bot], elapsed, tick_seconds)
+
+
+def summarize(results: list, elapsed: float, budget: float) -> dict:
+    latencies = np.array([latency for latency, _ in results]) * 1000
+    errors = sum(not ok for _, ok in results)
+    summary = {
+        "requests": len(results),
+        "rps": len(results) / elapsed if elapsed else 0.0,
+        "error_rate": errors / len(results) if results else 0.0,
+    }
+    for p in (50, 90, 99):
+        summary[f"p{p}_ms"] = (
+            float(np.percentile(latencies, p)) if len(latencies) else 0.0
+        )
+    summary["max_ms"] = float(latencies.max()) if len(latencies) else 0.0
+    if budget:
+        summary["over_budget"] = float((latencies > budget * 1000).mean())
+    return summary
+
+
+def make_bots(args, concurrency: int) -> list:
+    if args.payloads:
+        records = read_records(args.payloads)
+        return [
+            recorded_payloads(records, bot, args.ticks) for bot in range(concurrency)
+        ]
+    return [
+        synthetic_payloads(args.seed + bot, args.ticks) for bot in range(concurrency)
+    ]
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "main:app",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+        ],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/scoring", timeout=1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+async def sweep(url: str, args, label: dict) -> list:
+    rows = []
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=url, timeout=30, limits=limits) as client:
+        for concurrency in args.concurrency:
+            bots = make_bots(args, concurrency)
+            row = dict(label, concurrency=concurrency)
+            row.update(await run_level(client, args.path, bots, args.tick))
+            print(format_row(row), flush=True)
+            rows.append(row)
+    return rows
+
+
+def format_row(row: dict) -> str:
+    return "  ".join(
+        f"{key}={value:.4g}" if isinstance(value, float) else f"{key}={value}"
+        for key, value in row.items()
+    )
+
+
+def integers(text: str) -> list:
+    return [int(value) for value in text.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="server to test; default starts local ones")
+    parser.add_argument("--workers", type=integers, default=[1])
+    parser.add_argument("--port", type=int, default=3100)
+    parser.add_argument("--concurrency", type=integers, default=[1, 8, 32])
+    parser.add_argument("--ticks", type=int, default=100)
+    parser.add_argument("--tick", type=float, default=TICK_SECONDS)
+    parser.add_argument("--path", default="/", choices=["/", "/steering"])
+    parser.add_argument("--payloads", help="recorded LevelData, one JSON per line")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the rows here")
+    args = parser.parse_args()
+
+    rows = []
+    if args.url:
+        rows += asyncio.run(sweep(args.url, args, {}))
+    else:
+        for workers in args.workers:
+            server = start_server(workers, args.port)
+            try:
+                url = f"http://127.0.0.1:{args.port}"
+                rows += asyncio.run(sweep(url, args, {"workers": workers}))
+            finally:
+                server.terminate()
+                server.wait()
+    if args.json:
+        with open(args.json, "w") as fp:
+            json.dump(rows, fp, indent=2)
@@ -1,14 +1,58 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
+import os
 import random
 import datetime
+import time
+from collections import OrderedDict
 import pandas as pd
 import numpy as np
 
+from admission import Admission
+from behavior import Action, Blackboard, Condition, Selector, Sequence
+from behavior import compile_tree, run
+from blackbox import BlackBox
+from clusters import find_clusters
+from config import Config
+from death_tax import DangerGrid, DeathTax, SituationLog
+from effort import pow_tables, travel
+from entities import evolve
+from filters import FilterContext, FilterPipeline
+from geometry import assess, positions
+from heatmap import SpawnHeatmap
+from matches import MatchCache, match_key
+from moves import MoveBuilder, dedupe_moves
+from opponents import OpponentStore
+from params import Params
+from potential import PotentialField
+from profiling import Profiler
+from routing import RoutePlanner, stop_key
+from tracing import from_env
+from tracking import ThreatTracker, threat_distance, threat_position
+
+LOG_DIR = "/tmp"
+PARAMS = Params()
+CONFIG = Config(os.environ.get("BOT_CONFIG"), PARAMS)
 DEAD = False
 POTIONS = 0
 RINGS = 0
 ZAPPERS = 0
+MATCHES = MatchCache()
+ROUTES = {}
+TRACKERS = {}
+OPPONENTS = {}
+HEATMAPS = OrderedDict()
+BOTS = OrderedDict()
+MAX_BOTS = 64
+SITUATIONS = {}
+BLACKBOXES = {}
+DEATH_TAX = DeathTax.load()
+FILTERS = FilterPipeline()
+SCORING_STATS = {"scored": 0, "pruned": 0}
+TRACER = from_env()
+PROFILER = Profiler()
+ADMISSION = Admission()
 
 
 # death tax: odds of dying x the cost of losing that time: odds * (xp/s * 5)
@@ -18,24 +62,39 @@ ZAPPERS = 0
 # logarithmic dropoff to the directions adjacent to the highest value?
 
 
-def dist_squared_to(a: dict, b: dict) -> float:
-    return (a["x"] - b["x"]) ** 2 + (a["y"] - b["y"]) ** 2
+def travel_terms(params: Params) -> dict:
+    """15000**e and 500**e for each configured travel exponent e."""
+    exponents = (params.best_item_exponent, params.steering_exponent)
+    return {e: (15000**e, 500**e) for e in exponents}
+
+
+def travel_speed(own_player: dict, exponent: float) -> float:
+    terms = PARAMS.derived("travel_terms", travel_terms).get(exponent)
+    if terms is None:
+        terms = (15000**exponent, 500**exponent)
+    return terms[0] + own_player["levelling"]["speed"] * terms[1]
+
+
+def travel_efforts(distances, exponent: float) -> np.ndarray:
+    """Each squared distance ** exponent, for a whole tick's items at once."""
+    table = PARAMS.derived("pow_tables", pow_tables).get(exponent)
+    return travel(distances, exponent, table)
 
 
-def slope(a: dict, b: dict) -> float:
-    return (int(b["y"]) - a["y"]) / (int(b["x"]) - a["x"])
+def apply_config():
+    """Swap in a newly loaded config between ticks."""
+    global PARAMS
+    params = CONFIG.take()
+    if params is not None:
+        PARAMS = params
+
+
+def dist_squared_to(a: dict, b: dict) -> float:
+    return (a["x"] - b["x"]) ** 2 + (a["y"] - b["y"]) ** 2
 
 
 def calculate_potion_value(own_player):
-    potion_values = {
-        0: 1548,
-        1: 524,
-        2: 212,
-        3: 126,
-        4: 108,
-        5: 64,
-        6: 32,
-    }
+    potion_values = dict(PARAMS.potion_values)
     if own_player["special_equipped"] == "bomb":
         for val in potion_values:
             potion_values[val] *= 2
@@ -70,7 +129,12 @@ def calculate_zapper_value(own_player):
 
 
 def peripheral_danger(
-    own_player: dict, item: dict, enemies: list, players: list, hazards: list
+    own_player: dict,
+    item: dict,
+    enemies: list,
+    players: list,
+    hazards: list,
+    predicted: bool = False,
 ) -> bool:
     total_health = (
         own_player["health"]
@@ -79,15 +143,18 @@ def peripheral_danger(
     total_danger = 0
 
     for enemy in enemies:
-        if dist_squared_to(item["position"], enemy["position"]) < 80000:
+        position = threat_position(enemy, predicted)
+        if dist_squared_to(item["position"], position) < PARAMS.threat_radius:
             total_danger += enemy["attack_damage"]
 
     for player in players:
-        if dist_squared_to(item["position"], player["position"]) < 80000:
+        position = threat_position(player, predicted)
+        if dist_squared_to(item["position"], position) < PARAMS.threat_radius:
             total_danger += player["attack_damage"]
 
     for hazard in hazards:
-        if dist_squared_to(item["position"], hazard["position"]) < 60000:
+        position = threat_position(hazard, predicted)
+        if dist_squared_to(item["position"], position) < PARAMS.hazard_radius:
             total_danger += hazard["attack_damage"]
 
     return total_danger > total_health
@@ -133,85 +200,188 @@ def bomb_nearby(item: dict, hazards: list) -> dict:
     return {}
 
 
-def total_danger(players: list, enemies: list, hazards: list) -> int:
+def total_danger(
+    players: list, enemies: list, hazards: list, predicted: bool = False
+) -> int:
     total_danger = 0
 
     for player in players:
-        if player["distance"] < 30000 and not player["is_frozen"]:
+        distance = threat_distance(player, predicted)
+        if distance < PARAMS.contact_radius and not player["is_frozen"]:
             total_danger += player["attack_damage"]
 
     for enemy in enemies:
-        if enemy["distance"] < 30000 and not enemy["is_frozen"]:
+        distance = threat_distance(enemy, predicted)
+        if distance < PARAMS.contact_radius and not enemy["is_frozen"]:
             total_danger += enemy["attack_damage"]
 
     for hazard in hazards:
-        if hazard["distance"] < 60000:
+        if threat_distance(hazard, predicted) < PARAMS.hazard_radius:
             total_danger += hazard["attack_damage"]
 
     return total_danger
 
 
-def get_best_item(
-    own_player: dict, items: list, hazards: list, enemies: list, players: list
+def cell_xp_totals(items: list, cell_size: float) -> dict:
+    """Sum of positive xp per grid cell, for bounding cluster values."""
+    totals = {}
+    for item in items:
+        if item["xp"] > 0:
+            cell = (
+                int(item["position"]["x"] // cell_size),
+                int(item["position"]["y"] // cell_size),
+            )
+            totals[cell] = totals.get(cell, 0) + item["xp"]
+    return totals
+
+
+def kill_effort(own_player: dict, item: dict, opponents=None) -> float:
+    health = item.get("health")
+    if health is None:
+        return 0
+    if item["type"] == "player":
+        if opponents is None:
+            health += 200  # Assume players have an average of 2 potions
+        else:
+            health += opponents.health_bonus(item)
+    return (health / own_player["attack_damage"]) * 0.5  # Assuming attack cooldown
+
+
+def get_best_cluster_item(
+    own_player: dict,
+    items: list,
+    exponent: float,
+    radius: float,
+    danger: DangerGrid = None,
+    allowed=None,
+    opponents: OpponentStore = None,
+    scores: list = None,
 ) -> dict:
+    """Score clumps of items once each and return the best entry item.
+
+    A cluster's value is its total xp over the kill effort of every member,
+    the travel to visit them all from its centroid and the travel to the
+    entry item.
+    """
+    my_speed = travel_speed(own_player, exponent)
+    travel_effort = travel_efforts([item["distance"] for item in items], exponent)
     max_xp = float("-inf")
     target = {}
 
-    for item in items:
+    for cluster in find_clusters(items, radius):
+        base_effort = sum(
+            kill_effort(own_player, items[i], opponents) for i in cluster.members
+        )
+        # Never zero, even for a lone item we are standing on
+        base_effort += cluster.spread(exponent) / my_speed + 1e-9
+        for i in cluster.members:
+            if allowed is not None and not allowed[i]:
+                continue
+            item = items[i]
+            total_effort = base_effort + travel_effort[i] / my_speed
+            potential_xp = cluster.xp / total_effort
+            if danger is not None:
+                potential_xp *= DEATH_TAX.factor(own_player, danger, item["position"])
+            if scores is not None:
+                scores.append((potential_xp, i))
+            if potential_xp > max_xp:
+                max_xp = potential_xp
+                target = item
+
+    if target:
+        target = evolve(target, xp=int(max_xp))
+    return target
+
+
+def get_best_item(
+    own_player: dict,
+    items: list,
+    hazards: list,
+    enemies: list,
+    players: list,
+    danger: DangerGrid = None,
+    allowed=None,
+    opponents: OpponentStore = None,
+    scores: list = None,
+) -> dict:
+    """The candidate with the most xp per second of effort.
+
+    Each scored candidate's (value, index) is appended to `scores` if given;
+    candidates pruned by the bound are left out.
+    """
+    for i, item in enumerate(items):
+        if allowed is not None and not allowed[i]:
+            continue
         if item["type"] == "tiny" and item["distance"] < 17500:
             return item
 
-        # # Skip items based on various conditions
-        # if losing_battle(own_player, item):
-        #     continue
-        # if peripheral_danger(own_player, item, enemies, players, hazards):
-        #     continue
-
-        # Additional checks for items with "attack_damage"
-        if item.get("attack_damage") is not None:
-            for hazard in hazards:
-                if (
-                    hazard["attack_damage"] > item["health"]
-                    and dist_squared_to(hazard["position"], item["position"]) < 50000
-                ):
-                    continue
-
-        # Calculate experience rate and update the target if this is the best option
-        exponent = 0.7
-        my_speed = 15000**exponent + own_player["levelling"]["speed"] * 500**exponent
-        total_xp = item["xp"]
-        total_effort = 0
-        if item["type"] == "player":
-            item["health"] += 200  # Assume players have an average of 2 potions
-        if item.get("health") is not None:
-            total_effort += (
-                item["health"] / own_player["attack_damage"]
-            ) * 0.5  # Assuming attack cooldown
-        total_effort += (item["distance"] ** exponent) / my_speed
-
-        for other_item in items:
-            distance = dist_squared_to(item["position"], other_item["position"])
-            if 0 < distance < 50000:
-                total_xp += other_item["xp"]
-                # Calculate total effort: kill time + travel time
-                if other_item["type"] == "player":
-                    other_item[
-                        "health"
-                    ] += 200  # Assume players have an average of 2 potions
-                if (
-                    other_item.get("health") is not None
-                ):  # Check if the other_item has a health attribute
-                    total_effort += (
-                        other_item["health"] / own_player["attack_damage"]
-                    ) * 0.5  # Assuming attack cooldown
-                total_effort += (distance**exponent) / my_speed
-
-        potential_xp = total_xp / total_effort
-        if potential_xp > max_xp:
+    exponent = PARAMS.best_item_exponent
+    radius = PARAMS.neighbour_radius
+    if len(items) > PARAMS.cluster_above:
+        return get_best_cluster_item(
+            own_player, items, exponent, radius, danger, allowed, opponents, scores
+        )
+
+    my_speed = travel_speed(own_player, exponent)
+    cell_size = radius**0.5
+    totals = cell_xp_totals(items, cell_size)
+
+    # Every item's kill and travel effort once, rather than per neighbour
+    xy = positions(items)
+    xp = np.array([item["xp"] for item in items], dtype=float)
+    kills = np.array([kill_effort(own_player, item, opponents) for item in items])
+    travel_effort = travel_efforts([item["distance"] for item in items], exponent)
+
+    # Branch and bound: a candidate can at best collect every positive xp in
+    # the 3x3 cells around it for no more than its own effort
+    bounded = []
+    for i, item in enumerate(items):
+        # Skip items the filter pipeline rejected
+        if allowed is not None and not allowed[i]:
+            continue
+        # Never zero, even for an item we are standing on
+        own_effort = kills[i] + travel_effort[i] / my_speed + 1e-9
+        cx = int(item["position"]["x"] // cell_size)
+        cy = int(item["position"]["y"] // cell_size)
+        cluster_xp = sum(
+            totals.get((cx + dx, cy + dy), 0) for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+        )
+        cluster_xp -= max(item["xp"], 0)
+        factor = 1.0
+        if danger is not None:
+            factor = DEATH_TAX.factor(own_player, danger, item["position"])
+        bound = max(item["xp"] + cluster_xp, 0) / own_effort * factor
+        bounded.append((-bound, i, own_effort, factor))
+    bounded.sort()
+
+    max_xp = float("-inf")
+    target = {}
+    best = None
+    for rank, (bound, i, total_effort, factor) in enumerate(bounded):
+        if -bound * (1 + 1e-9) < max_xp:
+            SCORING_STATS["pruned"] += len(bounded) - rank
+            break
+        SCORING_STATS["scored"] += 1
+
+        item = items[i]
+        distances = ((xy - xy[i]) ** 2).sum(axis=1)
+        near = (0 < distances) & (distances < radius)
+        total_xp = item["xp"] + xp[near].sum()
+        # Calculate total effort: kill time + travel time
+        total_effort += kills[near].sum()
+        total_effort += (travel_efforts(distances[near], exponent) / my_speed).sum()
+
+        potential_xp = total_xp / total_effort * factor
+        if scores is not None:
+            scores.append((potential_xp, i))
+        # Ties go to the earlier item, as in a plain scan of the list
+        if potential_xp > max_xp or (potential_xp == max_xp and i < best):
             max_xp = potential_xp
             target = item
-            target["xp"] = int(potential_xp)
+            best = i
 
+    if target:
+        target = evolve(target, xp=int(max_xp))
     return target
 
 
@@ -250,7 +420,7 @@ def assess_attack(own_player, target, moves):
 
 def assess_health_needs(own_player, total_danger_value, moves):
     # Handle health and potion usage
-    if total_danger_value >= own_player["health"] * 1.2:
+    if total_danger_value >= own_player["health"] * PARAMS.danger_health_ratio:
         moves.append({"use": "big_potion"})
         if not own_player["is_cloaked"]:
             moves.append({"use": "ring"})
@@ -284,21 +454,22 @@ def assess_zapper_use(target, moves):
 
 
 def handle_bomb_threat(own_player, target, bomb, moves):
+    position = dict(target["position"])
     if bomb:
         space = 100
         moves.append("shield")
-        target["position"]["x"] = (
+        position["x"] = (
             own_player["position"]["x"] - space
             if bomb["position"]["x"] >= own_player["position"]["x"]
             else own_player["position"]["x"] + space
         )
-        target["position"]["y"] = (
+        position["y"] = (
             own_player["position"]["y"] - space
             if bomb["position"]["y"] >= own_player["position"]["y"]
             else own_player["position"]["y"] + space
         )
         moves.append("dash")
-    return moves, target
+    return moves, evolve(target, position=position)
 
 
 def handle_icicle_threat(own_player, hazards, moves):
@@ -312,146 +483,38 @@ def handle_icicle_threat(own_player, hazards, moves):
     return moves
 
 
-def retreat(own_player, target, threats):
-    retreat = 200
-    for threat in threats:
-        threat_slope = slope(own_player["position"], threat["position"])
-        threat_inverse = 1 / threat_slope
-        if (
-            threat["position"]["x"] > own_player["position"]["x"]
-            and threat["position"]["y"] > own_player["position"]["y"]
-        ):
-            target["position"]["x"] = (
-                own_player["position"]["x"] - retreat * threat_inverse
-            )
-            target["position"]["y"] = (
-                own_player["position"]["y"] - retreat * threat_slope
-            )
-        elif (
-            threat["position"]["x"] < own_player["position"]["x"]
-            and threat["position"]["y"] < own_player["position"]["y"]
-        ):
-            target["position"]["x"] = (
-                own_player["position"]["x"] + retreat * threat_inverse
-            )
-            target["position"]["y"] = (
-                own_player["position"]["y"] + retreat * threat_slope
-            )
-        elif (
-            threat["position"]["x"] > own_player["position"]["x"]
-            and threat["position"]["y"] < own_player["position"]["y"]
-        ):
-            target["position"]["x"] = (
-                own_player["position"]["x"] - retreat * threat_inverse
-            )
-            target["position"]["y"] = (
-                own_player["position"]["y"] + retreat * threat_slope
-            )
-        elif (
-            threat["position"]["x"] < own_player["position"]["x"]
-            and threat["position"]["y"] > own_player["position"]["y"]
-        ):
-            target["position"]["x"] = (
-                own_player["position"]["x"] + retreat * threat_inverse
-            )
-            target["position"]["y"] = (
-                own_player["position"]["y"] - retreat * threat_slope
-            )
-    return target
+def retreat(own_player, target, threats, predicted=False, field=None):
+    if not threats:
+        return target
+    if field is None:
+        field = PotentialField(threats, own_player["position"], predicted=predicted)
+    position = field.downhill(own_player["position"])
+    if position == own_player["position"]:
+        return target
+    return evolve(target, position=position)
 
 
-def avoid_collisions(own_player, target, threats):
+def avoid_collisions(own_player, target, threats, predicted=False):
+    position = dict(target["position"])
     nearby_threats = []
     for threat in threats:
-        if threat["distance"] < 70000:
-            nearby_threats.append(threat)
+        if (
+            threat_distance(threat, predicted) < 70000
+            and threat["id"] != target["id"]
+            and threat["type"] != target["type"]
+        ):
+            nearby_threats.append(threat_position(threat, predicted))
 
-    for threat in nearby_threats:
-        if threat["id"] != target["id"] and threat["type"] != target["type"]:
+    if nearby_threats:
+        points = [(p["x"], p["y"]) for p in nearby_threats]
+        geometry = assess(own_player["position"], position, points)
+        if geometry.between.any():
             buffer = 200
-            threat_slope = slope(own_player["position"], threat["position"])
-            target_slope = slope(own_player["position"], target["position"])
-            threat_inverse = 1 / (threat_slope or 1)
-            if (
-                target["position"]["x"] > threat["position"]["x"]
-                and threat["position"]["x"] > own_player["position"]["x"]
-            ):
-                if (
-                    target["position"]["y"] > threat["position"]["y"]
-                    and threat["position"]["y"] > own_player["position"]["y"]
-                ):
-                    if threat_slope > target_slope:
-                        target["position"]["x"] = (
-                            own_player["position"]["x"] + buffer * threat_inverse
-                        )
-                        target["position"]["y"] = (
-                            own_player["position"]["y"] - buffer * threat_slope
-                        )
-                    else:
-                        target["position"]["x"] = (
-                            own_player["position"]["x"] - buffer * threat_inverse
-                        )
-                        target["position"]["y"] = (
-                            own_player["position"]["y"] + buffer * threat_slope
-                        )
-                elif (
-                    target["position"]["y"] < threat["position"]["y"]
-                    and threat["position"]["y"] < own_player["position"]["y"]
-                ):
-                    if threat_slope > target_slope:
-                        target["position"]["x"] = (
-                            own_player["position"]["x"] - buffer * threat_inverse
-                        )
-                        target["position"]["y"] = (
-                            own_player["position"]["y"] - buffer * threat_slope
-                        )
-                    else:
-                        target["position"]["x"] = (
-                            own_player["position"]["x"] + buffer * threat_inverse
-                        )
-                        target["position"]["y"] = (
-                            own_player["position"]["y"] + buffer * threat_slope
-                        )
-            elif (
-                target["position"]["x"] < threat["position"]["x"]
-                and threat["position"]["x"] < own_player["position"]["x"]
-            ):
-                if (
-                    target["position"]["y"] > threat["position"]["y"]
-                    and threat["position"]["y"] > own_player["position"]["y"]
-                ):
-                    if threat_slope > target_slope:
-                        target["position"]["x"] = (
-                            own_player["position"]["x"] + buffer * threat_inverse
-                        )
-                        target["position"]["y"] = (
-                            own_player["position"]["y"] + buffer * threat_slope
-                        )
-                    else:
-                        target["position"]["x"] = (
-                            own_player["position"]["x"] - buffer * threat_inverse
-                        )
-                        target["position"]["y"] = (
-                            own_player["position"]["y"] - buffer * threat_slope
-                        )
-                elif (
-                    target["position"]["y"] < threat["position"]["y"]
-                    and threat["position"]["y"] < own_player["position"]["y"]
-                ):
-                    if threat_slope > target_slope:
-                        target["position"]["x"] = (
-                            own_player["position"]["x"] - buffer * threat_inverse
-                        )
-                        target["position"]["y"] = (
-                            own_player["position"]["y"] + buffer * threat_slope
-                        )
-                    else:
-                        target["position"]["x"] = (
-                            own_player["position"]["x"] + buffer * threat_inverse
-                        )
-                        target["position"]["y"] = (
-                            own_player["position"]["y"] - buffer * threat_slope
-                        )
+            step = geometry.sidestep(geometry.between) * buffer
+            position = {
+                "x": geometry.origin[0] + step[0],
+                "y": geometry.origin[1] + step[1],
+            }
 
     if len(own_player["collisions"]) > 0:
         for collision in own_player["collisions"]:
@@ -463,64 +526,32 @@ def avoid_collisions(own_player, target, threats):
                 "player",
                 "chest",
             ]:
-                target["position"]["x"] = own_player["position"]["x"] + random.randint(
-                    -400, 400
-                )
-                target["position"]["y"] = own_player["position"]["y"] + random.randint(
-                    -400, 400
-                )
+                position["x"] = own_player["position"]["x"] + random.randint(-400, 400)
+                position["y"] = own_player["position"]["y"] + random.randint(-400, 400)
                 break
 
-    return target
+    return evolve(target, position=position)
 
 
 def assess_bomb_use(own_player, target, enemies, moves):
-    bomb_distance = 130000
-    for enemy in enemies:
-        # and enemy["direction"] == own_player["direction"] ???
-        if (
-            target["position"]["x"] > own_player["position"]["x"]
-            and own_player["position"]["x"] > enemy["position"]["x"]
-            and target["position"]["y"] > own_player["position"]["y"]
-            and own_player["position"]["y"] > enemy["position"]["y"]
-            and 50000 < enemy["distance"] < bomb_distance
-            and target["id"] != enemy["id"]
-        ):
-            moves.append("special")
-        elif (
-            target["position"]["x"] < own_player["position"]["x"]
-            and own_player["position"]["x"] < enemy["position"]["x"]
-            and target["position"]["y"] < own_player["position"]["y"]
-            and own_player["position"]["y"] < enemy["position"]["y"]
-            and 50000 < enemy["distance"] < bomb_distance
-            and target["id"] != enemy["id"]
-        ):
-            moves.append("special")
-        elif (
-            target["position"]["x"] < own_player["position"]["x"]
-            and own_player["position"]["x"] < enemy["position"]["x"]
-            and target["position"]["y"] > own_player["position"]["y"]
-            and own_player["position"]["y"] > enemy["position"]["y"]
-            and 50000 < enemy["distance"] < bomb_distance
-            and target["id"] != enemy["id"]
-        ):
-            moves.append("special")
-        elif (
-            target["position"]["x"] > own_player["position"]["x"]
-            and own_player["position"]["x"] > enemy["position"]["x"]
-            and target["position"]["y"] < own_player["position"]["y"]
-            and own_player["position"]["y"] < enemy["position"]["y"]
-            and 50000 < enemy["distance"] < bomb_distance
-            and target["id"] != enemy["id"]
-        ):
-            moves.append("special")
-        elif (
-            enemy["distance"] < 50000
-            and own_player["health"] > own_player["attack_damage"] * 2.5
-            and target["id"] == enemy["id"]
-            and target["health"] > own_player["attack_damage"]
-        ):
-            moves.append("special")
+    if not enemies:
+        return moves
+    bomb_distance = PARAMS.bomb_distance
+    geometry = assess(own_player["position"], target["position"], positions(enemies))
+    distance = np.array([enemy["distance"] for enemy in enemies])
+    other = np.array([enemy["id"] != target["id"] for enemy in enemies])
+    # Drop a bomb behind us on enemies following us to the target
+    chasing = geometry.behind & (50000 < distance) & (distance < bomb_distance)
+    if (chasing & other).any():
+        moves.append("special")
+    elif any(
+        enemy["distance"] < 50000
+        and own_player["health"] > own_player["attack_damage"] * 2.5
+        and target["id"] == enemy["id"]
+        and target["health"] > own_player["attack_damage"]
+        for enemy in enemies
+    ):
+        moves.append("special")
     return moves
 
 
@@ -574,44 +605,21 @@ def apply_metadata(own_player, items):
     zapper_value = calculate_zapper_value(own_player)
 
     # Experience values for different item types
-    exps = {
-        "minotaur": 600,
-        "tiny": 400,
-        "ghoul": 100,
-        "wolf": 80,
-        "player": 0,
-        "coin": 250,
-        "big_potion": potion_value,
-        "speed_zapper": zapper_value,
-        "ring": ring_value,
-        "chest": 0,
-        "power_up": 0,
-    }
+    exps = dict(PARAMS.item_xp)
+    exps.update(
+        {
+            "player": 0,
+            "big_potion": potion_value,
+            "speed_zapper": zapper_value,
+            "ring": ring_value,
+            "chest": 0,
+            "power_up": 0,
+        }
+    )
     for item in items:
 
         # Adjust experience for player level
-        level_vals = {
-            1: 82,
-            2: 95,
-            3: 109,
-            4: 126,
-            5: 144,
-            6: 166,
-            7: 191,
-            8: 220,
-            9: 253,
-            10: 291,
-            11: 335,
-            12: 386,
-            13: 444,
-            14: 511,
-            15: 587,
-            16: 676,
-            17: 777,
-            18: 894,
-            19: 1029,
-            20: 1184,
-        }
+        level_vals = PARAMS.level_vals
         if item["type"] == "player":
             exps["player"] = level_vals[item["levelling"]["level"]]
             if item["special_equipped"] == "freeze":
@@ -624,8 +632,8 @@ def apply_metadata(own_player, items):
             "bomb",
             "freeze",
         ]:
-            exps["chest"] = 1500
-            exps["power_up"] = 1500
+            exps["chest"] = PARAMS.chest_xp
+            exps["power_up"] = PARAMS.chest_xp
 
         # Special case for tinys
         if (
@@ -634,26 +642,56 @@ def apply_metadata(own_player, items):
             and not item["is_zapped"]
             and not item["is_frozen"]
         ):
-            exps["tiny"] = 50
+            exps["tiny"] = PARAMS.unreachable_tiny_xp
 
         item["xp"] = exps[item["type"]]
 
 
-def cb_steering(level_data):
+def record_tick(own_player: dict, entities: list, died_at=None) -> BlackBox:
+    """Record the tick in the bot's black box, dumping it if we died."""
+    blackbox = BLACKBOXES.setdefault(own_player["id"], BlackBox())
+    blackbox.record(own_player, entities)
+    if died_at:
+        stamp = died_at.strftime("%Y%m%d-%H%M%S-%f")
+        blackbox.dump(f"{LOG_DIR}/deaths/{own_player['id']}-{stamp}.npz")
+    return blackbox
+
+
+def nearest_target_moves(own_player, level_data, moves):
+    """Cheap stand-in for full scoring on overloaded ticks: head for the
+    nearest living item or enemy, attacking or drinking only when obvious."""
+    candidates = [
+        c
+        for c in level_data.items + level_data.enemies
+        if c.get("health") is None or c["health"] > 0
+    ]
+    candidates = generate_distance(own_player, candidates)
+    target = min(candidates, key=lambda c: c["distance"], default=None)
+    if own_player["health"] < own_player["max_health"] * 0.4:
+        moves.append({"use": "big_potion"})
+    if target is not None:
+        if target.get("health") is not None and target["distance"] < 16625:
+            moves.append("attack")
+        moves.append({"move_to": dict(target["position"])})
+    return moves
+
 
-    moves = []
+def cb_steering(level_data):
+    apply_config()
+    moves = MoveBuilder()
     own_player = level_data.own_player
+    ADMISSION.admit(level_data, PARAMS.entity_caps)
     threats = []
-    enemies = filter_threats(level_data.enemies)
+    enemies = filter_threats(own_player, level_data.enemies)
     enemies = generate_distance(own_player, enemies)
     apply_metadata(own_player, enemies)
     threats.extend(enemies)
 
-    hazards = filter_threats(level_data.hazards)
+    hazards = filter_threats(own_player, level_data.hazards)
     hazards = generate_distance(own_player, hazards)
     threats.extend(hazards)
 
-    players = filter_threats(level_data.players)
+    players = filter_threats(own_player, level_data.players)
     players = generate_distance(own_player, players)
     apply_metadata(own_player, players)
     threats.extend(players)
@@ -662,86 +700,41 @@ def cb_steering(level_data):
     items = generate_distance(own_player, items)
     apply_metadata(own_player, items)
 
-    obstacles = []
-    for obstacle in level_data.obstacles:
-        obstacles.append({"position": {"x": obstacle["x"], "y": obstacle["y"]}})
-    obstacles = generate_distance(own_player, obstacles)
+    world = MATCHES.world(level_data)
+    obstacles = world.obstacles_within(own_player["position"], 10000)
 
-    max_xp = float("-inf")
-    target = items[0]
-
-    for item in items:
-        # Calculate experience rate and update the target if this is the best option
-        exponent = 0.6
-        my_speed = 15000**exponent + own_player["levelling"]["speed"] * 500**exponent
-        total_xp = item["xp"]
-        total_effort = 0
-        if item["type"] == "player":
-            item["health"] += 200  # Assume players have an average of 2 potions
-        if item.get("health") is not None:
-            total_effort += (
-                item["health"] / own_player["attack_damage"]
-            ) * 0.5  # Assuming attack cooldown
-        total_effort += (item["distance"] ** exponent) / my_speed
-
-        for other_item in items:
-            distance = dist_squared_to(item["position"], other_item["position"])
-            if 0 < distance < 70000:
-                total_xp += other_item["xp"]
-                # Calculate total effort: kill time + travel time
-                if other_item["type"] == "player":
-                    other_item[
-                        "health"
-                    ] += 200  # Assume players have an average of 2 potions
-                if (
-                    other_item.get("health") is not None
-                ):  # Check if the other_item has a health attribute
-                    total_effort += (
-                        other_item["health"] / own_player["attack_damage"]
-                    ) * 0.5  # Assuming attack cooldown
-                total_effort += (distance**exponent) / my_speed
-
-        potential_xp = total_xp / total_effort
-        if potential_xp > max_xp:
-            max_xp = potential_xp
-            target = item
-            target["xp"] = int(potential_xp)
+    target = get_best_cluster_item(
+        own_player,
+        items,
+        PARAMS.steering_exponent,
+        PARAMS.steering_neighbour_radius,
+    )
+    if not target:
+        return moves.emit()
 
     position = [own_player["position"]["x"], own_player["position"]["y"]]
     velocity = [0, 0]
-    max_speed = 100000
-    max_force = 200000
-    radii = {
-        "minotaur": 300,
-        "tiny": 100,
-        "ghoul": 200,
-        "wolf": 100,
-        "player": 250,
-        "bomb": 400,
-        "obstacle": 10,
-        "icicle": 200,
-    }
+    max_speed = PARAMS.steering_max_speed
+    max_force = PARAMS.steering_max_force
+    radii = PARAMS.steering_avoid_radii
 
     agent = Agent(position, velocity, max_speed, max_force)
 
     target_pos = [target["position"]["x"], target["position"]["y"]]
     steering_force = agent.seek(target_pos)
     for enemy in threats:
-        if enemy["distance"] < 30000 and enemy["id"] != target["id"]:
+        if enemy["distance"] < PARAMS.contact_radius and enemy["id"] != target["id"]:
             enemy_pos = [enemy["position"]["x"], enemy["position"]["y"]]
             steering_force += agent.avoid_obstacle(enemy_pos, radii[enemy["type"]])
     for obstacle in obstacles:
-        if obstacle["distance"] < 10000:
-            obstacle_pos = [obstacle["position"]["x"], obstacle["position"]["y"]]
-            steering_force += agent.avoid_obstacle(obstacle_pos, radii["obstacle"])
+        obstacle_pos = [obstacle["position"]["x"], obstacle["position"]["y"]]
+        steering_force += agent.avoid_obstacle(obstacle_pos, radii["obstacle"])
 
         # Apply and update
     agent.apply_force(steering_force)
     agent.update()
-    own_player["position"]["x"] = agent.position[0]
-    own_player["position"]["y"] = agent.position[1]
-    moves.append({"move_to": own_player["position"]})
-    return moves
+    moves.append({"move_to": {"x": agent.position[0], "y": agent.position[1]}})
+    return moves.emit()
 
 
 class Agent:
@@ -765,7 +758,7 @@ class Agent:
     def avoid_obstacle(self, obstacle, avoid_radius):
         to_obstacle = np.array(obstacle) - self.position
         distance = np.linalg.norm(to_obstacle)
-        if distance < avoid_radius:
+        if 0 < distance < avoid_radius:
             # Calculate a repulsive force
             repulsion = -to_obstacle / distance
             repulsion = self._set_magnitude(repulsion, self.max_force)
@@ -779,7 +772,11 @@ class Agent:
         self.acceleration = np.zeros(2)
 
     def _set_magnitude(self, vector, magnitude):
-        return vector / np.linalg.norm(vector) * magnitude
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            # Already on the target: no direction to scale
+            return np.zeros(2)
+        return vector / norm * magnitude
 
     def _limit(self, vector, max_value):
         magnitude = np.linalg.norm(vector)
@@ -798,38 +795,168 @@ class LevelData(BaseModel):
     obstacles: list
 
 
+def find_bomb(tick):
+    return bomb_nearby(tick.own_player, tick.hazards)
+
+
+def special_is(name):
+    return lambda tick: tick.own_player["special_equipped"] == name
+
+
+def decide_health(tick):
+    danger = total_danger(tick.players, tick.enemies, tick.hazards, predicted=True)
+    assess_health_needs(tick.own_player, danger, tick.moves)
+
+
+def decide_bomb_use(tick):
+    assess_bomb_use(tick.own_player, tick.target, tick.enemies, tick.moves)
+    assess_bomb_use(tick.own_player, tick.target, tick.players, tick.moves)
+
+
+def in_peripheral_danger(tick):
+    return peripheral_danger(
+        tick.own_player,
+        tick.own_player,
+        tick.enemies,
+        tick.players,
+        tick.hazards,
+        predicted=True,
+    )
+
+
+def dodge_bomb(tick):
+    _, tick.target = handle_bomb_threat(
+        tick.own_player, tick.target, tick.value("bomb", find_bomb), tick.moves
+    )
+
+
+def dodge_threats(tick):
+    tick.target = avoid_collisions(
+        tick.own_player, tick.target, tick.threats, predicted=True
+    )
+
+
+def always(tick):
+    return True
+
+
+DECISION_TREE = Sequence(
+    Action("health", decide_health),
+    Action("attack", lambda t: assess_attack(t.own_player, t.target, t.moves)),
+    Action("zapper", lambda t: assess_zapper_use(t.target, t.moves)),
+    Selector(
+        Sequence(
+            Condition("has_bomb", special_is("bomb")), Action("bomb", decide_bomb_use)
+        ),
+        Sequence(
+            Condition("has_freeze", special_is("freeze")),
+            Action(
+                "icicle", lambda t: assess_icicle_use(t.own_player, t.target, t.moves)
+            ),
+        ),
+        Sequence(
+            Condition("has_shockwave", special_is("shockwave")),
+            Selector(
+                Sequence(
+                    Condition("bomb_nearby", lambda t: t.value("bomb", find_bomb)),
+                    Action("shockwave_bomb", lambda t: t.moves.append("special")),
+                ),
+                Sequence(
+                    Condition("peripheral_danger", in_peripheral_danger),
+                    Action("shockwave_shield", lambda t: t.moves.append("shield")),
+                    Action("shockwave", lambda t: t.moves.append("special")),
+                ),
+                Condition("no_shockwave", always),
+            ),
+        ),
+        Condition("no_special", always),
+    ),
+    Selector(
+        Sequence(
+            Condition("hazards", lambda t: t.hazards),
+            Action(
+                "icicle_threat",
+                lambda t: handle_icicle_threat(t.own_player, t.hazards, t.moves),
+            ),
+        ),
+        Condition("no_hazards", always),
+    ),
+    Selector(
+        Sequence(
+            Condition("bomb_nearby", lambda t: t.value("bomb", find_bomb)),
+            Action("bomb_threat", dodge_bomb),
+        ),
+        Condition("no_bomb", always),
+    ),
+    Action("avoid", dodge_threats),
+)
+DECISIONS = compile_tree(DECISION_TREE)
+
+CONFIG.register("travel_terms", travel_terms)
+CONFIG.register("pow_tables", pow_tables)
+if CONFIG.path:
+    CONFIG.watch()
+
+
 def play(level_data: LevelData):
-    moves = []
+    apply_config()
+    moves = MoveBuilder()
     own_player = level_data.own_player
+    seen_bot(own_player["id"])
+    trace = TRACER.start(own_player["id"])
+    entities = ADMISSION.admit(level_data, PARAMS.entity_caps)
+    overloaded = ADMISSION.overloaded(
+        entities, PARAMS.overload_entities, PARAMS.overload_latency_ms
+    )
     threats = []
     global DEAD
+    died_at = None
     if own_player["health"] <= 0 and not DEAD:
         timestamp = datetime.datetime.now()
         DEAD = True
-        with open("/tmp/enemies.log", "a") as f:
+        died_at = timestamp
+        with open(f"{LOG_DIR}/enemies.log", "a") as f:
             df = pd.json_normalize(level_data.enemies)
             df["timestamp"] = timestamp
             f.write(df.to_csv(index=False))
-        with open("/tmp/items.log", "a") as f:
+        with open(f"{LOG_DIR}/items.log", "a") as f:
             df = pd.json_normalize(level_data.items)
             df["timestamp"] = timestamp
             f.write(df.to_csv(index=False))
-        with open("/tmp/own_player.log", "a") as f:
+        with open(f"{LOG_DIR}/own_player.log", "a") as f:
             df = pd.json_normalize(level_data.own_player)
             df["timestamp"] = timestamp
             f.write(df.to_csv(index=False))
-        with open("/tmp/hazards.log", "a") as f:
+        with open(f"{LOG_DIR}/hazards.log", "a") as f:
             df = pd.json_normalize(level_data.hazards)
             df["timestamp"] = timestamp
             f.write(df.to_csv(index=False))
-        with open("/tmp/game_info.log", "a") as f:
+        with open(f"{LOG_DIR}/game_info.log", "a") as f:
             df = pd.json_normalize(level_data.game_info)
             df["timestamp"] = timestamp
             f.write(df.to_csv(index=False))
+        if own_player["id"] in SITUATIONS:
+            situations = SITUATIONS[own_player["id"]]
+            situations.flush(f"{LOG_DIR}/situations.log", timestamp, died=True)
+            situations.reset()
 
     elif own_player["health"] > 0:
         DEAD = False
 
+    if overloaded:
+        trace.branch("overload")
+        # The flight recorder keeps running, so a death here still gets a dump
+        entities = generate_distance(
+            own_player,
+            level_data.enemies
+            + level_data.hazards
+            + level_data.players
+            + level_data.items,
+        )
+        blackbox = record_tick(own_player, entities, died_at)
+        moves = nearest_target_moves(own_player, level_data, moves)
+        return blackbox.decided(trace.done(moves.emit()))
+
     enemies = filter_threats(own_player, level_data.enemies)
     enemies = generate_distance(own_player, enemies)
     apply_metadata(own_player, enemies)
@@ -844,165 +971,384 @@ def play(level_data: LevelData):
     apply_metadata(own_player, players)
     threats.extend(players)
 
+    tracker = TRACKERS.get(own_player["id"])
+    if tracker is None:
+        # Room for every threat a tick can admit, so none lose their history
+        caps = PARAMS.entity_caps
+        capacity = caps["enemies"] + caps["hazards"] + caps["players"]
+        tracker = TRACKERS[own_player["id"]] = ThreatTracker(capacity=capacity)
+    tracker.update(threats, own_player["position"])
+    danger = DangerGrid(threats)
+    if own_player["health"] > 0:
+        situations = SITUATIONS.setdefault(own_player["id"], SituationLog())
+        game_info = level_data.game_info
+        if not situations.same_life(
+            match_key(game_info), game_info.get("time_remaining_s")
+        ):
+            # The match ended or restarted without us dying: log it as survived
+            situations.flush(f"{LOG_DIR}/situations.log", datetime.datetime.now())
+            situations.reset()
+        elif situations.due():
+            situations.flush(f"{LOG_DIR}/situations.log", datetime.datetime.now())
+        situations.record(own_player, danger)
+
     items = level_data.items
     items = generate_distance(own_player, items)
     apply_metadata(own_player, items)
 
-    obstacles = []
-    for obstacle in level_data.obstacles:
-        obstacles.append({"position": {"x": obstacle["x"], "y": obstacle["y"]}})
-    obstacles = generate_distance(own_player, obstacles)
+    world = MATCHES.world(level_data)
+    planner = world.planner
 
     potential_targets = []
     potential_targets.extend(items)
     potential_targets.extend(enemies)
     potential_targets.extend(players)
 
+    blackbox = record_tick(own_player, threats + items, died_at)
+
     moves = apply_skill_points(own_player, moves)
 
-    target = get_best_item(own_player, potential_targets, hazards, enemies, players)
+    opponents = OPPONENTS.setdefault(own_player["id"], OpponentStore())
+    opponents.observe(players)
+    heatmap = spawn_heatmap(level_data.game_info)
+    heatmap.observe(items + enemies, level_data.game_info.get("time_remaining_s"))
+
+    trace.mark("prepare")
+
+    context = FilterContext(
+        own_player,
+        enemies,
+        players,
+        hazards,
+        level_data.game_info,
+        radii=(PARAMS.threat_radius, PARAMS.hazard_radius),
+    )
+    allowed = FILTERS.apply(potential_targets, context, PARAMS.filters)
+    trace.mark("filter")
+    scores = []
+    target = get_best_item(
+        own_player,
+        potential_targets,
+        hazards,
+        enemies,
+        players,
+        danger,
+        allowed,
+        opponents,
+        scores,
+    )
+    trace.mark("score")
+    if trace:
+        trace.scores = scores
+        trace.candidates = potential_targets
+        trace.danger = danger.lookup(own_player["position"])[0]
     if not target:
-        print("No target found")
-        return moves
+        # Head for where things usually spawn instead of standing still
+        waypoint = heatmap.waypoint(own_player["position"])
+        if waypoint:
+            trace.branch("spawn_waypoint")
+            waypoint = planner.next_waypoint(own_player["position"], waypoint)
+            moves.append({"move_to": waypoint})
+        else:
+            print("No target found")
+        return blackbox.decided(trace.done(moves.emit()))
+
+    # Follow the planned tour unless a tiny is close enough to grab right now
+    if not (target["type"] == "tiny" and target["distance"] < 17500):
+        route = ROUTES.setdefault(
+            own_player["id"],
+            RoutePlanner(health_bonus=opponents.health_bonus),
+        )
+        # Tour over what scoring kept, ranked by the scores themselves, so the
+        # filters, death tax and neighbour value all carry through
+        values = {stop_key(potential_targets[i]): value for value, i in scores}
+        head = route.plan(
+            own_player,
+            [potential_targets[i] for _, i in scores],
+            [value for value, _ in scores],
+            exponent=PARAMS.best_item_exponent,
+        )
+        if head:
+            target = evolve(head, xp=int(values[stop_key(head)]))
+    trace.mark("route")
 
     message = f'{target["type"]}: {target["xp"]}'
     moves.append({"speak": message})
 
-    total_danger_value = total_danger(players, enemies, hazards)
-    moves = assess_health_needs(own_player, total_danger_value, moves)
-    moves = assess_attack(own_player, target, moves)
-    moves = assess_zapper_use(target, moves)
-
-    bomb = bomb_nearby(own_player, hazards)
-    # Handle special equipped logic
-    if own_player["special_equipped"] == "bomb":
-        # Check for enemies
-        moves = assess_bomb_use(own_player, target, enemies, moves)
-        # Check for players
-        moves = assess_bomb_use(own_player, target, players, moves)
-    elif own_player["special_equipped"] == "freeze":
-        moves = assess_icicle_use(own_player, target, moves)
-    elif own_player["special_equipped"] == "shockwave":
-        if bomb:
-            moves.append("special")
-        elif peripheral_danger(own_player, own_player, enemies, players, hazards):
-            moves.append("shield")
-            moves.append("special")
-
-    moves = handle_icicle_threat(own_player, hazards, moves)
-    moves, target = handle_bomb_threat(own_player, target, bomb, moves)
-    target = avoid_collisions(own_player, target, threats)
+    tick = Blackboard(
+        own_player=own_player,
+        target=target,
+        moves=moves,
+        threats=threats,
+        enemies=enemies,
+        players=players,
+        hazards=hazards,
+    )
+    run(DECISIONS, tick, trace.branches)
+    target = tick.target
+    bomb = tick.value("bomb", find_bomb)
+    trace.mark("decide")
 
     # Final move to the target
     if target.get("health"):
+        trace.branch("steer")
         position = [own_player["position"]["x"], own_player["position"]["y"]]
         velocity = [0, 0]
-        max_speed = 1000
-        max_force = 2000
-        radii = {
-            "minotaur": 300,
-            "tiny": 100,
-            "ghoul": 200,
-            "wolf": 100,
-            "player": 250,
-            "bomb": 400,
-            "obstacle": 100,
-            "icicle": 200,
-        }
+        max_speed = PARAMS.max_speed
+        max_force = PARAMS.max_force
+        radii = PARAMS.avoid_radii
 
         agent = Agent(position, velocity, max_speed, max_force)
 
         target_pos = [target["position"]["x"], target["position"]["y"]]
         steering_force = agent.seek(target_pos)
-        min_distance = float("inf")
-        min_threat = {}
-        for threat in threats:
-            if threat["distance"] < min_distance:
-                min_threat = threat
-
+        min_threat = min(threats, key=lambda t: t["distance"], default={})
         if (
             min_threat
             and min_threat["id"] != target["id"]
             and min_threat["distance"] < 40000
         ):
-            threat_pos = [threat["position"]["x"], threat["position"]["y"]]
-            steering_force += agent.avoid_obstacle(threat_pos, radii[threat["type"]])
-
-        min_distance = float("inf")
-        min_obs = {}
-        for obstacle in obstacles:
-            if obstacle["distance"] < min_distance:
-                min_obs = obstacle
+            threat_pos = [min_threat["position"]["x"], min_threat["position"]["y"]]
+            radius = radii[min_threat["type"]]
+            steering_force += agent.avoid_obstacle(threat_pos, radius)
 
-        if min_obs["distance"] < 20000:
+        min_obs = world.nearest_obstacle(own_player["position"])
+        if min_obs and min_obs["distance"] < 20000:
             obs_pos = [min_obs["position"]["x"], min_obs["position"]["y"]]
             steering_force += agent.avoid_obstacle(obs_pos, radii["obstacle"])
 
             # Apply and update
         agent.apply_force(steering_force)
         agent.update()
-        own_player["position"]["x"] = agent.position[0]
-        own_player["position"]["y"] = agent.position[1]
-        moves.append({"move_to": own_player["position"]})
+        moves.append({"move_to": {"x": agent.position[0], "y": agent.position[1]}})
     elif len(own_player["items"]["big_potions"]) == 0 or bomb:
-        min_distance = float("inf")
-        min_threat = {}
-        for threat in threats:
-            if threat["distance"] < min_distance:
-                min_threat = threat
+        min_threat = min(threats, key=lambda t: t["distance"], default={})
         if (
             min_threat
             and min_threat["id"] != target["id"]
             and min_threat["distance"] < 40000
         ):
-            target = retreat(own_player, target, threats)
-        moves.append({"move_to": target["position"]})
+            field = PotentialField(threats, own_player["position"], predicted=True)
+            danger = field.value(own_player["position"])
+            if danger > own_player["health"] * PARAMS.retreat_danger_ratio:
+                trace.branch("retreat")
+                target = retreat(own_player, target, threats, field=field)
+        waypoint = planner.next_waypoint(own_player["position"], target["position"])
+        moves.append({"move_to": waypoint})
     else:
-        moves.append({"move_to": target["position"]})
+        waypoint = planner.next_waypoint(own_player["position"], target["position"])
+        moves.append({"move_to": waypoint})
 
-    return moves
+    if trace:
+        trace.target = target
+    return blackbox.decided(trace.done(moves.emit()))
+
+
+def spawn_heatmap(game_info: dict) -> SpawnHeatmap:
+    map_name = game_info.get("map_name")
+    if map_name in HEATMAPS:
+        HEATMAPS.move_to_end(map_name)
+    else:
+        HEATMAPS[map_name] = SpawnHeatmap()
+        if len(HEATMAPS) > 8:
+            HEATMAPS.popitem(last=False)
+    return HEATMAPS[map_name]
+
+
+def seen_bot(bot_id):
+    """Mark `bot_id` as active, forgetting the least recently seen bot once
+    more than MAX_BOTS have state, so ids from finished matches don't pile up."""
+    if bot_id in BOTS:
+        BOTS.move_to_end(bot_id)
+        return
+    BOTS[bot_id] = None
+    if len(BOTS) > MAX_BOTS:
+        stale = next(iter(BOTS))
+        if stale in SITUATIONS:
+            SITUATIONS[stale].flush(
+                f"{LOG_DIR}/situations.log", datetime.datetime.now()
+            )
+        forget_bot(stale)
+
+
+def forget_bot(bot_id):
+    BOTS.pop(bot_id, None)
+    ROUTES.pop(bot_id, None)
+    TRACKERS.pop(bot_id, None)
+    OPPONENTS.pop(bot_id, None)
+    SITUATIONS.pop(bot_id, None)
+    BLACKBOXES.pop(bot_id, None)
 
 
 app = FastAPI()
 
 
+@app.middleware("http")
+async def limit_body(request: Request, call_next):
+    if request.method == "POST":
+        size = request.headers.get("content-length")
+        if size is not None:
+            try:
+                size = int(size)
+            except ValueError:
+                return JSONResponse({"detail": "invalid content-length"}, 400)
+            if not ADMISSION.body_allowed(size):
+                return JSONResponse({"detail": "request body too large"}, 413)
+        else:
+            # Chunked bodies are counted as they arrive, so an oversized one
+            # is refused without being held in memory first
+            chunks, size = [], 0
+            async for chunk in request.stream():
+                size += len(chunk)
+                if not ADMISSION.body_allowed(size):
+                    return JSONResponse({"detail": "request body too large"}, 413)
+                chunks.append(chunk)
+            request._body = b"".join(chunks)
+    return await call_next(request)
+
+
 @app.post("/")
 async def receive_level_data(level_data: LevelData):
-    moves = play(level_data)
+    start = time.perf_counter()
+    moves = PROFILER.call(play, level_data)
+    ADMISSION.observe(time.perf_counter() - start)
     return moves
 
 
 @app.post("/steering")
 async def steering(level_data: LevelData):
-    moves = cb_steering(level_data)
+    moves = PROFILER.call(cb_steering, level_data)
     return moves
 
 
+@app.get("/filters")
+async def get():
+    return FILTERS.report()
+
+
+@app.get("/scoring")
+async def get():
+    return SCORING_STATS
+
+
+@app.get("/admission")
+async def get():
+    return ADMISSION.report()
+
+
+@app.get("/matches")
+async def get():
+    return MATCHES.stats()
+
+
+@app.get("/trace")
+async def get(limit: int = 1000):
+    return Response(TRACER.ndjson(limit), media_type="application/x-ndjson")
+
+
+@app.put("/trace/sampling")
+async def put(rate: float):
+    TRACER.sample_rate = min(max(rate, 0.0), 1.0)
+    return {"sample_rate": TRACER.sample_rate}
+
+
+@app.get("/admin/config")
+async def get():
+    return CONFIG.status()
+
+
+@app.put("/admin/config")
+async def put(overrides: dict):
+    try:
+        CONFIG.submit(overrides)
+    except (KeyError, TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"version": CONFIG.version}
+
+
+@app.post("/admin/profile")
+async def post(
+    calls: int = 100,
+    mode: str = "cprofile",
+    memory: bool = False,
+    interval: float = 0.001,
+):
+    try:
+        session = PROFILER.start(
+            calls=calls, mode=mode, memory=memory, interval=interval
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return session.status()
+
+
+@app.get("/admin/profile")
+async def get():
+    if PROFILER.session is None:
+        raise HTTPException(status_code=404, detail="no profiling session")
+    return PROFILER.session.status()
+
+
+def finished_session():
+    session = PROFILER.session
+    if session is None:
+        raise HTTPException(status_code=404, detail="no profiling session")
+    if not session.done:
+        raise HTTPException(status_code=409, detail=session.status())
+    return session
+
+
+@app.get("/admin/profile/stats")
+async def get(format: str = "text", sort: str = "cumulative"):
+    session = finished_session()
+    if format == "collapsed":
+        return Response(session.collapsed(), media_type="text/plain")
+    if session.mode != "cprofile":
+        raise HTTPException(status_code=400, detail="sampled sessions are collapsed")
+    if format == "pstats":
+        return Response(
+            session.pstats_dump(),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": "attachment; filename=play.prof"},
+        )
+    return Response(session.pstats_text(sort), media_type="text/plain")
+
+
+@app.get("/admin/profile/memory")
+async def get():
+    session = finished_session()
+    if not session.memory:
+        raise HTTPException(status_code=400, detail="memory was not traced")
+    return session.allocations
+
+
 @app.get("/enemies")
 async def get():
-    with open("/tmp/enemies.log") as fp:
+    with open(f"{LOG_DIR}/enemies.log") as fp:
         return fp.readlines()
 
 
 @app.get("/own-player")
 async def get():
-    with open("/tmp/own_player.log") as fp:
+    with open(f"{LOG_DIR}/own_player.log") as fp:
         return fp.read()
 
 
 @app.get("/items")
 async def get():
-    with open("/tmp/items.log") as fp:
+    with open(f"{LOG_DIR}/items.log") as fp:
         return fp.read()
 
 
 @app.get("/hazards")
 async def get():
-    with open("/tmp/hazards.log") as fp:
+    with open(f"{LOG_DIR}/hazards.log") as fp:
         return fp.read()
 
 
 @app.get("/game-info")
 async def get():
-    with open("/tmp/game_info.log") as fp:
+    with open(f"{LOG_DIR}/game_info.log") as fp:
         return fp.read()
@@ -0,0 +1,115 @@
+"""One shared view of each match for every bot of ours playing in it.
+
+Bots in the same match send nearly identical obstacle lists every tick. A
+`MatchWorld` keyed by the match's identity in `game_info` does that
+preprocessing once: it attaches the map's static arrays, which every worker
+shares (see staticmap.py), and keeps the match's A* planner and its path
+cache. It is rebuilt only when a bot sends a newer tick than the one it holds,
+judged by the match clock. Per-bot queries such as the nearest obstacle are
+single NumPy passes over the shared arrays. Anything that depends on who is
+asking, such as item xp, stays per bot.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from geometry import xy
+from pathing import PathPlanner
+from staticmap import static_map
+
+
+def match_key(game_info: dict) -> tuple:
+    return game_info.get("map_name"), game_info.get("game_id")
+
+
+class MatchWorld:
+    def __init__(self, key, restart_after=5):
+        self.key = key
+        self.restart_after = restart_after
+        self.planner = PathPlanner()
+        self.time_remaining = None
+        self.static = None
+        self.obstacle_xy = np.zeros((0, 2))
+        self.rebuilds = 0
+        self.reuses = 0
+
+    def refresh(self, level_data) -> bool:
+        """Rebuild from `level_data` if it is newer than what we hold.
+
+        A tick from slightly earlier is a bot lagging behind the others, but
+        a clock more than `restart_after` seconds behind ours means the map
+        has started a new match.
+        """
+        remaining = level_data.game_info.get("time_remaining_s")
+        held = self.time_remaining
+        if held is not None and remaining is not None:
+            if held <= remaining <= held + self.restart_after:
+                self.reuses += 1
+                return False
+
+        self.time_remaining = remaining
+        obstacle_xy = np.array(
+            [(obstacle["x"], obstacle["y"]) for obstacle in level_data.obstacles],
+            dtype=float,
+        ).reshape(-1, 2)
+        self.static = static_map(obstacle_xy, self.planner.cell_size)
+        self.obstacle_xy = self.static.xy
+        self.planner.set_blocked(self.static.blocked)
+        self.rebuilds += 1
+        return True
+
+    def obstacle_distances(self, position: dict) -> np.ndarray:
+        return ((self.obstacle_xy - xy(position)) ** 2).sum(axis=1)
+
+    def obstacle(self, i: int, distance: float) -> dict:
+        x, y = self.obstacle_xy[i]
+        return {"position": {"x": float(x), "y": float(y)}, "distance": distance}
+
+    def nearest_obstacle(self, position: dict) -> dict:
+        """The closest obstacle with its squared distance, or {}."""
+        if not len(self.obstacle_xy):
+            return {}
+        distances = self.obstacle_distances(position)
+        i = int(distances.argmin())
+        return self.obstacle(i, float(distances[i]))
+
+    def obstacles_within(self, position: dict, radius: float) -> list:
+        """Obstacles closer than the squared distance `radius`."""
+        if not len(self.obstacle_xy):
+            return []
+        distances = self.obstacle_distances(position)
+        return [
+            self.obstacle(i, float(distances[i]))
+            for i in np.flatnonzero(distances < radius)
+        ]
+
+
+class MatchCache:
+    """The most recently used `capacity` matches' worlds."""
+
+    def __init__(self, capacity=16):
+        self.capacity = capacity
+        self.worlds = OrderedDict()
+
+    def __len__(self):
+        return len(self.worlds)
+
+    def world(self, level_data) -> MatchWorld:
+        key = match_key(level_data.game_info)
+        world = self.worlds.get(key)
+        if world is None:
+            world = self.worlds[key] = MatchWorld(key)
+            if len(self.worlds) > self.capacity:
+                self.worlds.popitem(last=False)
+        else:
+            self.worlds.move_to_end(key)
+        world.refresh(level_data)
+        return world
+
+    def stats(self) -> dict:
+        return {
+            "matches": len(self.worlds),
+            "rebuilds": sum(world.rebuilds for world in self.worlds.values()),
+            "reuses": sum(world.reuses for world in self.worlds.values()),
+        }
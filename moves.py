@@ -0,0 +1,90 @@
+"""Collects a tick's actions and emits them once, deduplicated and in order.
+
+Every stage of play() appends to the same MoveBuilder as it would to a list.
+Each action lands in a fixed slot for its kind, so the response always lists
+actions in PRIORITY order whatever order the stages ran in. Repeats are
+dropped on append, and for kinds that only make sense once per tick (one
+destination, one message) the last action wins.
+"""
+
+PRIORITY = (
+    "redeem_skill_point",
+    "use",
+    "shield",
+    "special",
+    "attack",
+    "dash",
+    "speak",
+    "move_to",
+)
+SINGLE = frozenset(("speak", "move_to"))
+OTHER = len(PRIORITY)
+SLOTS = {kind: i for i, kind in enumerate(PRIORITY)}
+
+
+def move_key(move):
+    """Hashable identity of a move, for duplicate checks."""
+    if isinstance(move, dict):
+        return tuple(sorted((k, move_key(v)) for k, v in move.items()))
+    if isinstance(move, list):
+        return tuple(move_key(v) for v in move)
+    return move
+
+
+def move_kind(move):
+    if isinstance(move, dict) and len(move) == 1:
+        return next(iter(move))
+    if isinstance(move, str):
+        return move
+    return None
+
+
+def dedupe_moves(moves: list) -> list:
+    """Drop repeated moves, keeping the first of each in order."""
+    unique = {}
+    for move in moves:
+        unique.setdefault(move_key(move), move)
+    return list(unique.values())
+
+
+class MoveBuilder:
+    def __init__(self):
+        # One insertion-ordered dict per slot, keyed by move_key
+        self.slots = [{} for _ in range(OTHER + 1)]
+        self.dropped = 0
+
+    def append(self, move):
+        kind = move_kind(move)
+        slot = self.slots[SLOTS.get(kind, OTHER)]
+        if kind in SINGLE:
+            if slot:
+                self.dropped += 1
+            slot.clear()
+            slot[kind] = move
+            return
+        key = move_key(move)
+        if key in slot:
+            self.dropped += 1
+            return
+        slot[key] = move
+
+    def extend(self, moves):
+        for move in moves:
+            self.append(move)
+
+    def __iter__(self):
+        for slot in self.slots:
+            yield from slot.values()
+
+    def __len__(self):
+        return sum(len(slot) for slot in self.slots)
+
+    def __contains__(self, move):
+        kind = move_kind(move)
+        slot = self.slots[SLOTS.get(kind, OTHER)]
+        if kind in SINGLE:
+            return kind in slot and move_key(slot[kind]) == move_key(move)
+        return move_key(move) in slot
+
+    def emit(self) -> list:
+        return list(self)
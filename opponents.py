@@ -0,0 +1,117 @@
+"""What we have learned about each opponent player, in bounded memory.
+
+Profiles live in fixed-size NumPy arrays indexed by slot, with an LRU map
+from player id to slot, so memory stays flat however many opponents a
+session sees. `observe` diffs each visible player against its previous
+snapshot: potions drunk and the health they gave, specials carried and
+whether they closed on us. The estimates are shrunk toward priors until
+enough observations arrive, and every lookup is O(1).
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+SPECIALS = ("", "bomb", "freeze", "shockwave")
+
+# Before any evidence: two potions' worth of extra health, as get_best_item
+# has always assumed, and a potion heals a full 100
+PRIOR_BONUS = 200
+PRIOR_HEAL = 100
+PRIOR_WEIGHT = 3
+
+
+class OpponentStore:
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.slots = OrderedDict()
+        self.health = np.zeros(capacity)
+        self.potions = np.zeros(capacity)
+        self.distance = np.zeros(capacity)
+        self.seen = np.zeros(capacity, dtype=int)
+        self.healed = np.zeros(capacity)
+        self.potions_used = np.zeros(capacity)
+        self.approaches = np.zeros(capacity)
+        self.specials = np.zeros((capacity, len(SPECIALS)))
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __contains__(self, player_id):
+        return player_id in self.slots
+
+    def observe(self, players: list):
+        for player in players:
+            slot = self._slot(player["id"])
+            health = player["health"]
+            if "items" in player:
+                potions = len(player["items"]["big_potions"])
+            else:
+                potions = np.nan
+            distance = player.get("distance", 0)
+            if self.seen[slot]:
+                if potions < self.potions[slot]:
+                    self.potions_used[slot] += self.potions[slot] - potions
+                    self.healed[slot] += max(health - self.health[slot], 0)
+                if distance < self.distance[slot]:
+                    self.approaches[slot] += 1
+            special = player.get("special_equipped") or ""
+            if special in SPECIALS:
+                self.specials[slot, SPECIALS.index(special)] += 1
+            self.health[slot] = health
+            self.potions[slot] = potions
+            self.distance[slot] = distance
+            self.seen[slot] += 1
+
+    def heal_per_potion(self, player_id) -> float:
+        slot = self.slots.get(player_id)
+        if slot is None:
+            return PRIOR_HEAL
+        uses = self.potions_used[slot]
+        healed = self.healed[slot]
+        return (healed + PRIOR_HEAL * PRIOR_WEIGHT) / (uses + PRIOR_WEIGHT)
+
+    def health_bonus(self, player: dict) -> float:
+        """Extra health to expect from a player's potions before they die."""
+        slot = self.slots.get(player.get("id"))
+        if slot is None or np.isnan(self.potions[slot]):
+            return PRIOR_BONUS
+        return self.potions[slot] * self.heal_per_potion(player["id"])
+
+    def aggression(self, player_id) -> float:
+        """Share of observed ticks in which the player closed on us."""
+        slot = self.slots.get(player_id)
+        if slot is None or self.seen[slot] < 2:
+            return 0.5
+        return self.approaches[slot] / (self.seen[slot] - 1)
+
+    def special_odds(self, player_id) -> dict:
+        slot = self.slots.get(player_id)
+        counts = self.specials[slot] if slot is not None else np.zeros(len(SPECIALS))
+        odds = (counts + 1) / (counts.sum() + len(SPECIALS))
+        return dict(zip(SPECIALS, odds.tolist()))
+
+    def _slot(self, player_id) -> int:
+        slot = self.slots.get(player_id)
+        if slot is not None:
+            self.slots.move_to_end(player_id)
+            return slot
+        if len(self.slots) < self.capacity:
+            slot = len(self.slots)
+        else:
+            _, slot = self.slots.popitem(last=False)
+            self.evictions += 1
+        self.slots[player_id] = slot
+        for array in (
+            self.health,
+            self.potions,
+            self.distance,
+            self.seen,
+            self.healed,
+            self.potions_used,
+            self.approaches,
+            self.specials,
+        ):
+            array[slot] = 0
+        return slot
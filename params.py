@@ -0,0 +1,241 @@
+import copy
+import hashlib
+import json
+
+from filters import ALL_FILTERS
+
+DEFAULTS = {
+    # Travel effort is distance ** exponent, in get_best_item and cb_steering
+    "best_item_exponent": 0.7,
+    "steering_exponent": 0.6,
+    # Look distance ** exponent up in an interpolated table (see effort.py)
+    "effort_lut": False,
+    "effort_lut_size": 4096,
+    # Squared radius within which neighbours add to a candidate's value
+    "neighbour_radius": 50000,
+    "steering_neighbour_radius": 70000,
+    # Potion value by number of potions on hand
+    "potion_values": {
+        0: 1548,
+        1: 524,
+        2: 212,
+        3: 126,
+        4: 108,
+        5: 64,
+        6: 32,
+    },
+    # XP for killing a player by their level
+    "level_vals": {
+        1: 82,
+        2: 95,
+        3: 109,
+        4: 126,
+        5: 144,
+        6: 166,
+        7: 191,
+        8: 220,
+        9: 253,
+        10: 291,
+        11: 335,
+        12: 386,
+        13: 444,
+        14: 511,
+        15: 587,
+        16: 676,
+        17: 777,
+        18: 894,
+        19: 1029,
+        20: 1184,
+    },
+    # Drink a potion once nearby danger reaches this multiple of our health
+    "danger_health_ratio": 1.2,
+    "bomb_distance": 130000,
+    # Without potions, retreat once the threat field at our position passes
+    # this multiple of our health
+    "retreat_danger_ratio": 0.3,
+    # Above this many candidates get_best_item scores clusters, not items
+    "cluster_above": 120,
+    # Candidate filters applied before scoring, see filters.py. The others
+    # cost more XP than they save in the simulator, so they are opt-in
+    "filters": ["dead", "stock_full"],
+    # Each tick keeps only the nearest this many of each entity category
+    "entity_caps": {"items": 300, "enemies": 150, "players": 50, "hazards": 100},
+    # Above this many entities before capping, or this average latency, a
+    # tick goes for the nearest target instead of scoring candidates
+    "overload_entities": 2000,
+    "overload_latency_ms": 150,
+    # XP for the item and enemy types whose value doesn't depend on our stock
+    "item_xp": {
+        "minotaur": 600,
+        "tiny": 400,
+        "ghoul": 100,
+        "wolf": 80,
+        "coin": 250,
+    },
+    # A tiny we can neither zap nor catch frozen or zapped
+    "unreachable_tiny_xp": 50,
+    # Chests and power-ups when we hold no bomb or freeze to gain from them
+    "chest_xp": 1500,
+    # Squared distances at which threats count as danger: enemies and players
+    # around a candidate, hazards anywhere, and anything in contact with us
+    "threat_radius": 80000,
+    "hazard_radius": 60000,
+    "contact_radius": 30000,
+    # Steering agents' limits and avoidance radii in play() and cb_steering()
+    "max_speed": 1000,
+    "max_force": 2000,
+    "steering_max_speed": 100000,
+    "steering_max_force": 200000,
+    "avoid_radii": {
+        "minotaur": 300,
+        "tiny": 100,
+        "ghoul": 200,
+        "wolf": 100,
+        "player": 250,
+        "bomb": 400,
+        "obstacle": 100,
+        "icicle": 200,
+    },
+    "steering_avoid_radii": {
+        "minotaur": 300,
+        "tiny": 100,
+        "ghoul": 200,
+        "wolf": 100,
+        "player": 250,
+        "bomb": 400,
+        "obstacle": 10,
+        "icicle": 200,
+    },
+}
+
+
+# Radii, caps, limits and exponents: zero or less breaks the code using them
+POSITIVE = {
+    "best_item_exponent",
+    "steering_exponent",
+    "effort_lut_size",
+    "neighbour_radius",
+    "steering_neighbour_radius",
+    "bomb_distance",
+    "entity_caps",
+    "overload_entities",
+    "overload_latency_ms",
+    "threat_radius",
+    "hazard_radius",
+    "contact_radius",
+    "max_speed",
+    "max_force",
+    "steering_max_speed",
+    "steering_max_force",
+    "avoid_radii",
+    "steering_avoid_radii",
+}
+
+
+def check(name: str, value, default):
+    """Raise TypeError unless `value` has the type and shape of `default`."""
+    if isinstance(default, dict):
+        if not isinstance(value, dict):
+            raise TypeError(f"{name}: expected a table, got {value!r}")
+        key_type = type(next(iter(default)))
+        sample = next(iter(default.values()))
+        for key, entry in value.items():
+            if not isinstance(key, key_type):
+                raise TypeError(f"{name}: expected {key_type.__name__} keys")
+            check(f"{name}[{key!r}]", entry, sample)
+        return
+
+    kind = type(default).__name__
+    if isinstance(default, bool):
+        ok = isinstance(value, bool)
+    elif isinstance(default, (int, float)):
+        kind = "number"
+        ok = isinstance(value, (int, float)) and not isinstance(value, bool)
+    elif isinstance(default, list):
+        kind = f"list of {type(default[0]).__name__}"
+        ok = isinstance(value, list) and all(
+            isinstance(entry, type(default[0])) for entry in value
+        )
+    else:
+        ok = isinstance(value, type(default))
+    if not ok:
+        raise TypeError(f"{name}: expected {kind}, got {value!r}")
+
+
+def validate(values: dict):
+    """Raise ValueError for values of the right type that the bot can't use."""
+    for name in POSITIVE:
+        value = values[name]
+        entries = value.values() if isinstance(value, dict) else [value]
+        if any(entry <= 0 for entry in entries):
+            raise ValueError(f"{name}: must be positive, got {value!r}")
+    known = {f.__name__ for f in ALL_FILTERS}
+    unknown = [name for name in values["filters"] if name not in known]
+    if unknown:
+        raise ValueError(f"filters: unknown filters {unknown}")
+
+
+class Params:
+    """The bot's tunable constants.
+
+    Attribute access reads the current value; `replace` returns a copy with
+    some values changed, and `digest` identifies a parameter set so search
+    results can be cached. Tables computed from the values are kept with the
+    set through `derived`, so they can never be out of date.
+    """
+
+    def __init__(self, **overrides):
+        unknown = set(overrides) - set(DEFAULTS)
+        if unknown:
+            raise KeyError(f"unknown parameters: {sorted(unknown)}")
+        values = copy.deepcopy(DEFAULTS)
+        for name, value in copy.deepcopy(overrides).items():
+            default = DEFAULTS[name]
+            if isinstance(default, dict) and isinstance(next(iter(default)), int):
+                # Tables keyed by count or level may come back from JSON as str
+                if isinstance(value, dict):
+                    value = {int(k): v for k, v in value.items()}
+            check(name, value, default)
+            if isinstance(default, dict):
+                # A partial table overrides only the entries it names
+                value = {**default, **value}
+            values[name] = value
+        validate(values)
+        self.__dict__["_values"] = values
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Params are read-only; use replace()")
+
+    def __eq__(self, other):
+        return isinstance(other, Params) and self.digest() == other.digest()
+
+    def __repr__(self):
+        changed = {k: v for k, v in self._values.items() if v != DEFAULTS[k]}
+        return f"Params({changed})"
+
+    def replace(self, **changes) -> "Params":
+        values = copy.deepcopy(self._values)
+        values.update(changes)
+        return Params(**values)
+
+    def as_dict(self) -> dict:
+        return copy.deepcopy(self._values)
+
+    def derived(self, name: str, build):
+        """`build(self)`, computed once and kept with this parameter set."""
+        cache = self.__dict__.setdefault("_derived", {})
+        if name not in cache:
+            cache[name] = build(self)
+        return cache[name]
+
+    def digest(self) -> str:
+        encoded = json.dumps(self._values, sort_keys=True, default=str)
+        return hashlib.sha1(encoded.encode()).hexdigest()
@@ -0,0 +1,158 @@
+import heapq
+from collections import OrderedDict
+
+SQRT2 = 2**0.5
+
+# 8-connected neighbourhood: (dx, dy, step cost)
+STEPS = [
+    (1, 0, 1.0),
+    (-1, 0, 1.0),
+    (0, 1, 1.0),
+    (0, -1, 1.0),
+    (1, 1, SQRT2),
+    (1, -1, SQRT2),
+    (-1, 1, SQRT2),
+    (-1, -1, SQRT2),
+]
+
+
+def octile(a: tuple, b: tuple) -> float:
+    dx = abs(a[0] - b[0])
+    dy = abs(a[1] - b[1])
+    return max(dx, dy) + (SQRT2 - 1) * min(dx, dy)
+
+
+class PathPlanner:
+    """Grid A* over the static obstacle map with an LRU cache of paths.
+
+    Paths are cached per (start cell, goal cell) and only thrown away when
+    the set of blocked cells changes, so replanning toward an unchanged target
+    is a dict lookup.
+    """
+
+    def __init__(self, cell_size=100, cache_size=256, margin=20, max_expansions=20000):
+        self.cell_size = cell_size
+        self.cache_size = cache_size
+        self.margin = margin
+        self.max_expansions = max_expansions
+        self.blocked = frozenset()
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def cell(self, position: dict) -> tuple:
+        return (
+            int(position["x"] // self.cell_size),
+            int(position["y"] // self.cell_size),
+        )
+
+    def center(self, cell: tuple) -> dict:
+        return {
+            "x": (cell[0] + 0.5) * self.cell_size,
+            "y": (cell[1] + 0.5) * self.cell_size,
+        }
+
+    def update_map(self, obstacles: list) -> bool:
+        return self.set_blocked(frozenset(self.cell(o) for o in obstacles))
+
+    def set_blocked(self, blocked: frozenset) -> bool:
+        if blocked is self.blocked or blocked == self.blocked:
+            return False
+        self.blocked = blocked
+        self.cache.clear()
+        return True
+
+    def find_path(self, start: tuple, goal: tuple):
+        key = (start, goal)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return self.cache[key]
+
+        self.misses += 1
+        path = self._astar(start, goal)
+        self.cache[key] = path
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return path
+
+    def waypoints(self, start_position: dict, goal_position: dict) -> list:
+        start = self.cell(start_position)
+        goal = self.cell(goal_position)
+        path = self.find_path(start, goal)
+        if not path:
+            return [dict(goal_position)]
+        waypoints = [self.center(cell) for cell in path[:-1]]
+        waypoints.append(dict(goal_position))
+        return waypoints
+
+    def next_waypoint(self, start_position: dict, goal_position: dict) -> dict:
+        return self.waypoints(start_position, goal_position)[0]
+
+    def _astar(self, start: tuple, goal: tuple):
+        if start == goal:
+            return None
+
+        min_x = min(start[0], goal[0]) - self.margin
+        max_x = max(start[0], goal[0]) + self.margin
+        min_y = min(start[1], goal[1]) - self.margin
+        max_y = max(start[1], goal[1]) + self.margin
+
+        # The goal may sit against a wall; never treat the endpoints as blocked.
+        blocked = self.blocked - {start, goal}
+
+        came_from = {start: None}
+        cost = {start: 0.0}
+        frontier = [(octile(start, goal), 0.0, start)]
+        expansions = 0
+
+        while frontier:
+            _, g, current = heapq.heappop(frontier)
+            if current == goal:
+                return self._corners(came_from, goal)
+            if g > cost[current]:
+                continue
+            expansions += 1
+            if expansions > self.max_expansions:
+                return None
+
+            for dx, dy, step in STEPS:
+                nxt = (current[0] + dx, current[1] + dy)
+                if nxt in blocked:
+                    continue
+                if not (min_x <= nxt[0] <= max_x and min_y <= nxt[1] <= max_y):
+                    continue
+                # Don't cut corners between two blocked orthogonal cells
+                if (
+                    dx
+                    and dy
+                    and (
+                        (current[0] + dx, current[1]) in blocked
+                        or (current[0], current[1] + dy) in blocked
+                    )
+                ):
+                    continue
+                new_cost = g + step
+                if new_cost < cost.get(nxt, float("inf")):
+                    cost[nxt] = new_cost
+                    came_from[nxt] = current
+                    heapq.heappush(
+                        frontier, (new_cost + octile(nxt, goal), new_cost, nxt)
+                    )
+        return None
+
+    def _corners(self, came_from: dict, goal: tuple) -> tuple:
+        cells = [goal]
+        while came_from[cells[-1]] is not None:
+            cells.append(came_from[cells[-1]])
+        cells.reverse()
+
+        # Keep only the cells where the direction of travel changes
+        corners = []
+        for i in range(1, len(cells) - 1):
+            before = (cells[i][0] - cells[i - 1][0], cells[i][1] - cells[i - 1][1])
+            after = (cells[i + 1][0] - cells[i][0], cells[i + 1][1] - cells[i][1])
+            if before != after:
+                corners.append(cells[i])
+        corners.append(goal)
+        return tuple(corners)
@@ -0,0 +1,69 @@
+"""A per-tick repulsive potential field around our position.
+
+Each threat adds `attack_damage * exp(-d² / falloff)` to every cell of a small
+grid centred on us. The field is built once per tick in a single NumPy pass.
+The analytic gradient is stored with it, so retreating is a single lookup of
+the downhill direction at our cell, with no loop over threats. The default
+falloff matches the 80000 squared-distance radius that peripheral_danger uses
+for enemies.
+"""
+
+import numpy as np
+
+from tracking import threat_position
+
+
+class PotentialField:
+    def __init__(
+        self,
+        threats: list,
+        center: dict,
+        radius=200,
+        cell_size=50,
+        falloff=80000,
+        predicted=False,
+    ):
+        self.cell_size = cell_size
+        self.center = np.array([center["x"], center["y"]], dtype=float)
+        steps = np.arange(-(radius // cell_size), radius // cell_size + 1)
+        self.offsets = steps * cell_size
+        gx, gy = np.meshgrid(self.offsets, self.offsets, indexing="ij")
+        self.cells = np.stack([gx, gy], axis=-1) + self.center
+
+        if threats:
+            points = np.array(
+                [
+                    (p["x"], p["y"])
+                    for p in (threat_position(t, predicted) for t in threats)
+                ],
+                dtype=float,
+            )
+            damage = np.array([t["attack_damage"] for t in threats], dtype=float)
+            offsets = self.cells[:, :, None, :] - points
+            terms = damage * np.exp(-(offsets**2).sum(axis=-1) / falloff)
+            self.potential = terms.sum(axis=-1)
+            self.gradient = (terms[..., None] * offsets).sum(axis=-2) * (-2 / falloff)
+        else:
+            self.potential = np.zeros(gx.shape)
+            self.gradient = np.zeros(gx.shape + (2,))
+
+    def index(self, position: dict) -> tuple:
+        offset = np.array([position["x"], position["y"]]) - self.center
+        i = np.clip(
+            np.rint(offset / self.cell_size).astype(int) + len(self.offsets) // 2,
+            0,
+            len(self.offsets) - 1,
+        )
+        return int(i[0]), int(i[1])
+
+    def value(self, position: dict) -> float:
+        return float(self.potential[self.index(position)])
+
+    def downhill(self, position: dict, reach=200) -> dict:
+        """`reach` units from `position` along the steepest descent."""
+        gradient = self.gradient[self.index(position)]
+        norm = np.linalg.norm(gradient)
+        if norm == 0:
+            return dict(position)
+        step = -gradient / norm * reach
+        return {"x": position["x"] + step[0], "y": position["y"] + step[1]}
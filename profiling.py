@@ -0,0 +1,179 @@
+"""Profile the next N bot calls on a live server.
+
+An admin endpoint arms a `ProfileSession`. The request handlers run play() and
+cb_steering() through `Profiler.call`, which is a plain call while nothing is
+armed. An armed session profiles calls until N have finished. It then keeps:
+
+- "cprofile": deterministic cProfile stats as pstats text or a .prof dump
+- "sample": stacks of the calling thread sampled every `interval` seconds
+  from a background thread, in collapsed form for flamegraph.pl/speedscope
+- with `memory`, the tracemalloc diff between the first and the last call,
+  to find where those calls allocate
+"""
+
+import cProfile
+import io
+import marshal
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+MODES = ("cprofile", "sample")
+
+
+class ProfileSession:
+    def __init__(self, calls=100, mode="cprofile", memory=False, interval=0.001):
+        if mode not in MODES:
+            raise ValueError(f"unknown profiling mode: {mode}")
+        self.calls = calls
+        self.mode = mode
+        self.memory = memory
+        self.interval = interval
+        self.remaining = calls
+        self.elapsed = 0.0
+        self.profile = cProfile.Profile() if mode == "cprofile" else None
+        self.stacks = Counter()
+        self.thread = None
+        self.active = threading.Event()
+        self.finished = threading.Event()
+        self.sampler = None
+        self.snapshot = None
+        self.allocations = []
+
+    @property
+    def done(self) -> bool:
+        return self.finished.is_set()
+
+    def begin(self):
+        if self.memory and self.snapshot is None:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(10)
+            self.snapshot = tracemalloc.take_snapshot()
+        if self.mode == "sample":
+            self.thread = threading.get_ident()
+            if self.sampler is None:
+                self.sampler = threading.Thread(target=self._sample, daemon=True)
+                self.sampler.start()
+            self.active.set()
+        else:
+            self.profile.enable()
+
+    def end(self, elapsed: float):
+        if self.mode == "sample":
+            self.active.clear()
+        else:
+            self.profile.disable()
+        self.elapsed += elapsed
+        self.remaining -= 1
+        if self.remaining <= 0 and not self.done:
+            self._finish()
+
+    def _finish(self):
+        if self.memory:
+            diff = tracemalloc.take_snapshot().compare_to(self.snapshot, "lineno")
+            self.allocations = [str(stat) for stat in diff[:25]]
+            self.snapshot = None
+            tracemalloc.stop()
+        self.finished.set()
+
+    def _sample(self):
+        while not self.finished.is_set():
+            if not self.active.wait(0.1):
+                continue
+            frame = sys._current_frames().get(self.thread)
+            if frame is not None and self.active.is_set():
+                self.stacks[collapse(frame)] += 1
+            time.sleep(self.interval)
+
+    def pstats_text(self, sort="cumulative", limit=50) -> str:
+        out = io.StringIO()
+        pstats.Stats(self.profile, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def pstats_dump(self) -> bytes:
+        """The stats in the format `pstats.Stats(path)` and snakeviz read."""
+        self.profile.create_stats()
+        return marshal.dumps(self.profile.stats)
+
+    def collapsed(self) -> str:
+        """One "outer;inner;leaf count" line per stack, for flamegraph.pl."""
+        if self.mode == "cprofile":
+            return collapse_pstats(self.profile)
+        return "".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common())
+
+    def status(self) -> dict:
+        return {
+            "mode": self.mode,
+            "calls": self.calls,
+            "remaining": max(self.remaining, 0),
+            "done": self.done,
+            "mean_ms": self.elapsed / max(self.calls - self.remaining, 1) * 1000,
+            "memory": self.memory,
+        }
+
+
+def frame_name(code) -> str:
+    return (
+        f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})"
+    )
+
+
+def collapse(frame) -> str:
+    names = []
+    while frame is not None:
+        names.append(frame_name(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def collapse_pstats(profile) -> str:
+    """Approximate collapsed stacks from cProfile's caller graph.
+
+    cProfile only keeps caller -> callee edges, so each function's own time is
+    attributed to its heaviest caller chain.
+    """
+    profile.create_stats()
+    stats = profile.stats
+    lines = []
+    for func, (_, _, own_time, _, callers) in stats.items():
+        chain = [func]
+        seen = {func}
+        while callers:
+            caller = max(callers, key=lambda c: callers[c][3])
+            if caller in seen or caller not in stats:
+                break
+            chain.append(caller)
+            seen.add(caller)
+            callers = stats[caller][4]
+        micros = int(own_time * 1e6)
+        if micros:
+            names = [f"{f[2]} ({f[0].rsplit('/', 1)[-1]}:{f[1]})" for f in chain]
+            lines.append(f"{';'.join(reversed(names))} {micros}\n")
+    return "".join(sorted(lines))
+
+
+class Profiler:
+    def __init__(self):
+        self.session = None
+        self.lock = threading.Lock()
+
+    def start(self, **options) -> ProfileSession:
+        with self.lock:
+            if self.session is not None and not self.session.done:
+                raise RuntimeError("a profiling session is already running")
+            self.session = ProfileSession(**options)
+            return self.session
+
+    def call(self, fn, *args):
+        session = self.session
+        if session is None or session.done:
+            return fn(*args)
+        start = time.perf_counter()
+        session.begin()
+        try:
+            return fn(*args)
+        finally:
+            session.end(time.perf_counter() - start)
@@ -0,0 +1,196 @@
+import time
+from itertools import permutations
+
+
+def dist_squared(a: dict, b: dict) -> float:
+    return (a["x"] - b["x"]) ** 2 + (a["y"] - b["y"]) ** 2
+
+
+def average_health_bonus(player: dict) -> float:
+    return 200  # Assume players have an average of 2 potions
+
+
+def stop_key(stop: dict) -> tuple:
+    # Ids are only unique within a type: an enemy and an item can share one
+    return stop["type"], stop["id"]
+
+
+class RoutePlanner:
+    """Plans a short tour over the top-K candidates for the best XP per second.
+
+    Candidates are ranked by `values` when the caller has scored them, or
+    else by their own xp per second. Each stop is worth its value times the
+    time to reach it from here, so a tour is rated in the same terms as the
+    scores; without values that is just its xp. Small candidate sets are
+    solved exactly within `time_budget` seconds; larger sets, or a blown
+    budget, fall back to greedy insertion plus 2-opt. The route is kept
+    between ticks as a list of (type, id) keys and repaired in place: stops
+    that disappeared or are no longer worth anything are dropped and new
+    candidates are inserted only where they raise the tour's rate.
+    """
+
+    def __init__(
+        self,
+        top_k=6,
+        exact_limit=5,
+        time_budget=0.002,
+        exponent=0.7,
+        health_bonus=None,
+    ):
+        self.top_k = top_k
+        self.exact_limit = exact_limit
+        self.time_budget = time_budget
+        self.exponent = exponent
+        self.health_bonus = health_bonus or average_health_bonus
+        self.route = []
+        self.worth = {}
+        self.full_solves = 0
+        self.repairs = 0
+
+    def plan(
+        self, own_player: dict, candidates: list, values: list = None, exponent=None
+    ) -> dict:
+        """The route's first stop; `exponent` replaces the travel exponent."""
+        if exponent is not None:
+            self.exponent = exponent
+        if not candidates:
+            self.route = []
+            return {}
+
+        times = [self._stop_time(own_player, c, c["distance"]) for c in candidates]
+        if values is None:
+            values = [c["xp"] / t for c, t in zip(candidates, times)]
+        speed = self._speed(own_player)
+        by_key = {}
+        self.worth = {}
+        for candidate, value, seconds in zip(candidates, values, times):
+            if value > 0 and candidate["xp"] > 0:
+                by_key[stop_key(candidate)] = candidate
+                self.worth[stop_key(candidate)] = value * seconds
+        ranked = sorted(
+            zip(values, range(len(candidates))), key=lambda vi: vi[0], reverse=True
+        )
+        top = [
+            candidates[i]
+            for _, i in ranked[: self.top_k]
+            if stop_key(candidates[i]) in by_key
+        ]
+        if not top:
+            self.route = []
+            return {}
+
+        route = [by_key[key] for key in self.route if key in by_key]
+        if route:
+            self.repairs += 1
+            route = self._repair(own_player, route, top, speed)
+        else:
+            self.full_solves += 1
+            route = self._solve(own_player, top, speed)
+
+        self.route = [stop_key(stop) for stop in route]
+        return route[0] if route else {}
+
+    def _speed(self, own_player: dict) -> float:
+        e = self.exponent
+        return 15000**e + own_player["levelling"]["speed"] * 500**e
+
+    def _kill_time(self, own_player: dict, stop: dict) -> float:
+        health = stop.get("health")
+        if health is None:
+            return 0
+        if stop["type"] == "player":
+            health += self.health_bonus(stop)
+        return (health / own_player["attack_damage"]) * 0.5
+
+    def _stop_time(self, own_player: dict, stop: dict, distance: float) -> float:
+        e = self.exponent
+        kill = self._kill_time(own_player, stop)
+        return kill + distance**e / self._speed(own_player) + 1e-9
+
+    def _rate(self, own_player: dict, route: list, speed: float):
+        """Best XP/s over every prefix of the route and the prefix length."""
+        e = self.exponent
+        here = own_player["position"]
+        xp = 0
+        seconds = 1e-9
+        best_rate = float("-inf")
+        best_len = 0
+        for i, stop in enumerate(route):
+            seconds += dist_squared(here, stop["position"]) ** e / speed
+            seconds += self._kill_time(own_player, stop)
+            xp += self.worth[stop_key(stop)]
+            here = stop["position"]
+            if xp / seconds > best_rate:
+                best_rate = xp / seconds
+                best_len = i + 1
+        return best_rate, best_len
+
+    def _solve(self, own_player: dict, stops: list, speed: float) -> list:
+        if len(stops) <= self.exact_limit:
+            route = self._exact(own_player, stops, speed)
+            if route is not None:
+                return route
+        route = self._greedy(own_player, stops, speed)
+        return self._two_opt(own_player, route, speed)
+
+    def _exact(self, own_player: dict, stops: list, speed: float):
+        deadline = time.perf_counter() + self.time_budget
+        best_rate = float("-inf")
+        best = []
+        for order in permutations(stops):
+            if time.perf_counter() > deadline:
+                return None
+            rate, length = self._rate(own_player, order, speed)
+            if rate > best_rate:
+                best_rate = rate
+                best = list(order[:length])
+        return best
+
+    def _greedy(self, own_player: dict, stops: list, speed: float) -> list:
+        route = []
+        remaining = list(stops)
+        best_rate = float("-inf")
+        while remaining:
+            pick = None
+            for stop in remaining:
+                rate, _ = self._rate(own_player, route + [stop], speed)
+                if rate > best_rate:
+                    best_rate = rate
+                    pick = stop
+            if pick is None:
+                break
+            route.append(pick)
+            remaining.remove(pick)
+        return route
+
+    def _two_opt(self, own_player: dict, route: list, speed: float) -> list:
+        best_rate, best_len = self._rate(own_player, route, speed)
+        improved = True
+        while improved:
+            improved = False
+            for i in range(len(route) - 1):
+                for j in range(i + 1, len(route)):
+                    candidate = route[:i] + route[i : j + 1][::-1] + route[j + 1 :]
+                    rate, length = self._rate(own_player, candidate, speed)
+                    if rate > best_rate:
+                        route, best_rate, best_len = candidate, rate, length
+                        improved = True
+        return route[:best_len]
+
+    def _repair(self, own_player: dict, route: list, top: list, speed: float):
+        in_route = {stop_key(stop) for stop in route}
+        best_rate, _ = self._rate(own_player, route, speed)
+        for stop in top:
+            if stop_key(stop) in in_route:
+                continue
+            best_route = None
+            for i in range(len(route) + 1):
+                candidate = route[:i] + [stop] + route[i:]
+                rate, _ = self._rate(own_player, candidate, speed)
+                if rate > best_rate:
+                    best_rate = rate
+                    best_route = candidate
+            if best_route is not None:
+                route = best_route
+                in_route.add(stop_key(stop))
+        return self._two_opt(own_player, route, speed)
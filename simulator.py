@@ -0,0 +1,690 @@
+"""Headless, deterministic stand-in for the game server.
+
+Builds `LevelData` ticks from a seeded world (spawns, movement, combat, bombs
+and icicles), calls the bot's `play()` directly and applies the returned
+moves. Episodes are independent, so thousands of them can be spread over a
+process pool:
+
+> python simulator.py --episodes 1000 --ticks 600 --processes 8
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import main
+from params import Params
+from staticmap import scratch_root
+
+TICK_SECONDS = 0.25
+MAP_SIZE = 4000
+OBSTACLE_SPACING = 50
+
+ENEMY_TYPES = {
+    "wolf": {"health": 60, "attack_damage": 8, "xp": 80, "speed": 30},
+    "ghoul": {"health": 120, "attack_damage": 12, "xp": 100, "speed": 20},
+    "tiny": {"health": 300, "attack_damage": 25, "xp": 400, "speed": 45},
+    "minotaur": {"health": 600, "attack_damage": 40, "xp": 600, "speed": 25},
+}
+# Spawn weights: coins are the most common drop
+ITEM_TYPES = ["coin"] * 6 + ["big_potion"] * 2 + ["ring", "speed_zapper"]
+ITEM_TYPES += ["chest", "power_up"]
+ITEM_XP = {"coin": 250, "chest": 300}
+STOCK_LIMITS = {"big_potion": 6, "ring": 5, "speed_zapper": 5}
+SPECIALS = ["bomb", "freeze", "shockwave"]
+
+ATTACK_RANGE = 16625
+AGGRO_RANGE = 90000
+PICKUP_RANGE = 2500
+COLLISION_RANGE = 3600
+OBSTACLE_RANGE = 35**2
+ZAP_RANGE = 200000
+LEVEL_XP = 500
+RESPAWN_TICKS = 20
+
+ATTACK_COOLDOWN = 2
+SHIELD_TICKS = 3
+SHIELD_COOLDOWN = 12
+DASH_COOLDOWN = 20
+SPECIAL_COOLDOWN = 20
+CLOAK_TICKS = 30
+ZAP_TICKS = 20
+FREEZE_TICKS = 12
+
+BOMB_FUSE = 8
+BOMB_RADIUS = 80000
+BOMB_DAMAGE = 120
+ICICLE_SPEED = 80
+ICICLE_DAMAGE = 30
+ICICLE_TICKS = 15
+SHOCKWAVE_RADIUS = 60000
+SHOCKWAVE_DAMAGE = 60
+
+
+def dist_squared(a: dict, b: dict) -> float:
+    return (a["x"] - b["x"]) ** 2 + (a["y"] - b["y"]) ** 2
+
+
+def step_toward(position: dict, goal: dict, step: float) -> dict:
+    dx = goal["x"] - position["x"]
+    dy = goal["y"] - position["y"]
+    length = (dx**2 + dy**2) ** 0.5
+    if length <= step:
+        return {"x": goal["x"], "y": goal["y"]}
+    return {
+        "x": position["x"] + dx / length * step,
+        "y": position["y"] + dy / length * step,
+    }
+
+
+class World:
+    def __init__(self, seed, n_players=3, n_enemies=12, n_items=40):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.tick = 0
+        self.next_id = 0
+        self.n_enemies = n_enemies
+        self.n_items = n_items
+        self.obstacles = self._walls()
+        self.obstacle_cells = {}
+        for obstacle in self.obstacles:
+            self.obstacle_cells.setdefault(self._cell(obstacle), []).append(obstacle)
+
+        self.me = self._new_player()
+        self.opponents = [self._new_player() for _ in range(n_players)]
+        self.enemies = [self._new_enemy() for _ in range(n_enemies)]
+        self.items = []
+        while len(self.items) < n_items:
+            self.items.extend(self._new_clump())
+        self.hazards = []
+        self.stats = {
+            "xp": 0,
+            "kills": 0,
+            "deaths": 0,
+            "pickups": 0,
+            "damage_taken": 0,
+            "errors": 0,
+        }
+
+    # Spawning
+
+    def _id(self, prefix: str) -> str:
+        self.next_id += 1
+        return f"{prefix}{self.seed}-{self.next_id}"
+
+    def _random_position(self, margin=100) -> dict:
+        return {
+            "x": self.rng.uniform(margin, MAP_SIZE - margin),
+            "y": self.rng.uniform(margin, MAP_SIZE - margin),
+        }
+
+    def _walls(self) -> list:
+        obstacles = []
+        for _ in range(6):
+            start = self._random_position(margin=400)
+            length = self.rng.randrange(300, 900, OBSTACLE_SPACING)
+            horizontal = self.rng.random() < 0.5
+            for offset in range(0, length, OBSTACLE_SPACING):
+                obstacles.append(
+                    {
+                        "x": start["x"] + (offset if horizontal else 0),
+                        "y": start["y"] + (0 if horizontal else offset),
+                    }
+                )
+        return obstacles
+
+    def _new_player(self) -> dict:
+        player = {
+            "id": self._id("p"),
+            "type": "player",
+            "position": self._random_position(),
+            "levelling": {
+                "level": 1,
+                "available_skill_points": 0,
+                "attack": 0,
+                "speed": 0,
+                "health": 0,
+            },
+            "items": {"big_potions": [], "rings": [], "speed_zappers": []},
+            "special_equipped": self.rng.choice(SPECIALS),
+            "score": 0,
+            "xp": 0,
+            "timers": {},
+        }
+        player["health"] = self._max_health(player)
+        return player
+
+    def _new_enemy(self) -> dict:
+        kind = self.rng.choice(list(ENEMY_TYPES))
+        return {
+            "id": self._id("e"),
+            "type": kind,
+            "position": self._random_position(),
+            "health": ENEMY_TYPES[kind]["health"],
+            "attack_damage": ENEMY_TYPES[kind]["attack_damage"],
+            "timers": {},
+        }
+
+    def _new_clump(self) -> list:
+        # Items spawn in clumps around a random centre
+        centre = self._random_position(margin=300)
+        clump = []
+        for _ in range(self.rng.randint(3, 8)):
+            kind = self.rng.choice(ITEM_TYPES)
+            item = {
+                "id": self._id("i"),
+                "type": kind,
+                "position": {
+                    "x": centre["x"] + self.rng.uniform(-200, 200),
+                    "y": centre["y"] + self.rng.uniform(-200, 200),
+                },
+            }
+            if kind == "chest":
+                item["health"] = 100
+            if kind == "power_up":
+                item["power"] = self.rng.choice(SPECIALS)
+            clump.append(item)
+        return clump
+
+    # Derived stats
+
+    def _max_health(self, player: dict) -> int:
+        return 100 + 10 * player["levelling"]["health"]
+
+    def _attack_damage(self, player: dict) -> int:
+        return 20 + 3 * player["levelling"]["attack"]
+
+    def _speed(self, player: dict) -> float:
+        if self._active(player, "frozen"):
+            return 0
+        speed = 40 + 3 * player["levelling"]["speed"]
+        return speed / 2 if self._active(player, "zapped") else speed
+
+    def _active(self, entity: dict, timer: str) -> bool:
+        return entity.get("timers", {}).get(timer, -1) >= self.tick
+
+    def _ready(self, entity: dict, timer: str) -> bool:
+        return entity.get("timers", {}).get(timer, -1) <= self.tick
+
+    def _alive(self, entity: dict) -> bool:
+        return entity["health"] > 0
+
+    # Snapshots sent to the bot
+
+    def _player_view(self, player: dict) -> dict:
+        return {
+            "id": player["id"],
+            "type": "player",
+            "position": dict(player["position"]),
+            "health": player["health"],
+            "max_health": self._max_health(player),
+            "attack_damage": self._attack_damage(player),
+            "levelling": dict(player["levelling"]),
+            "items": {k: list(v) for k, v in player["items"].items()},
+            "special_equipped": player["special_equipped"],
+            "is_frozen": self._active(player, "frozen"),
+            "is_zapped": self._active(player, "zapped"),
+            "is_cloaked": self._active(player, "cloaked"),
+            "shield_raised": self._active(player, "shield"),
+            "is_shield_ready": self._ready(player, "shield_ready"),
+            "score": player["score"],
+        }
+
+    def _enemy_view(self, enemy: dict) -> dict:
+        return {
+            "id": enemy["id"],
+            "type": enemy["type"],
+            "position": dict(enemy["position"]),
+            "health": enemy["health"],
+            "attack_damage": enemy["attack_damage"],
+            "is_frozen": self._active(enemy, "frozen"),
+            "is_zapped": self._active(enemy, "zapped"),
+        }
+
+    def _hazard_view(self, hazard: dict) -> dict:
+        return {
+            "id": hazard["id"],
+            "type": hazard["type"],
+            "position": dict(hazard["position"]),
+            "attack_damage": hazard["attack_damage"],
+            "status": hazard["status"],
+            "owner_id": hazard["owner_id"],
+        }
+
+    def _collisions(self, player: dict) -> list:
+        collisions = []
+        for other in self.enemies + self.opponents + [self.me] + self.items:
+            if other is player or other.get("health", 1) <= 0:
+                continue
+            if other["type"] not in ENEMY_TYPES and other["type"] not in (
+                "player",
+                "chest",
+            ):
+                continue
+            if dist_squared(player["position"], other["position"]) < COLLISION_RANGE:
+                collisions.append(self._collision(player, other, other["type"]))
+        for obstacle in self._nearby_obstacles(player["position"]):
+            if dist_squared(player["position"], obstacle) < COLLISION_RANGE:
+                collisions.append(
+                    self._collision(player, {"position": obstacle}, "wall")
+                )
+        return collisions
+
+    def _collision(self, player: dict, other: dict, kind: str) -> dict:
+        return {
+            "type": kind,
+            "relative_position": {
+                "x": other["position"]["x"] - player["position"]["x"],
+                "y": other["position"]["y"] - player["position"]["y"],
+            },
+        }
+
+    def level_data(self, player: dict, ticks: int) -> dict:
+        own_player = self._player_view(player)
+        own_player["collisions"] = self._collisions(player)
+        return {
+            "enemies": [self._enemy_view(e) for e in self.enemies],
+            "players": [
+                self._player_view(p)
+                for p in self.opponents + [self.me]
+                if p is not player and self._alive(p)
+            ],
+            "hazards": [self._hazard_view(h) for h in self.hazards],
+            "items": [dict(i, position=dict(i["position"])) for i in self.items],
+            "game_info": {
+                "map_name": f"sim-{self.seed}",
+                "time_remaining_s": int((ticks - self.tick) * TICK_SECONDS),
+            },
+            "own_player": own_player,
+            "obstacles": [dict(o) for o in self.obstacles],
+        }
+
+    # Applying moves
+
+    def apply_moves(self, player: dict, moves: list):
+        if not self._alive(player):
+            return
+        seen = set()
+        destination = None
+        dash = False
+        for move in moves:
+            key = repr(move)
+            if key in seen:
+                continue
+            seen.add(key)
+            if isinstance(move, dict):
+                if "move_to" in move:
+                    destination = move["move_to"]
+                    # The server ignores moves it can't parse
+                    if not np.isfinite([destination["x"], destination["y"]]).all():
+                        destination = None
+                elif "use" in move:
+                    self._use(player, move["use"])
+                elif "redeem_skill_point" in move:
+                    self._redeem(player, move["redeem_skill_point"])
+            elif move == "attack":
+                self._attack(player)
+            elif move == "shield" and self._ready(player, "shield_ready"):
+                player["timers"]["shield"] = self.tick + SHIELD_TICKS
+                player["timers"]["shield_ready"] = self.tick + SHIELD_COOLDOWN
+            elif move == "dash" and self._ready(player, "dash_ready"):
+                player["timers"]["dash_ready"] = self.tick + DASH_COOLDOWN
+                dash = True
+            elif move == "special":
+                self._special(player)
+
+        if destination is not None:
+            step = self._speed(player) * (4 if dash else 1)
+            self._move(player, destination, step)
+
+    def _redeem(self, player: dict, skill: str):
+        levelling = player["levelling"]
+        if levelling["available_skill_points"] > 0 and levelling[skill] < 20:
+            levelling[skill] += 1
+            levelling["available_skill_points"] -= 1
+
+    def _use(self, player: dict, item: str):
+        stock = player["items"].get(f"{item}s")
+        if not stock:
+            return
+        if item == "big_potion":
+            player["health"] = self._max_health(player)
+        elif item == "ring":
+            player["timers"]["cloaked"] = self.tick + CLOAK_TICKS
+        elif item == "speed_zapper":
+            target = self._nearest(
+                player,
+                [e for e in self.enemies if e["type"] == "tiny"] + self._others(player),
+                ZAP_RANGE,
+            )
+            if target is None:
+                return
+            target["timers"]["zapped"] = self.tick + ZAP_TICKS
+        stock.pop()
+
+    def _others(self, player: dict) -> list:
+        return [p for p in self.opponents + [self.me] if p is not player]
+
+    def _nearest(self, player: dict, candidates: list, limit: float):
+        best = None
+        best_distance = limit
+        for candidate in candidates:
+            if candidate.get("health", 1) <= 0:
+                continue
+            distance = dist_squared(player["position"], candidate["position"])
+            if distance < best_distance:
+                best = candidate
+                best_distance = distance
+        return best
+
+    def _attack(self, player: dict):
+        if not self._ready(player, "attack_ready"):
+            return
+        player["timers"]["attack_ready"] = self.tick + ATTACK_COOLDOWN
+        chests = [i for i in self.items if i["type"] == "chest"]
+        target = self._nearest(
+            player, self.enemies + self._others(player) + chests, ATTACK_RANGE
+        )
+        if target is not None:
+            self._damage(target, self._attack_damage(player), player)
+
+    def _special(self, player: dict):
+        if not self._ready(player, "special_ready"):
+            return
+        player["timers"]["special_ready"] = self.tick + SPECIAL_COOLDOWN
+        special = player["special_equipped"]
+        if special == "bomb":
+            self.hazards.append(
+                {
+                    "id": self._id("h"),
+                    "type": "bomb",
+                    "position": dict(player["position"]),
+                    "attack_damage": BOMB_DAMAGE,
+                    "status": "active",
+                    "owner_id": player["id"],
+                    "timers": {"explode": self.tick + BOMB_FUSE},
+                }
+            )
+        elif special == "freeze":
+            target = self._nearest(
+                player, self.enemies + self._others(player), float("inf")
+            )
+            if target is None:
+                return
+            self.hazards.append(
+                {
+                    "id": self._id("h"),
+                    "type": "icicle",
+                    "position": dict(player["position"]),
+                    "attack_damage": ICICLE_DAMAGE,
+                    "status": "active",
+                    "owner_id": player["id"],
+                    "heading": dict(target["position"]),
+                    "timers": {"melt": self.tick + ICICLE_TICKS},
+                }
+            )
+        elif special == "shockwave":
+            for other in self.enemies + self._others(player):
+                if (
+                    dist_squared(player["position"], other["position"])
+                    < SHOCKWAVE_RADIUS
+                ):
+                    self._damage(other, SHOCKWAVE_DAMAGE, player)
+
+    def _move(self, entity: dict, destination: dict, step: float):
+        if step <= 0:
+            return
+        position = step_toward(entity["position"], destination, step)
+        position["x"] = min(max(position["x"], 0), MAP_SIZE)
+        position["y"] = min(max(position["y"], 0), MAP_SIZE)
+        for obstacle in self._nearby_obstacles(position):
+            if dist_squared(position, obstacle) < OBSTACLE_RANGE:
+                return
+        entity["position"] = position
+
+    def _cell(self, position: dict) -> tuple:
+        return (
+            int(position["x"] // OBSTACLE_SPACING),
+            int(position["y"] // OBSTACLE_SPACING),
+        )
+
+    def _nearby_obstacles(self, position: dict) -> list:
+        cx, cy = self._cell(position)
+        nearby = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                nearby.extend(self.obstacle_cells.get((cx + dx, cy + dy), ()))
+        return nearby
+
+    # Combat and bookkeeping
+
+    def _damage(self, target: dict, amount: float, source: dict = None):
+        if target["health"] <= 0 or self._active(target, "shield"):
+            return
+        target["health"] -= amount
+        if target is self.me:
+            self.stats["damage_taken"] += amount
+        if target["health"] > 0:
+            return
+
+        if target["type"] == "chest":
+            self.items.remove(target)
+            xp = ITEM_XP["chest"]
+        elif target["type"] in ENEMY_TYPES:
+            xp = ENEMY_TYPES[target["type"]]["xp"]
+        else:
+            xp = 100 * target["levelling"]["level"]
+            target["timers"]["respawn"] = self.tick + RESPAWN_TICKS
+            if target is self.me:
+                self.stats["deaths"] += 1
+        if source is not None and source.get("type") == "player":
+            self._gain_xp(source, xp)
+            if source is self.me:
+                self.stats["kills"] += 1
+
+    def _gain_xp(self, player: dict, xp: float):
+        player["xp"] += xp
+        player["score"] += xp
+        if player is self.me:
+            self.stats["xp"] += xp
+        levelling = player["levelling"]
+        while player["xp"] >= LEVEL_XP * levelling["level"] and levelling["level"] < 20:
+            levelling["level"] += 1
+            levelling["available_skill_points"] += 1
+
+    def _pickups(self, player: dict):
+        for item in list(self.items):
+            if item["type"] == "chest":
+                continue
+            if dist_squared(player["position"], item["position"]) >= PICKUP_RANGE:
+                continue
+            kind = item["type"]
+            if kind in STOCK_LIMITS:
+                stock = player["items"][f"{kind}s"]
+                if len(stock) >= STOCK_LIMITS[kind]:
+                    continue
+                stock.append(1)
+            elif kind == "power_up":
+                player["special_equipped"] = item["power"]
+            else:
+                self._gain_xp(player, ITEM_XP.get(kind, 0))
+            self.items.remove(item)
+            if player is self.me:
+                self.stats["pickups"] += 1
+
+    def _opponent_moves(self, player: dict) -> list:
+        moves = ["attack"]
+        goal = self._nearest(player, self.enemies + self.items, float("inf"))
+        if goal is not None:
+            moves.append({"move_to": goal["position"]})
+        if player["health"] < self._max_health(player) * 0.4:
+            moves.append({"use": "big_potion"})
+        if self.rng.random() < 0.05:
+            moves.append("special")
+        return moves
+
+    def _update_enemies(self):
+        for enemy in self.enemies:
+            if not self._alive(enemy) or self._active(enemy, "frozen"):
+                continue
+            visible = [
+                p
+                for p in [self.me] + self.opponents
+                if self._alive(p) and not self._active(p, "cloaked")
+            ]
+            prey = self._nearest(enemy, visible, AGGRO_RANGE)
+            if prey is None:
+                continue
+            speed = ENEMY_TYPES[enemy["type"]]["speed"]
+            if self._active(enemy, "zapped"):
+                speed /= 2
+            self._move(enemy, prey["position"], speed)
+            in_range = dist_squared(enemy["position"], prey["position"]) < ATTACK_RANGE
+            if in_range and self._ready(enemy, "attack_ready"):
+                enemy["timers"]["attack_ready"] = self.tick + ATTACK_COOLDOWN
+                self._damage(prey, enemy["attack_damage"], enemy)
+
+    def _update_hazards(self):
+        owners = {p["id"]: p for p in [self.me] + self.opponents}
+        for hazard in list(self.hazards):
+            owner = owners.get(hazard["owner_id"])
+            if hazard["type"] == "bomb":
+                if hazard["timers"]["explode"] > self.tick:
+                    continue
+                for other in self.enemies + [self.me] + self.opponents:
+                    if (
+                        dist_squared(hazard["position"], other["position"])
+                        < BOMB_RADIUS
+                    ):
+                        self._damage(other, hazard["attack_damage"], owner)
+                self.hazards.remove(hazard)
+                continue
+
+            hazard["position"] = step_toward(
+                hazard["position"], hazard["heading"], ICICLE_SPEED
+            )
+            hit = None
+            for other in self.enemies + [self.me] + self.opponents:
+                if other is owner or not self._alive(other):
+                    continue
+                if dist_squared(hazard["position"], other["position"]) < PICKUP_RANGE:
+                    hit = other
+                    break
+            if hit is not None:
+                hit["timers"]["frozen"] = self.tick + FREEZE_TICKS
+                self._damage(hit, hazard["attack_damage"], owner)
+            if hit is not None or hazard["timers"]["melt"] <= self.tick:
+                self.hazards.remove(hazard)
+
+    def _respawn(self):
+        for player in [self.me] + self.opponents:
+            if (
+                not self._alive(player)
+                and player["timers"].get("respawn", 0) <= self.tick
+            ):
+                player["health"] = self._max_health(player)
+                player["position"] = self._random_position()
+                player["items"] = {"big_potions": [], "rings": [], "speed_zappers": []}
+        self.enemies = [e for e in self.enemies if self._alive(e)]
+        while len(self.enemies) < self.n_enemies:
+            self.enemies.append(self._new_enemy())
+        while len(self.items) < self.n_items:
+            self.items.extend(self._new_clump())
+
+    def step(self, bot, ticks: int) -> float:
+        self.tick += 1
+        level_data = main.LevelData(**self.level_data(self.me, ticks))
+        start = time.perf_counter()
+        try:
+            moves = bot(level_data)
+        except Exception:
+            # Like a failed request: the tick passes with no moves
+            self.stats["errors"] += 1
+            moves = []
+        latency = time.perf_counter() - start
+
+        self.apply_moves(self.me, moves or [])
+        for opponent in self.opponents:
+            self.apply_moves(opponent, self._opponent_moves(opponent))
+        for player in [self.me] + self.opponents:
+            if self._alive(player):
+                self._pickups(player)
+        self._update_enemies()
+        self._update_hazards()
+        self._respawn()
+        return latency
+
+
+def run_episode(
+    seed: int, ticks=600, strategy="play", log_dir=None, params=None, **world
+) -> dict:
+    random.seed(seed)
+    main.DEAD = False
+    main.PARAMS = Params(**(params or {}))
+    if log_dir is not None:
+        main.LOG_DIR = log_dir
+    bot = getattr(main, strategy)
+
+    sim = World(seed, **world)
+    # Each seed is its own map, never played again
+    with scratch_root():
+        latencies = np.array([sim.step(bot, ticks) for _ in range(ticks)])
+    main.forget_bot(sim.me["id"])
+
+    seconds = ticks * TICK_SECONDS
+    result = {"seed": seed, "ticks": ticks, "strategy": strategy}
+    result.update(sim.stats)
+    result["xp_per_s"] = sim.stats["xp"] / seconds
+    result["latency_ms_mean"] = float(latencies.mean() * 1000)
+    result["latency_ms_p99"] = float(np.percentile(latencies, 99) * 1000)
+    return result
+
+
+def _run_episode(kwargs: dict) -> dict:
+    return run_episode(**kwargs)
+
+
+def run_episodes(seeds, processes=None, **kwargs) -> list:
+    jobs = [dict(kwargs, seed=seed) for seed in seeds]
+    if processes == 1:
+        return [_run_episode(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        chunksize = max(1, len(jobs) // ((processes or os.cpu_count() or 1) * 4))
+        return list(pool.map(_run_episode, jobs, chunksize=chunksize))
+
+
+def summarize(results: list) -> dict:
+    summary = {"episodes": len(results)}
+    for key in ("xp_per_s", "kills", "deaths", "pickups", "errors", "latency_ms_mean"):
+        summary[key] = float(np.mean([r[key] for r in results])) if results else 0.0
+    summary["latency_ms_p99"] = (
+        float(np.max([r["latency_ms_p99"] for r in results])) if results else 0.0
+    )
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--episodes", type=int, default=100)
+    parser.add_argument("--ticks", type=int, default=600)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--strategy", default="play")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    log_dir = tempfile.mkdtemp(prefix="bot-sim-")
+    results = run_episodes(
+        range(args.seed, args.seed + args.episodes),
+        processes=args.processes,
+        ticks=args.ticks,
+        strategy=args.strategy,
+        log_dir=log_dir,
+    )
+    for key, value in summarize(results).items():
+        print(f"{key}: {value}")
+    print(f"death logs: {log_dir}")
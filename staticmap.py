@@ -0,0 +1,164 @@
+"""Per-map static arrays built once and shared by every worker process.
+
+A map's obstacle coordinates and its occupancy grid at the planner's cell
+size are written as .npy files into a directory named after a digest of the
+obstacles. The directory lives under STATIC_MAP_DIR, which defaults to
+/dev/shm where it exists, so it sits in RAM. Workers open the files with
+`mmap_mode="r"`, so every process reads the same physical pages. Memory stays
+flat as workers are added, and a new worker attaches to maps that are already
+built instead of rebuilding them.
+
+The first worker to see a map builds it in a private temporary directory and
+renames it into place. The rename is atomic, so a reader never sees a
+half-written map. If two workers race, the loser discards its copy and
+attaches to the winner's.
+
+Attaching touches a map's directory. Once more than CAPACITY maps exist, the
+least recently attached ones that this process doesn't hold are removed. A
+worker that still has one mapped keeps reading it until it lets go, and a
+later worker simply rebuilds it. Simulations and tests build maps that are
+never seen again, so they use `scratch_root` instead.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+
+ROOT = os.environ.get(
+    "STATIC_MAP_DIR",
+    os.path.join(
+        "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "bot-maps"
+    ),
+)
+
+CAPACITY = int(os.environ.get("STATIC_MAP_CAPACITY", 64))
+
+# Maps this process has attached to, by path
+ATTACHED = OrderedDict()
+
+
+def map_digest(xy: np.ndarray, cell_size: int) -> str:
+    digest = hashlib.sha1(np.ascontiguousarray(xy, dtype=float).tobytes())
+    digest.update(str(cell_size).encode())
+    return digest.hexdigest()[:20]
+
+
+def occupancy(xy: np.ndarray, cell_size: int) -> tuple:
+    """(origin cell, grid) with 1 for every cell holding an obstacle."""
+    if len(xy) == 0:
+        return np.zeros(2, dtype=np.int64), np.zeros((0, 0), dtype=np.uint8)
+    cells = np.floor_divide(xy, cell_size).astype(np.int64)
+    origin = cells.min(axis=0)
+    cells -= origin
+    grid = np.zeros(cells.max(axis=0) + 1, dtype=np.uint8)
+    grid[cells[:, 0], cells[:, 1]] = 1
+    return origin, grid
+
+
+class StaticMap:
+    def __init__(self, path: str):
+        self.path = path
+        self.xy = np.load(os.path.join(path, "xy.npy"), mmap_mode="r")
+        self.grid = np.load(os.path.join(path, "grid.npy"), mmap_mode="r")
+        meta = np.load(os.path.join(path, "meta.npy"))
+        self.origin = meta[:2]
+        self.cell_size = int(meta[2])
+        self._blocked = None
+
+    def __len__(self):
+        return len(self.xy)
+
+    @property
+    def blocked(self) -> frozenset:
+        """Blocked planner cells, derived from the shared grid once per process."""
+        if self._blocked is None:
+            cells = np.argwhere(self.grid) + self.origin
+            self._blocked = frozenset(map(tuple, cells.tolist()))
+        return self._blocked
+
+
+def static_map(xy: np.ndarray, cell_size=100, root=None) -> StaticMap:
+    """Attach to the map holding obstacles `xy`, building it if no worker has."""
+    path = os.path.join(root or ROOT, map_digest(xy, cell_size))
+    if path in ATTACHED:
+        ATTACHED.move_to_end(path)
+        return ATTACHED[path]
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        publish(path, xy, cell_size)
+        evict(os.path.dirname(path))
+    try:
+        ATTACHED[path] = StaticMap(path)
+    except FileNotFoundError:
+        # Evicted by another worker between the check and the load
+        publish(path, xy, cell_size)
+        ATTACHED[path] = StaticMap(path)
+    if len(ATTACHED) > 32:
+        ATTACHED.popitem(last=False)
+    return ATTACHED[path]
+
+
+def last_attached(path: str) -> float:
+    try:
+        return os.stat(path).st_mtime
+    except FileNotFoundError:
+        return 0.0
+
+
+def evict(root: str, capacity=None):
+    """Remove the least recently attached maps beyond `capacity`."""
+    capacity = CAPACITY if capacity is None else capacity
+    try:
+        names = [name for name in os.listdir(root) if not name.startswith(".")]
+    except FileNotFoundError:
+        return
+    paths = [os.path.join(root, name) for name in names]
+    stale = [path for path in paths if path not in ATTACHED]
+    stale.sort(key=last_attached)
+    for path in stale[: max(len(paths) - capacity, 0)]:
+        # Renamed out of the way first, so a reader sees all of a map or none
+        doomed = tempfile.mkdtemp(dir=root, prefix=".evicting-")
+        try:
+            os.rename(path, os.path.join(doomed, "map"))
+        except OSError:
+            pass
+        shutil.rmtree(doomed, ignore_errors=True)
+
+
+@contextmanager
+def scratch_root():
+    """Build maps under a temporary ROOT that is removed on exit."""
+    global ROOT
+    saved = ROOT
+    ROOT = tempfile.mkdtemp(prefix="bot-maps-", dir=os.path.dirname(saved))
+    try:
+        yield ROOT
+    finally:
+        for path in [path for path in ATTACHED if path.startswith(ROOT)]:
+            del ATTACHED[path]
+        shutil.rmtree(ROOT, ignore_errors=True)
+        ROOT = saved
+
+
+def publish(path: str, xy: np.ndarray, cell_size: int):
+    root = os.path.dirname(path)
+    os.makedirs(root, exist_ok=True)
+    building = tempfile.mkdtemp(dir=root, prefix=".building-")
+    try:
+        origin, grid = occupancy(np.asarray(xy, dtype=float), cell_size)
+        np.save(os.path.join(building, "xy.npy"), np.asarray(xy, dtype=float))
+        np.save(os.path.join(building, "grid.npy"), grid)
+        np.save(os.path.join(building, "meta.npy"), np.append(origin, cell_size))
+        os.rename(building, path)
+    except OSError:
+        # Another worker published it first
+        if not os.path.isdir(path):
+            raise
+    finally:
+        shutil.rmtree(building, ignore_errors=True)
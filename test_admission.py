@@ -0,0 +1,67 @@
+import unittest
+from types import SimpleNamespace
+
+from admission import Admission
+
+
+def entity(x, y=0):
+    return {"position": {"x": x, "y": y}}
+
+
+def tick(items=(), enemies=()):
+    return SimpleNamespace(
+        own_player={"position": {"x": 0, "y": 0}},
+        items=list(items),
+        enemies=list(enemies),
+        players=[],
+        hazards=[],
+    )
+
+
+class TestAdmission(unittest.TestCase):
+    def test_keeps_the_nearest_in_order(self):
+        admission = Admission()
+        entities = [entity(x) for x in (50, -10, 300, 20, -200)]
+        kept = admission.nearest("items", {"x": 0, "y": 0}, entities, 3)
+        self.assertEqual([e["position"]["x"] for e in kept], [50, -10, 20])
+        self.assertEqual(admission.counts["capped_items"], 1)
+
+    def test_under_the_cap_is_untouched(self):
+        admission = Admission()
+        entities = [entity(1)]
+        self.assertIs(
+            admission.nearest("items", {"x": 0, "y": 0}, entities, 1), entities
+        )
+        self.assertEqual(admission.nearest("items", {"x": 0, "y": 0}, entities, 0), [])
+        self.assertEqual(admission.counts["capped_items"], 1)
+
+    def test_admit_caps_each_category(self):
+        admission = Admission()
+        level_data = tick(items=[entity(x) for x in range(10)], enemies=[entity(5)])
+        total = admission.admit(level_data, {"items": 4, "enemies": 4})
+        self.assertEqual(total, 11)
+        self.assertEqual(len(level_data.items), 4)
+        self.assertEqual(len(level_data.enemies), 1)
+        self.assertEqual(dict(admission.counts), {"ticks": 1, "capped_items": 1})
+
+    def test_overload(self):
+        admission = Admission(smoothing=0.5)
+        self.assertFalse(admission.overloaded(100, 100, latency_ms=50))
+        self.assertTrue(admission.overloaded(101, 100, latency_ms=50))
+        admission.observe(0.2)
+        self.assertEqual(admission.latency_ms, 100)
+        self.assertTrue(admission.overloaded(10, 100, latency_ms=50))
+        admission.observe(0)
+        self.assertFalse(admission.overloaded(10, 100, latency_ms=50))
+        self.assertEqual(admission.counts["overload_entities"], 1)
+        self.assertEqual(admission.counts["overload_latency"], 1)
+
+    def test_body_size(self):
+        admission = Admission(max_body=10)
+        self.assertTrue(admission.body_allowed(10))
+        self.assertFalse(admission.body_allowed(11))
+        self.assertEqual(admission.report()["body_too_large"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+
+from behavior import (
+    FAILURE,
+    SUCCESS,
+    Action,
+    Blackboard,
+    Condition,
+    Selector,
+    Sequence,
+    compile_tree,
+    run,
+)
+
+
+def record(name, result=None):
+    def fn(tick):
+        tick.log.append(name)
+        return result
+
+    return fn
+
+
+class TestBehaviorTree(unittest.TestCase):
+    def setUp(self):
+        self.tick = Blackboard(log=[])
+
+    def test_sequence_stops_at_first_failure(self):
+        tree = Sequence(
+            Action("a", record("a")),
+            Condition("no", record("no", False)),
+            Action("b", record("b")),
+        )
+        self.assertFalse(run(compile_tree(tree), self.tick))
+        self.assertEqual(self.tick.log, ["a", "no"])
+
+    def test_selector_stops_at_first_success(self):
+        tree = Selector(
+            Condition("no", record("no", False)),
+            Action("a", record("a")),
+            Action("b", record("b")),
+        )
+        self.assertTrue(run(compile_tree(tree), self.tick))
+        self.assertEqual(self.tick.log, ["no", "a"])
+
+    def test_action_returning_false_fails(self):
+        tree = Selector(Action("a", record("a", False)), Action("b", record("b")))
+        self.assertTrue(run(compile_tree(tree), self.tick))
+        self.assertEqual(self.tick.log, ["a", "b"])
+
+    def test_records_visited_nodes(self):
+        tree = Sequence(
+            Selector(Condition("no", record("no", False)), Action("a", record("a"))),
+            Action("b", record("b", False)),
+        )
+        visited = []
+        self.assertFalse(run(compile_tree(tree), self.tick, visited))
+        self.assertEqual(visited, ["a"])
+
+    def test_conditions_are_cached_within_a_tick(self):
+        shared = Condition("ready", record("ready", True))
+        tree = Sequence(shared, Action("a", record("a")), shared)
+        compiled = compile_tree(tree)
+        run(compiled, self.tick)
+        self.assertEqual(self.tick.log, ["ready", "a"])
+
+        tick = Blackboard(log=[])
+        run(compiled, tick)
+        self.assertEqual(tick.log, ["ready", "a"])
+
+    def test_compiles_to_flat_table(self):
+        tree = Sequence(
+            Selector(Condition("c", record("c")), Action("a", record("a"))),
+            Action("b", record("b")),
+        )
+        table, entry = compile_tree(tree)
+        self.assertEqual(len(table), 3)
+        names = {row[1]: row for row in table}
+        self.assertEqual(table[entry][1], "c")
+        # Condition success skips the alternative and jumps to "b"
+        self.assertEqual(table[names["c"][3]][1], "b")
+        self.assertEqual(names["b"][3:], (SUCCESS, FAILURE))
+
+    def test_value_cache(self):
+        calls = []
+        tick = Blackboard()
+        tick.value("x", lambda t: calls.append(1) or 5)
+        self.assertEqual(tick.value("x", lambda t: calls.append(1) or 5), 5)
+        self.assertEqual(len(calls), 1)
+
+    def test_rejects_unknown_nodes(self):
+        with self.assertRaises(TypeError):
+            compile_tree(Sequence(object()))
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+
+from blackbox import BlackBox, frame, load
+
+
+def own_player(health=100, x=0):
+    return {
+        "position": {"x": x, "y": 0},
+        "health": health,
+        "items": {"big_potions": [1, 2]},
+    }
+
+
+def entity(type, x, distance, health=None, xp=80):
+    return {
+        "type": type,
+        "position": {"x": x, "y": 0},
+        "distance": distance,
+        "health": health,
+        "attack_damage": 8 if health else None,
+        "xp": xp,
+    }
+
+
+class TestBlackBox(unittest.TestCase):
+    def test_keeps_the_last_ticks_in_order(self):
+        blackbox = BlackBox(capacity=3)
+        for x in range(5):
+            blackbox.record(own_player(x=x), [])
+            blackbox.decided(["attack", {"move_to": {"x": x, "y": 0}}])
+        ticks, _ = blackbox.ordered()
+        self.assertEqual(len(blackbox), 3)
+        self.assertEqual(ticks["x"].tolist(), [2, 3, 4])
+        self.assertEqual(ticks["moves"][-1], b'["attack",{"move_to":{"x":4,"y":0}}]')
+
+    def test_keeps_the_nearest_entities(self):
+        blackbox = BlackBox(capacity=2, max_entities=2)
+        blackbox.record(
+            own_player(),
+            [
+                entity("wolf", 300, 90000, health=60),
+                entity("coin", 10, 100),
+                entity("ghoul", 50, 2500, health=120),
+            ],
+        )
+        ticks, entities = blackbox.ordered()
+        self.assertEqual(ticks["entities"][0], 2)
+        self.assertEqual(entities["x"][0].tolist(), [10, 50])
+        self.assertEqual(entities["health"][0].tolist(), [0, 120])
+
+    def test_long_moves_are_truncated(self):
+        blackbox = BlackBox()
+        blackbox.record(own_player(), [])
+        moves = [{"speak": "x" * 1000}]
+        self.assertIs(blackbox.decided(moves), moves)
+        ticks, _ = blackbox.ordered()
+        self.assertEqual(len(ticks["moves"][0]), 512)
+
+    def test_dump_round_trip(self):
+        blackbox = BlackBox(capacity=4)
+        blackbox.record(own_player(health=40), [entity("wolf", 30, 900, health=60)])
+        blackbox.decided(["attack"])
+        blackbox.record(own_player(health=0), [entity("wolf", 20, 400, health=60)])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "deaths", "bot.npz")
+            blackbox.dump(path).result()
+            self.assertEqual(len(blackbox), 0)
+            df = frame(*load(path))
+        self.assertEqual(df["tick"].tolist(), [-1, 0])
+        self.assertEqual(df["kind"].tolist(), ["wolf", "wolf"])
+        self.assertEqual(df["own_health"].tolist(), [40, 0])
+        self.assertEqual(df["moves"].tolist(), ['["attack"]', ""])
+
+
+if __name__ == "__main__":
+    unittest.main()
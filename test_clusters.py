@@ -0,0 +1,59 @@
+import random
+import unittest
+
+import numpy as np
+
+from clusters import connected_components, find_clusters
+
+
+def item(x, y, xp=10):
+    return {"position": {"x": x, "y": y}, "xp": xp}
+
+
+def brute_force(xy, radius):
+    labels = list(range(len(xy)))
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(xy)):
+            for j in range(len(xy)):
+                close = ((xy[i] - xy[j]) ** 2).sum() < radius
+                if close and labels[i] != labels[j]:
+                    low = min(labels[i], labels[j])
+                    labels[i] = labels[j] = low
+                    changed = True
+    return labels
+
+
+class TestClusters(unittest.TestCase):
+    def test_chain_links_distant_ends(self):
+        items = [item(100 * i, 0) for i in range(5)] + [item(5000, 5000)]
+        clusters = find_clusters(items, 50000)
+        self.assertEqual(sorted(len(c) for c in clusters), [1, 5])
+        big = max(clusters, key=len)
+        self.assertEqual(big.xp, 50)
+        np.testing.assert_allclose(big.centroid, [200, 0])
+
+    def test_matches_brute_force(self):
+        rng = random.Random(0)
+        for _ in range(20):
+            xy = np.array(
+                [(rng.uniform(0, 2000), rng.uniform(0, 2000)) for _ in range(60)]
+            )
+            labels = connected_components(xy, 50000)
+            expected = brute_force(xy, 50000)
+            for i in range(len(xy)):
+                for j in range(len(xy)):
+                    self.assertEqual(labels[i] == labels[j], expected[i] == expected[j])
+
+    def test_spread(self):
+        clusters = find_clusters([item(0, 0), item(200, 0)], 50000)
+        self.assertEqual(len(clusters), 1)
+        self.assertAlmostEqual(clusters[0].spread(0.5), 200)
+
+    def test_no_items(self):
+        self.assertEqual(find_clusters([], 50000), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
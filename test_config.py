@@ -0,0 +1,83 @@
+import json
+import os
+import tempfile
+import unittest
+
+from config import Config
+from params import Params
+
+
+def doubled(params):
+    return params.bomb_distance * 2
+
+
+class TestConfig(unittest.TestCase):
+    def test_swaps_only_when_taken(self):
+        config = Config()
+        config.register("doubled", doubled)
+        config.submit({"bomb_distance": 10}, wait=True)
+        self.assertEqual(config.params.bomb_distance, 130000)
+        self.assertEqual(config.status()["pending"], 1)
+
+        params = config.take()
+        self.assertEqual(params.bomb_distance, 10)
+        # Tables were built before the swap
+        self.assertEqual(params.__dict__["_derived"], {"doubled": 20})
+        self.assertIsNone(config.take())
+        self.assertEqual(config.status()["version"], 1)
+
+    def test_unknown_names_are_rejected_up_front(self):
+        config = Config()
+        with self.assertRaises(KeyError):
+            config.submit({"not_a_param": 1})
+        self.assertIsNone(config.pending)
+
+    def test_bad_values_are_rejected_up_front(self):
+        config = Config()
+        for overrides in [{"threat_radius": "abc"}, {"potion_values": 5}]:
+            with self.assertRaises(TypeError):
+                config.submit(overrides)
+        self.assertEqual(config.version, 0)
+        self.assertIsNone(config.pending)
+
+    def test_newest_version_wins(self):
+        config = Config()
+        config.submit({"bomb_distance": 1}, wait=True)
+        config.submit({"bomb_distance": 2}, wait=True)
+        self.assertEqual(config.take().bomb_distance, 2)
+        # A late finisher from an older submission is ignored
+        config._prepare(1, Params(bomb_distance=1))
+        self.assertIsNone(config.take())
+
+    def test_failed_table_build_keeps_the_current_params(self):
+        config = Config()
+        config.register("broken", lambda params: 1 / 0)
+        config.submit({"bomb_distance": 1}, wait=True)
+        self.assertIsNone(config.take())
+        self.assertIn("ZeroDivisionError", config.status()["error"])
+
+    def test_reloads_the_file_when_it_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "config.json")
+            config = Config(path)
+            self.assertFalse(config.reload(wait=True))
+
+            with open(path, "w") as fp:
+                json.dump({"max_speed": 500, "potion_values": {"0": 1}}, fp)
+            self.assertTrue(config.reload(wait=True))
+            self.assertFalse(config.reload(wait=True))
+            params = config.take()
+            self.assertEqual(params.max_speed, 500)
+            self.assertEqual(params.potion_values[0], 1)
+            self.assertEqual(params.potion_values[1], 524)
+
+            with open(path, "w") as fp:
+                fp.write("{not json")
+            os.utime(path, ns=(0, 0))
+            self.assertFalse(config.reload(wait=True))
+            self.assertIn("JSONDecodeError", config.status()["error"])
+            self.assertEqual(config.params.max_speed, 500)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from death_tax import (
+    SHAPE,
+    DangerGrid,
+    DeathTax,
+    SituationLog,
+    fit,
+    main,
+    read_log,
+    situation,
+)
+
+
+def own_player(health=100, potions=0):
+    return {
+        "position": {"x": 0, "y": 0},
+        "health": health,
+        "max_health": 100,
+        "items": {"big_potions": [1] * potions},
+    }
+
+
+def threat(x, y, damage, type="wolf"):
+    return {"type": type, "position": {"x": x, "y": y}, "attack_damage": damage}
+
+
+class TestDangerGrid(unittest.TestCase):
+    def test_sums_neighbouring_cells(self):
+        grid = DangerGrid([threat(10, 10, 20), threat(300, 0, 30), threat(5000, 0, 99)])
+        self.assertEqual(grid.lookup({"x": 0, "y": 0}), (50, False))
+
+    def test_flags_players(self):
+        grid = DangerGrid([threat(10, 10, 20, type="player")])
+        self.assertEqual(grid.lookup({"x": 0, "y": 0}), (20, True))
+
+    def test_empty(self):
+        self.assertEqual(DangerGrid([]).lookup({"x": 0, "y": 0}), (0, False))
+
+
+class TestSituation(unittest.TestCase):
+    def test_bins(self):
+        self.assertEqual(situation(own_player(), 0, False), (0, 0, 4, 0))
+        self.assertEqual(situation(own_player(30, 5), 700, True), (3, 1, 1, 3))
+
+
+class TestDeathTax(unittest.TestCase):
+    def test_missing_table_means_no_tax(self):
+        tax = DeathTax.load("/nonexistent/death_tax.npz")
+        grid = DangerGrid([threat(0, 0, 500)])
+        self.assertEqual(tax.factor(own_player(), grid, {"x": 0, "y": 0}), 1)
+
+    def test_factor_is_clipped(self):
+        tax = DeathTax(np.ones(SHAPE))
+        grid = DangerGrid([])
+        self.assertEqual(tax.factor(own_player(), grid, {"x": 0, "y": 0}), 0)
+
+    def test_lookup_uses_candidate_situation(self):
+        table = np.zeros(SHAPE)
+        table[4, 0, 4, 0] = 0.1
+        tax = DeathTax(table)
+        grid = DangerGrid([threat(1000, 0, 500)])
+        self.assertAlmostEqual(tax.factor(own_player(), grid, {"x": 1000, "y": 0}), 0.5)
+        self.assertEqual(tax.factor(own_player(), grid, {"x": 0, "y": 0}), 1)
+
+
+class TestSituationLog(unittest.TestCase):
+    def test_marks_ticks_before_death(self):
+        log = SituationLog()
+        calm = DangerGrid([])
+        for _ in range(20):
+            log.record(own_player(), calm)
+        for _ in range(3):
+            log.record(own_player(10), DangerGrid([threat(0, 0, 500)]))
+        rows = log.rows().set_index(["threat", "health"])
+        self.assertEqual(rows.loc[(0, 4), "ticks"], 20)
+        self.assertEqual(rows.loc[(0, 4), "deaths"], 7)
+        self.assertEqual(rows.loc[(4, 0), "deaths"], 3)
+
+    def test_reset(self):
+        log = SituationLog()
+        log.record(own_player(), DangerGrid([]))
+        log.reset()
+        self.assertTrue(log.rows().empty)
+
+    def test_flush_without_death(self):
+        log = SituationLog()
+        for _ in range(3):
+            log.record(own_player(10), DangerGrid([threat(0, 0, 500)]))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "situations.log")
+            log.flush(path, "2024-01-01 00:00:00")
+            log.flush(path, "2024-01-01 00:00:01")
+            log.flush(path, "2024-01-01 00:00:02", died=True)
+            df = read_log(path)
+        # The survived block, then the death marking ticks flushed earlier
+        self.assertEqual(df["ticks"].tolist(), [3, 0])
+        self.assertEqual(df["deaths"].tolist(), [0, 3])
+
+    def test_due(self):
+        log = SituationLog(flush_every=2)
+        log.record(own_player(), DangerGrid([]))
+        self.assertFalse(log.due())
+        log.record(own_player(), DangerGrid([]))
+        self.assertTrue(log.due())
+
+    def test_same_life(self):
+        log = SituationLog()
+        self.assertTrue(log.same_life(("arena", 1), 120))
+        self.assertTrue(log.same_life(("arena", 1), 119))
+        self.assertTrue(log.same_life(("arena", 1), 121))
+        self.assertFalse(log.same_life(("arena", 1), 180))
+        self.assertFalse(log.same_life(("arena", 2), 179))
+
+
+class TestFit(unittest.TestCase):
+    def test_shrinks_toward_base_rate(self):
+        df = pd.DataFrame(
+            [[0, 0, 4, 0, 1000, 0], [4, 1, 0, 0, 10, 10]],
+            columns=["threat", "players", "health", "potions", "ticks", "deaths"],
+        )
+        odds = fit(df)
+        self.assertLess(odds[0, 0, 4, 0], odds[0, 0, 0, 0])
+        self.assertGreater(odds[4, 1, 0, 0], odds[0, 0, 0, 0])
+
+    def test_empty_log(self):
+        self.assertEqual(fit(pd.DataFrame()).sum(), 0)
+
+    def test_log_round_trip(self):
+        """Blocks appended by the bot are read back, fitted and exported."""
+        log = SituationLog()
+        for _ in range(5):
+            log.record(own_player(10), DangerGrid([threat(0, 0, 500)]))
+        with tempfile.TemporaryDirectory() as tmp:
+            log_path = os.path.join(tmp, "situations.log")
+            table_path = os.path.join(tmp, "death_tax.npz")
+            for _ in range(2):
+                df = log.rows()
+                df["timestamp"] = "2024-01-01 00:00:00"
+                with open(log_path, "a") as f:
+                    f.write(df.to_csv(index=False))
+            self.assertEqual(len(read_log(log_path)), 2)
+
+            main(["death_tax.py", log_path, table_path])
+            tax = DeathTax.load(table_path)
+            self.assertAlmostEqual(tax.table[4, 0, 0, 0], 1)
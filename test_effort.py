@@ -0,0 +1,46 @@
+import unittest
+
+import numpy as np
+
+from effort import HORIZON, PowTable, bench, pow_tables, travel
+from params import Params
+
+
+class TestEffort(unittest.TestCase):
+    def test_travel_matches_python_pow(self):
+        d2 = [0, 1, 17500, 50000, 5999999, 9000000]
+        expected = [d**0.7 for d in d2]
+        np.testing.assert_allclose(travel(d2, 0.7), expected, rtol=1e-12)
+
+    def test_table_close_to_power(self):
+        d2 = np.random.default_rng(0).uniform(100, HORIZON, 5000)
+        table = PowTable(0.6)
+        np.testing.assert_allclose(table(d2), np.power(d2, 0.6), rtol=1e-4)
+
+    def test_table_exact_at_samples_and_beyond_horizon(self):
+        table = PowTable(0.7, size=11)
+        samples = np.linspace(0, HORIZON**0.5, 11) ** 2
+        np.testing.assert_allclose(table(samples), np.power(samples, 0.7))
+        far = np.array([HORIZON * 2, HORIZON * 10])
+        np.testing.assert_array_equal(table(far), np.power(far, 0.7))
+
+    def test_table_only_used_for_its_exponent(self):
+        table = PowTable(0.7, size=8)
+        d2 = [12345.0]
+        self.assertEqual(travel(d2, 0.6, table)[0], 12345.0**0.6)
+        self.assertNotEqual(travel(d2, 0.7, table)[0], 12345.0**0.7)
+
+    def test_tables_follow_params(self):
+        self.assertEqual(pow_tables(Params()), {})
+        tables = pow_tables(Params(effort_lut=True, effort_lut_size=64))
+        self.assertEqual(sorted(tables), [0.6, 0.7])
+        self.assertEqual(len(tables[0.6].values), 64)
+
+    def test_bench_reports_error(self):
+        (row,) = bench(0.7, [100], 4096, repeat=1)
+        self.assertLess(row["max_rel_error"], 1e-4)
+        self.assertGreater(row["python_us"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
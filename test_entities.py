@@ -0,0 +1,43 @@
+import json
+import unittest
+
+from entities import EntityView, evolve
+
+
+class TestEntityView(unittest.TestCase):
+    def setUp(self):
+        self.item = {"id": "w1", "xp": 80, "position": {"x": 1, "y": 2}}
+
+    def test_evolve_leaves_base_untouched(self):
+        view = evolve(self.item, xp=120, position={"x": 5, "y": 6})
+        self.assertEqual(view["xp"], 120)
+        self.assertEqual(view["position"], {"x": 5, "y": 6})
+        self.assertEqual(view["id"], "w1")
+        self.assertEqual(self.item["xp"], 80)
+        self.assertEqual(self.item["position"], {"x": 1, "y": 2})
+
+    def test_views_are_read_only(self):
+        view = EntityView(self.item)
+        with self.assertRaises(TypeError):
+            view["xp"] = 1
+        with self.assertRaises(TypeError):
+            view["position"]["x"] = 1
+
+    def test_chained_evolve_flattens(self):
+        view = evolve(evolve(self.item, xp=1), health=5)
+        self.assertIs(view._base, self.item)
+        self.assertEqual(view.get("xp"), 1)
+        self.assertEqual(view.get("health"), 5)
+        self.assertEqual(len(view), 4)
+
+    def test_mapping_behaviour(self):
+        view = evolve(self.item, xp=1)
+        self.assertEqual(view, dict(self.item, xp=1))
+        self.assertEqual(sorted(view), ["id", "position", "xp"])
+        self.assertIn("id", view)
+        self.assertIsNone(view.get("health"))
+        self.assertEqual(json.loads(json.dumps(view.to_dict())), dict(view))
+
+
+if __name__ == "__main__":
+    unittest.main()
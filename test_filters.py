@@ -0,0 +1,92 @@
+import unittest
+
+from filters import FilterContext, FilterPipeline, peripheral_danger
+
+
+def player(health=100, potions=1, special=""):
+    return {
+        "health": health,
+        "max_health": 100,
+        "attack_damage": 20,
+        "position": {"x": 0, "y": 0},
+        "special_equipped": special,
+        "items": {"big_potions": [1] * potions, "rings": [], "speed_zappers": []},
+    }
+
+
+def candidate(type, x=100, y=0, **extra):
+    item = {"type": type, "position": {"x": x, "y": y}, "distance": x * x + y * y}
+    item.update(extra)
+    return item
+
+
+def context(own_player, enemies=(), players=(), hazards=(), game_info=None):
+    return FilterContext(
+        own_player,
+        list(enemies),
+        list(players),
+        list(hazards),
+        game_info or {"time_remaining_s": 1200},
+    )
+
+
+class TestFilterPipeline(unittest.TestCase):
+    def test_losing_battle_and_dead(self):
+        candidates = [
+            candidate("coin"),
+            candidate("wolf", health=50, attack_damage=200),
+            candidate("ghoul", health=0, attack_damage=5),
+            candidate("ghoul", health=30, attack_damage=5),
+        ]
+        allowed = FilterPipeline().apply(candidates, context(player()))
+        self.assertEqual(allowed.tolist(), [True, False, False, True])
+
+    def test_stock_full(self):
+        own_player = player(potions=5)
+        candidates = [candidate("big_potion"), candidate("ring")]
+        allowed = FilterPipeline().apply(candidates, context(own_player))
+        self.assertEqual(allowed.tolist(), [False, True])
+
+    def test_unprepared_player_only_wants_potions(self):
+        candidates = [candidate("coin"), candidate("big_potion")]
+        allowed = FilterPipeline().apply(candidates, context(player(50, potions=0)))
+        self.assertEqual(allowed.tolist(), [False, True])
+
+    def test_peripheral_danger_matches_scalar_rule(self):
+        enemies = [
+            {"position": {"x": 100, "y": 50}, "attack_damage": 150},
+            {"position": {"x": 120, "y": -40}, "attack_damage": 60},
+        ]
+        candidates = [candidate("coin"), candidate("coin", x=2000)]
+        ctx = context(player(), enemies=enemies)
+        pipeline = FilterPipeline([peripheral_danger])
+        self.assertEqual(pipeline.apply(candidates, ctx).tolist(), [False, True])
+
+    def test_stats_and_reorder(self):
+        candidates = [candidate("coin"), candidate("big_potion")]
+        pipeline = FilterPipeline(reorder_every=2)
+        for _ in range(2):
+            pipeline.apply(candidates, context(player(50, potions=0)))
+        report = {row["filter"]: row for row in pipeline.report()}
+        self.assertEqual(report["player_unprepared"]["rejected"], 2)
+        self.assertEqual(report["player_unprepared"]["calls"], 2)
+        # The only filter that ever rejected anything now runs first
+        self.assertEqual(pipeline.filters[0].__name__, "player_unprepared")
+        # Later filters only saw the survivors
+        self.assertLessEqual(report["peripheral_danger"]["evaluated"], 2)
+
+    def test_enabled_subset(self):
+        candidates = [candidate("coin"), candidate("big_potion")]
+        pipeline = FilterPipeline()
+        ctx = context(player(50, potions=0))
+        allowed = pipeline.apply(candidates, ctx, enabled=["dead", "stock_full"])
+        self.assertEqual(allowed.tolist(), [True, True])
+        self.assertEqual(pipeline.stats["player_unprepared"]["calls"], 0)
+
+    def test_empty_batch(self):
+        allowed = FilterPipeline().apply([], context(player()))
+        self.assertEqual(allowed.tolist(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,333 @@
+import copy
+import random
+import unittest
+
+import numpy as np
+
+import main
+from geometry import assess, positions
+
+
+# The quadrant-branch versions these replaced, kept to check that the new
+# code agrees with them wherever their answer is well defined.
+def slope(a, b):
+    return (int(b["y"]) - a["y"]) / (int(b["x"]) - a["x"])
+
+
+def legacy_retreat(own_player, target, threats):
+    retreat = 200
+    for threat in threats:
+        threat_slope = slope(own_player["position"], threat["position"])
+        threat_inverse = 1 / threat_slope
+        if (
+            threat["position"]["x"] > own_player["position"]["x"]
+            and threat["position"]["y"] > own_player["position"]["y"]
+        ):
+            target["position"]["x"] = (
+                own_player["position"]["x"] - retreat * threat_inverse
+            )
+            target["position"]["y"] = (
+                own_player["position"]["y"] - retreat * threat_slope
+            )
+        elif (
+            threat["position"]["x"] < own_player["position"]["x"]
+            and threat["position"]["y"] < own_player["position"]["y"]
+        ):
+            target["position"]["x"] = (
+                own_player["position"]["x"] + retreat * threat_inverse
+            )
+            target["position"]["y"] = (
+                own_player["position"]["y"] + retreat * threat_slope
+            )
+        elif (
+            threat["position"]["x"] > own_player["position"]["x"]
+            and threat["position"]["y"] < own_player["position"]["y"]
+        ):
+            target["position"]["x"] = (
+                own_player["position"]["x"] - retreat * threat_inverse
+            )
+            target["position"]["y"] = (
+                own_player["position"]["y"] + retreat * threat_slope
+            )
+        elif (
+            threat["position"]["x"] < own_player["position"]["x"]
+            and threat["position"]["y"] > own_player["position"]["y"]
+        ):
+            target["position"]["x"] = (
+                own_player["position"]["x"] + retreat * threat_inverse
+            )
+            target["position"]["y"] = (
+                own_player["position"]["y"] - retreat * threat_slope
+            )
+    return target
+
+
+def legacy_avoid_collisions(own_player, target, threats):
+    nearby_threats = []
+    for threat in threats:
+        if threat["distance"] < 70000:
+            nearby_threats.append(threat)
+
+    for threat in nearby_threats:
+        if threat["id"] != target["id"] and threat["type"] != target["type"]:
+            buffer = 200
+            threat_slope = slope(own_player["position"], threat["position"])
+            target_slope = slope(own_player["position"], target["position"])
+            threat_inverse = 1 / (threat_slope or 1)
+            if (
+                target["position"]["x"] > threat["position"]["x"]
+                and threat["position"]["x"] > own_player["position"]["x"]
+            ):
+                if (
+                    target["position"]["y"] > threat["position"]["y"]
+                    and threat["position"]["y"] > own_player["position"]["y"]
+                ):
+                    if threat_slope > target_slope:
+                        target["position"]["x"] = (
+                            own_player["position"]["x"] + buffer * threat_inverse
+                        )
+                        target["position"]["y"] = (
+                            own_player["position"]["y"] - buffer * threat_slope
+                        )
+                    else:
+                        target["position"]["x"] = (
+                            own_player["position"]["x"] - buffer * threat_inverse
+                        )
+                        target["position"]["y"] = (
+                            own_player["position"]["y"] + buffer * threat_slope
+                        )
+                elif (
+                    target["position"]["y"] < threat["position"]["y"]
+                    and threat["position"]["y"] < own_player["position"]["y"]
+                ):
+                    if threat_slope > target_slope:
+                        target["position"]["x"] = (
+                            own_player["position"]["x"] - buffer * threat_inverse
+                        )
+                        target["position"]["y"] = (
+                            own_player["position"]["y"] - buffer * threat_slope
+                        )
+                    else:
+                        target["position"]["x"] = (
+                            own_player["position"]["x"] + buffer * threat_inverse
+                        )
+                        target["position"]["y"] = (
+                            own_player["position"]["y"] + buffer * threat_slope
+                        )
+            elif (
+                target["position"]["x"] < threat["position"]["x"]
+                and threat["position"]["x"] < own_player["position"]["x"]
+            ):
+                if (
+                    target["position"]["y"] > threat["position"]["y"]
+                    and threat["position"]["y"] > own_player["position"]["y"]
+                ):
+                    if threat_slope > target_slope:
+                        target["position"]["x"] = (
+                            own_player["position"]["x"] + buffer * threat_inverse
+                        )
+                        target["position"]["y"] = (
+                            own_player["position"]["y"] + buffer * threat_slope
+                        )
+                    else:
+                        target["position"]["x"] = (
+                            own_player["position"]["x"] - buffer * threat_inverse
+                        )
+                        target["position"]["y"] = (
+                            own_player["position"]["y"] - buffer * threat_slope
+                        )
+                elif (
+                    target["position"]["y"] < threat["position"]["y"]
+                    and threat["position"]["y"] < own_player["position"]["y"]
+                ):
+                    if threat_slope > target_slope:
+                        target["position"]["x"] = (
+                            own_player["position"]["x"] - buffer * threat_inverse
+                        )
+                        target["position"]["y"] = (
+                            own_player["position"]["y"] + buffer * threat_slope
+                        )
+                    else:
+                        target["position"]["x"] = (
+                            own_player["position"]["x"] + buffer * threat_inverse
+                        )
+                        target["position"]["y"] = (
+                            own_player["position"]["y"] - buffer * threat_slope
+                        )
+
+    return target
+
+
+def legacy_assess_bomb_use(own_player, target, enemies, moves):
+    bomb_distance = 130000
+    for enemy in enemies:
+        # and enemy["direction"] == own_player["direction"] ???
+        if (
+            target["position"]["x"] > own_player["position"]["x"]
+            and own_player["position"]["x"] > enemy["position"]["x"]
+            and target["position"]["y"] > own_player["position"]["y"]
+            and own_player["position"]["y"] > enemy["position"]["y"]
+            and 50000 < enemy["distance"] < bomb_distance
+            and target["id"] != enemy["id"]
+        ):
+            moves.append("special")
+        elif (
+            target["position"]["x"] < own_player["position"]["x"]
+            and own_player["position"]["x"] < enemy["position"]["x"]
+            and target["position"]["y"] < own_player["position"]["y"]
+            and own_player["position"]["y"] < enemy["position"]["y"]
+            and 50000 < enemy["distance"] < bomb_distance
+            and target["id"] != enemy["id"]
+        ):
+            moves.append("special")
+        elif (
+            target["position"]["x"] < own_player["position"]["x"]
+            and own_player["position"]["x"] < enemy["position"]["x"]
+            and target["position"]["y"] > own_player["position"]["y"]
+            and own_player["position"]["y"] > enemy["position"]["y"]
+            and 50000 < enemy["distance"] < bomb_distance
+            and target["id"] != enemy["id"]
+        ):
+            moves.append("special")
+        elif (
+            target["position"]["x"] > own_player["position"]["x"]
+            and own_player["position"]["x"] > enemy["position"]["x"]
+            and target["position"]["y"] < own_player["position"]["y"]
+            and own_player["position"]["y"] < enemy["position"]["y"]
+            and 50000 < enemy["distance"] < bomb_distance
+            and target["id"] != enemy["id"]
+        ):
+            moves.append("special")
+        elif (
+            enemy["distance"] < 50000
+            and own_player["health"] > own_player["attack_damage"] * 2.5
+            and target["id"] == enemy["id"]
+            and target["health"] > own_player["attack_damage"]
+        ):
+            moves.append("special")
+    return moves
+
+
+def spot(x, y):
+    return {"x": x, "y": y}
+
+
+def entity(id, x, y, distance, type="wolf"):
+    return {
+        "id": id,
+        "type": type,
+        "position": spot(x, y),
+        "distance": distance,
+        "attack_damage": 10,
+    }
+
+
+class TestAssess(unittest.TestCase):
+    def test_level_and_vertical_threats(self):
+        geometry = assess(spot(0, 0), spot(100, 100), [(0, 50), (50, 0), (50, 50)])
+        self.assertEqual(geometry.between.tolist(), [False, False, True])
+        np.testing.assert_allclose(geometry.d2, [2500, 2500, 5000])
+        np.testing.assert_allclose(geometry.angles, [np.pi / 2, 0, np.pi / 4])
+        self.assertTrue(np.isfinite(geometry.escape()).all())
+        self.assertTrue(np.isfinite(geometry.sidestep()).all())
+
+    def test_threat_on_top_of_us(self):
+        geometry = assess(spot(0, 0), spot(100, 100), [(0, 0)])
+        np.testing.assert_array_equal(geometry.escape(), [0, 0])
+
+    def test_behind(self):
+        points = positions([entity(1, -10, -10, 0), entity(2, 10, -10, 0)])
+        geometry = assess(spot(0, 0), spot(100, 100), points)
+        self.assertEqual(geometry.behind.tolist(), [True, False])
+
+
+class TestAgainstLegacy(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(0)
+        self.own_player = {
+            "position": spot(1000.0, 1000.0),
+            "collisions": [],
+            "health": 100,
+            "attack_damage": 10,
+        }
+
+    def point(self, spread=400):
+        # Integers keep slope()'s int() truncation out of the comparison
+        while True:
+            x = 1000 + self.rng.randint(-spread, spread)
+            y = 1000 + self.rng.randint(-spread, spread)
+            if x != 1000 and y != 1000:
+                return x, y
+
+    def test_bomb_use_matches(self):
+        for i in range(500):
+            tx, ty = self.point(800)
+            target = {"id": "t", "position": spot(tx, ty), "health": 50}
+            enemies = []
+            for j in range(3):
+                x, y = self.point()
+                d = (x - 1000) ** 2 + (y - 1000) ** 2
+                enemies.append(entity(j, x, y, d))
+            legacy = legacy_assess_bomb_use(self.own_player, target, enemies, [])
+            moves = main.assess_bomb_use(self.own_player, target, enemies, [])
+            self.assertEqual("special" in legacy, "special" in moves)
+
+    def test_sidestep_goes_to_the_same_side(self):
+        checked = 0
+        for i in range(500):
+            tx, ty = self.point(800)
+            # A threat roughly on the way to the target
+            f = self.rng.uniform(0.1, 0.9)
+            x = 1000 + int((tx - 1000) * f * self.rng.uniform(0.7, 1.3))
+            y = 1000 + int((ty - 1000) * f * self.rng.uniform(0.7, 1.3))
+            target = {"id": "t", "type": "coin", "position": spot(tx, ty)}
+            threat = entity("w", x, y, (x - 1000) ** 2 + (y - 1000) ** 2)
+            to_target = (tx - 1000, ty - 1000)
+
+            def side(p):
+                return np.sign(
+                    to_target[0] * (p["y"] - 1000) - to_target[1] * (p["x"] - 1000)
+                )
+
+            moved = main.avoid_collisions(self.own_player, target, [threat])
+            moved = moved["position"]
+            if moved == target["position"] or side(threat["position"]) == 0:
+                continue
+            checked += 1
+            self.assertEqual(side(moved), -side(threat["position"]))
+            # The legacy branches only stepped away from the threat's side
+            # when the target's dx and dy agreed in sign
+            if to_target[0] * to_target[1] > 0:
+                legacy = legacy_avoid_collisions(
+                    self.own_player, copy.deepcopy(target), [threat]
+                )
+                self.assertEqual(side(legacy["position"]), side(moved))
+        self.assertGreater(checked, 100)
+
+    def test_retreat_runs_away(self):
+        for i in range(500):
+            x, y = self.point()
+            threat = entity("w", x, y, 0)
+            target = {"position": spot(0, 0)}
+            moved = main.retreat(self.own_player, target, [threat])["position"]
+            before = (x - 1000) ** 2 + (y - 1000) ** 2
+            after = (x - moved["x"]) ** 2 + (y - moved["y"]) ** 2
+            self.assertGreater(after, before)
+            dx, dy = abs(x - 1000), abs(y - 1000)
+            if (x - 1000) * (y - 1000) > 0 and min(dx, dy) > 0.2 * max(dx, dy):
+                # The legacy quadrants only ran away when dx and dy agreed.
+                # Near an axis the retreat grid cell may sit on that axis.
+                legacy = legacy_retreat(
+                    self.own_player, copy.deepcopy(target), [threat]
+                )
+                legacy = legacy["position"]
+                self.assertEqual(
+                    np.sign(legacy["x"] - 1000), np.sign(moved["x"] - 1000)
+                )
+                self.assertEqual(
+                    np.sign(legacy["y"] - 1000), np.sign(moved["y"] - 1000)
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+
+from heatmap import SpawnHeatmap
+
+
+def sighting(id, x, y, xp=250):
+    return {"id": id, "position": {"x": x, "y": y}, "xp": xp}
+
+
+class TestSpawnHeatmap(unittest.TestCase):
+    def test_richest_cell_first(self):
+        heatmap = SpawnHeatmap()
+        heatmap.observe([sighting("c1", 1050, 1050), sighting("c2", 1100, 1150)])
+        heatmap.observe([sighting("m1", 3030, 510, xp=100)])
+        # Only re-ranked every `refresh_every` ticks
+        self.assertEqual(len(heatmap.waypoints), 1)
+        heatmap.refresh()
+        self.assertEqual(heatmap.waypoints[0], {"x": 1100, "y": 1100})
+        self.assertEqual(heatmap.waypoints[1], {"x": 3100, "y": 500})
+        self.assertEqual(len(heatmap.waypoints), 2)
+
+    def test_counts_each_id_once(self):
+        heatmap = SpawnHeatmap(decay=1)
+        for _ in range(5):
+            heatmap.observe([sighting("c1", 1050, 1050)])
+        self.assertEqual(heatmap.grid.sum(), 250)
+
+    def test_decay(self):
+        heatmap = SpawnHeatmap(decay=0.5)
+        heatmap.observe([sighting("c1", 1050, 1050)])
+        heatmap.observe([])
+        heatmap.observe([])
+        self.assertAlmostEqual(heatmap.grid.sum(), 62.5)
+
+    def test_decays_per_match_tick(self):
+        heatmap = SpawnHeatmap(decay=0.5, ticks_per_second=2)
+        heatmap.observe([sighting("c1", 1050, 1050)], clock=100)
+        # Three bots report each second, one of them lagging behind
+        for clock in (99, 99, 100, 98, 98, 99):
+            heatmap.observe([], clock=clock)
+        # Two seconds of two ticks each
+        self.assertAlmostEqual(heatmap.grid.sum(), 250 / 16)
+        self.assertEqual(heatmap.ticks, 5)
+        # A new match restarts the clock
+        heatmap.observe([], clock=900)
+        self.assertAlmostEqual(heatmap.grid.sum(), 250 / 32)
+
+    def test_refreshes_across_skipped_ticks(self):
+        heatmap = SpawnHeatmap(decay=1, refresh_every=4, ticks_per_second=4)
+        heatmap.observe([sighting("c1", 1050, 1050)], clock=100)
+        heatmap.observe([sighting("c2", 3050, 3050, xp=1000)], clock=100)
+        self.assertEqual(heatmap.waypoints, [{"x": 1100, "y": 1100}])
+        # One second is four ticks, which passes a refresh
+        heatmap.observe([], clock=99)
+        self.assertEqual(heatmap.waypoints[0], {"x": 3100, "y": 3100})
+
+    def test_reached_waypoints_are_cleared(self):
+        heatmap = SpawnHeatmap()
+        heatmap.observe([sighting("c1", 1050, 1050), sighting("c2", 3050, 3050, 10)])
+        self.assertEqual(heatmap.waypoint({"x": 0, "y": 0}), {"x": 1100, "y": 1100})
+        here = {"x": 1100, "y": 1100}
+        self.assertEqual(heatmap.waypoint(here), {"x": 3100, "y": 3100})
+        # Walking back does not bring us to the first cell again
+        self.assertEqual(heatmap.waypoint({"x": 0, "y": 0}), {"x": 3100, "y": 3100})
+        self.assertEqual(heatmap.waypoint({"x": 3100, "y": 3100}), {})
+
+    def test_out_of_bounds_positions_are_clipped(self):
+        heatmap = SpawnHeatmap(shape=(4, 4))
+        heatmap.observe([sighting("c1", -500, 99999)])
+        self.assertEqual(heatmap.grid[0, 3], 250)
+
+
+if __name__ == "__main__":
+    unittest.main()
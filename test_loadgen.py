@@ -0,0 +1,62 @@
+import asyncio
+import json
+import unittest
+
+import httpx
+
+import main
+from loadgen import recorded_payloads, run_level, summarize, synthetic_payloads
+from staticmap import scratch_root
+
+
+class TestPayloads(unittest.TestCase):
+    def test_synthetic_ticks_change(self):
+        payloads = synthetic_payloads(seed=1, ticks=3)
+        ticks = [json.loads(payload) for payload in payloads]
+        self.assertEqual(len(ticks), 3)
+        main.LevelData(**ticks[0])
+        self.assertNotEqual(ticks[0]["enemies"], ticks[2]["enemies"])
+
+    def test_recorded_ticks_get_a_player_id_per_bot(self):
+        records = [{"own_player": {"id": "me"}, "tick": i} for i in range(3)]
+        payloads = recorded_payloads(records, bot=1, ticks=4)
+        ticks = [json.loads(payload) for payload in payloads]
+        self.assertEqual([t["tick"] for t in ticks], [1, 2, 0, 1])
+        self.assertEqual({t["own_player"]["id"] for t in ticks}, {"me-1"})
+        self.assertEqual(records[0]["own_player"]["id"], "me")
+
+
+class TestSummarize(unittest.TestCase):
+    def test_summary(self):
+        results = [(0.001 * i, i != 3) for i in range(1, 101)]
+        summary = summarize(results, elapsed=2.0, budget=0.05)
+        self.assertEqual(summary["requests"], 100)
+        self.assertEqual(summary["rps"], 50)
+        self.assertEqual(summary["error_rate"], 0.01)
+        self.assertAlmostEqual(summary["p50_ms"], 50.5)
+        self.assertEqual(summary["max_ms"], 100)
+        self.assertEqual(summary["over_budget"], 0.5)
+
+
+class TestRunLevel(unittest.TestCase):
+    def setUp(self):
+        self.enterContext(scratch_root())
+
+    def test_drives_the_app(self):
+        bots = [synthetic_payloads(seed, ticks=3) for seed in range(2)]
+
+        async def level():
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://bot"
+            ) as client:
+                return await run_level(client, "/", bots, tick_seconds=0)
+
+        summary = asyncio.run(level())
+        self.assertEqual(summary["requests"], 6)
+        self.assertEqual(summary["error_rate"], 0)
+        self.assertNotIn("over_budget", summary)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,18 @@
+import asyncio
+import json
+import os
+import random
+import tempfile
 import unittest
+from collections import OrderedDict
 from unittest.mock import patch
 
+import httpx
+import numpy as np
+
+import blackbox
+import main
+from death_tax import read_log
 from main import (
     apply_skill_points,
     assess_attack,
@@ -11,12 +23,17 @@ from main import (
     dedupe_moves,
     dist_squared_to,
     filter_threats,
+    get_best_cluster_item,
+    get_best_item,
     handle_bomb_threat,
-    handle_collisions,
     handle_icicle_threat,
     losing_battle,
     peripheral_danger,
 )
+from loadgen import synthetic_payloads
+from simulator import World
+from staticmap import scratch_root
+from tracing import Tracer
 
 
 class TestHandleBombThreatFunction(unittest.TestCase):
@@ -27,10 +44,11 @@ class TestHandleBombThreatFunction(unittest.TestCase):
         bomb = {"position": {"x": 100, "y": 50}}
         moves = []
 
-        updated_moves = handle_bomb_threat(own_player, target, bomb, moves)
+        updated_moves, updated = handle_bomb_threat(own_player, target, bomb, moves)
 
         self.assertIn("shield", updated_moves)
-        self.assertEqual(target["position"], {"x": -50, "y": -50})
+        self.assertEqual(updated["position"], {"x": -50, "y": -50})
+        self.assertEqual(target["position"], {"x": 0, "y": 0})
 
     def test_bomb_on_the_left(self):
         # Case: Bomb is to the left of the player
@@ -39,10 +57,11 @@ class TestHandleBombThreatFunction(unittest.TestCase):
         bomb = {"position": {"x": 0, "y": 50}}
         moves = []
 
-        updated_moves = handle_bomb_threat(own_player, target, bomb, moves)
+        updated_moves, updated = handle_bomb_threat(own_player, target, bomb, moves)
 
         self.assertIn("shield", updated_moves)
-        self.assertEqual(target["position"], {"x": 150, "y": -50})
+        self.assertEqual(updated["position"], {"x": 150, "y": -50})
+        self.assertEqual(target["position"], {"x": 0, "y": 0})
 
     def test_bomb_above(self):
         # Case: Bomb is above the player
@@ -51,10 +70,11 @@ class TestHandleBombThreatFunction(unittest.TestCase):
         bomb = {"position": {"x": 50, "y": 100}}
         moves = []
 
-        updated_moves = handle_bomb_threat(own_player, target, bomb, moves)
+        updated_moves, updated = handle_bomb_threat(own_player, target, bomb, moves)
 
         self.assertIn("shield", updated_moves)
-        self.assertEqual(target["position"], {"x": -50, "y": -50})
+        self.assertEqual(updated["position"], {"x": -50, "y": -50})
+        self.assertEqual(target["position"], {"x": 0, "y": 0})
 
     def test_bomb_below(self):
         # Case: Bomb is below the player
@@ -63,10 +83,11 @@ class TestHandleBombThreatFunction(unittest.TestCase):
         bomb = {"position": {"x": 50, "y": 0}}
         moves = []
 
-        updated_moves = handle_bomb_threat(own_player, target, bomb, moves)
+        updated_moves, updated = handle_bomb_threat(own_player, target, bomb, moves)
 
         self.assertIn("shield", updated_moves)
-        self.assertEqual(target["position"], {"x": -50, "y": 150})
+        self.assertEqual(updated["position"], {"x": -50, "y": 150})
+        self.assertEqual(target["position"], {"x": 0, "y": 0})
 
     def test_no_bomb(self):
         # Case: No bomb present
@@ -75,9 +96,10 @@ class TestHandleBombThreatFunction(unittest.TestCase):
         bomb = None
         moves = []
 
-        updated_moves = handle_bomb_threat(own_player, target, bomb, moves)
+        updated_moves, updated = handle_bomb_threat(own_player, target, bomb, moves)
 
         self.assertEqual(updated_moves, [])
+        self.assertEqual(updated["position"], {"x": 0, "y": 0})
         self.assertEqual(target["position"], {"x": 0, "y": 0})
 
 
@@ -87,9 +109,9 @@ class TestFilterThreatsFunction(unittest.TestCase):
         threats = [
             {"health": 50, "status": "active"},
             {"health": 100},
-            {"status": "alert"},
+            {"type": "bomb", "status": "alert"},
         ]
-        filtered = filter_threats(threats)
+        filtered = filter_threats({"id": 1}, threats)
         self.assertEqual(len(filtered), len(threats))
         self.assertEqual(filtered, threats)
 
@@ -99,7 +121,7 @@ class TestFilterThreatsFunction(unittest.TestCase):
             {"health": 0, "status": "idle"},
             {"health": None, "status": "idle"},
         ]
-        filtered = filter_threats(threats)
+        filtered = filter_threats({"id": 1}, threats)
         self.assertEqual(filtered, [])
 
     def test_some_threats_filtered(self):
@@ -107,12 +129,12 @@ class TestFilterThreatsFunction(unittest.TestCase):
         threats = [
             {"health": 50, "status": "active"},  # Valid
             {"health": 0, "status": "idle"},  # Invalid
-            {"status": "alert"},  # Valid
+            {"type": "bomb", "status": "alert"},  # Valid
         ]
-        filtered = filter_threats(threats)
+        filtered = filter_threats({"id": 1}, threats)
         self.assertEqual(len(filtered), 2)
         self.assertIn({"health": 50, "status": "active"}, filtered)
-        self.assertIn({"status": "alert"}, filtered)
+        self.assertIn({"type": "bomb", "status": "alert"}, filtered)
 
     def test_threats_with_missing_fields(self):
         # Case: Threats missing fields
@@ -121,14 +143,14 @@ class TestFilterThreatsFunction(unittest.TestCase):
             {},  # Invalid
             {"status": "idle"},  # Invalid
         ]
-        filtered = filter_threats(threats)
+        filtered = filter_threats({"id": 1}, threats)
         self.assertEqual(len(filtered), 1)
         self.assertIn({"health": 50}, filtered)
 
     def test_empty_list(self):
         # Case: Empty threats list
         threats = []
-        filtered = filter_threats(threats)
+        filtered = filter_threats({"id": 1}, threats)
         self.assertEqual(filtered, [])
 
 
@@ -137,6 +159,7 @@ class TestPeripheralDanger(unittest.TestCase):
         """Set up common test data."""
         self.own_player = {
             "health": 100,
+            "max_health": 100,
             "items": {"big_potions": [100, 100]},  # Adds 200 health
         }
         self.item = {"position": {"x": 50, "y": 50}}
@@ -432,7 +455,7 @@ class TestLosingBattle(unittest.TestCase):
 
     def test_exactly_equal_damage_and_health(self):
         """Test when the item's attack damage is exactly equal to the player's health."""
-        own_player = {"health": 120}
+        own_player = {"health": 100}
         item = {"attack_damage": 100}
         result = losing_battle(own_player, item)
         self.assertTrue(
@@ -535,8 +558,8 @@ class TestBombNearbyFunction(unittest.TestCase):
 class TestAssessAttackFunction(unittest.TestCase):
     def test_valid_attack(self):
         # Case where the target is in range, has health, and should be attacked
-        own_player = {"position": {"x": 10, "y": 10}}
-        target = {"position": {"x": 15, "y": 15}, "health": 50}
+        own_player = {"position": {"x": 10, "y": 10}, "collisions": []}
+        target = {"position": {"x": 15, "y": 15}, "distance": 50, "health": 50}
         moves = []
 
         updated_moves = assess_attack(own_player, target, moves)
@@ -544,8 +567,8 @@ class TestAssessAttackFunction(unittest.TestCase):
 
     def test_target_out_of_range(self):
         # Case where the target is out of range
-        own_player = {"position": {"x": 10, "y": 10}}
-        target = {"position": {"x": 200, "y": 200}, "health": 50}
+        own_player = {"position": {"x": 10, "y": 10}, "collisions": []}
+        target = {"position": {"x": 200, "y": 200}, "distance": 72200, "health": 50}
         moves = []
 
         updated_moves = assess_attack(own_player, target, moves)
@@ -553,8 +576,8 @@ class TestAssessAttackFunction(unittest.TestCase):
 
     def test_target_no_health_field(self):
         # Case where the target has no health field
-        own_player = {"position": {"x": 10, "y": 10}}
-        target = {"position": {"x": 15, "y": 15}}
+        own_player = {"position": {"x": 10, "y": 10}, "collisions": []}
+        target = {"position": {"x": 15, "y": 15}, "distance": 50}
         moves = []
 
         updated_moves = assess_attack(own_player, target, moves)
@@ -562,8 +585,8 @@ class TestAssessAttackFunction(unittest.TestCase):
 
     def test_attack_appends_to_existing_moves(self):
         # Case where moves already contain other actions
-        own_player = {"position": {"x": 10, "y": 10}}
-        target = {"position": {"x": 15, "y": 15}, "health": 50}
+        own_player = {"position": {"x": 10, "y": 10}, "collisions": []}
+        target = {"position": {"x": 15, "y": 15}, "distance": 50, "health": 50}
         moves = ["special"]
 
         updated_moves = assess_attack(own_player, target, moves)
@@ -601,12 +624,12 @@ class TestAssessHealthNeedsFunction(unittest.TestCase):
         self.assertIn({"use": "big_potion"}, moves)
         self.assertIn({"use": "ring"}, moves)
 
-    def test_health_below_50_percent_with_two_potions(self):
-        # Case: Health is below 50% but there are at least two potions
+    def test_health_below_80_percent_with_six_potions(self):
+        # Case: Health is below 80% and every potion slot is full
         own_player = {
-            "health": 45,
+            "health": 75,
             "max_health": 100,
-            "items": {"big_potions": [1, 2]},
+            "items": {"big_potions": [1, 2, 3, 4, 5, 6]},
             "is_cloaked": False,
         }
         total_danger_value = 10
@@ -614,7 +637,7 @@ class TestAssessHealthNeedsFunction(unittest.TestCase):
 
         assess_health_needs(own_player, total_danger_value, moves)
         self.assertIn({"use": "big_potion"}, moves)
-        self.assertIn({"use": "ring"}, moves)
+        self.assertNotIn({"use": "ring"}, moves)
 
     def test_health_below_60_percent_with_five_potions(self):
         # Case: Health is below 60% but there are at least five potions
@@ -665,68 +688,80 @@ class TestAssessHealthNeedsFunction(unittest.TestCase):
 class TestAssessZapperUseFunction(unittest.TestCase):
     def test_use_zapper_on_player_in_range(self):
         # Case: Target is a player in range and not zapped
-        own_player = {"position": {"x": 100, "y": 100}}
         target = {
             "type": "player",
             "position": {"x": 200, "y": 200},
+            "distance": 20000,
             "is_zapped": False,
         }
         moves = []
 
-        updated_moves = assess_zapper_use(own_player, target, moves)
+        updated_moves = assess_zapper_use(target, moves)
         self.assertIn({"use": "speed_zapper"}, updated_moves)
 
     def test_use_zapper_on_tiny_in_range(self):
         # Case: Target is tiny in range and not zapped
-        own_player = {"position": {"x": 100, "y": 100}}
-        target = {"type": "tiny", "position": {"x": 150, "y": 150}, "is_zapped": False}
+        target = {
+            "type": "tiny",
+            "position": {"x": 150, "y": 150},
+            "distance": 5000,
+            "is_zapped": False,
+        }
         moves = []
 
-        updated_moves = assess_zapper_use(own_player, target, moves)
+        updated_moves = assess_zapper_use(target, moves)
         self.assertIn({"use": "speed_zapper"}, updated_moves)
 
     def test_do_not_use_zapper_out_of_range(self):
         # Case: Target is out of zapper range
-        own_player = {"position": {"x": 100, "y": 100}}
         target = {
             "type": "player",
             "position": {"x": 600, "y": 600},
+            "distance": 500000,
             "is_zapped": False,
         }
         moves = []
 
-        updated_moves = assess_zapper_use(own_player, target, moves)
+        updated_moves = assess_zapper_use(target, moves)
         self.assertNotIn({"use": "speed_zapper"}, updated_moves)
 
     def test_do_not_use_zapper_on_zapped_target(self):
         # Case: Target is already zapped
-        own_player = {"position": {"x": 100, "y": 100}}
-        target = {"type": "player", "position": {"x": 200, "y": 200}, "is_zapped": True}
+        target = {
+            "type": "player",
+            "position": {"x": 200, "y": 200},
+            "distance": 20000,
+            "is_zapped": True,
+        }
         moves = []
 
-        updated_moves = assess_zapper_use(own_player, target, moves)
+        updated_moves = assess_zapper_use(target, moves)
         self.assertNotIn({"use": "speed_zapper"}, updated_moves)
 
     def test_do_not_use_zapper_on_invalid_target_type(self):
         # Case: Target type is not player or tiny
-        own_player = {"position": {"x": 100, "y": 100}}
         target = {
             "type": "monster",
             "position": {"x": 150, "y": 150},
+            "distance": 5000,
             "is_zapped": False,
         }
         moves = []
 
-        updated_moves = assess_zapper_use(own_player, target, moves)
+        updated_moves = assess_zapper_use(target, moves)
         self.assertNotIn({"use": "speed_zapper"}, updated_moves)
 
     def test_append_to_existing_moves(self):
         # Case: Moves already have other actions, zapper use should append
-        own_player = {"position": {"x": 100, "y": 100}}
-        target = {"type": "tiny", "position": {"x": 150, "y": 150}, "is_zapped": False}
+        target = {
+            "type": "tiny",
+            "position": {"x": 150, "y": 150},
+            "distance": 5000,
+            "is_zapped": False,
+        }
         moves = [{"use": "ring"}]
 
-        updated_moves = assess_zapper_use(own_player, target, moves)
+        updated_moves = assess_zapper_use(target, moves)
         self.assertIn({"use": "speed_zapper"}, updated_moves)
         self.assertIn({"use": "ring"}, updated_moves)
 
@@ -735,7 +770,14 @@ class TestHandleIcicleThreatFunction(unittest.TestCase):
     def test_handle_icicle_threat_in_range(self):
         # Case: Icicle hazard is within range and not owned by the player
         own_player = {"position": {"x": 100, "y": 100}, "id": 1}
-        hazards = [{"type": "icicle", "position": {"x": 110, "y": 110}, "owner_id": 2}]
+        hazards = [
+            {
+                "type": "icicle",
+                "position": {"x": 110, "y": 110},
+                "distance": 200,
+                "owner_id": 2,
+            }
+        ]
         moves = []
 
         updated_moves = handle_icicle_threat(own_player, hazards, moves)
@@ -744,7 +786,14 @@ class TestHandleIcicleThreatFunction(unittest.TestCase):
     def test_no_icicle_threat_out_of_range(self):
         # Case: Icicle hazard is out of range
         own_player = {"position": {"x": 100, "y": 100}, "id": 1}
-        hazards = [{"type": "icicle", "position": {"x": 400, "y": 400}, "owner_id": 2}]
+        hazards = [
+            {
+                "type": "icicle",
+                "position": {"x": 400, "y": 400},
+                "distance": 180000,
+                "owner_id": 2,
+            }
+        ]
         moves = []
 
         updated_moves = handle_icicle_threat(own_player, hazards, moves)
@@ -753,7 +802,14 @@ class TestHandleIcicleThreatFunction(unittest.TestCase):
     def test_no_icicle_threat_same_owner(self):
         # Case: Icicle hazard is owned by the player
         own_player = {"position": {"x": 100, "y": 100}, "id": 1}
-        hazards = [{"type": "icicle", "position": {"x": 110, "y": 110}, "owner_id": 1}]
+        hazards = [
+            {
+                "type": "icicle",
+                "position": {"x": 110, "y": 110},
+                "distance": 200,
+                "owner_id": 1,
+            }
+        ]
         moves = []
 
         updated_moves = handle_icicle_threat(own_player, hazards, moves)
@@ -762,7 +818,14 @@ class TestHandleIcicleThreatFunction(unittest.TestCase):
     def test_no_icicle_threat_wrong_type(self):
         # Case: Hazard is not an icicle
         own_player = {"position": {"x": 100, "y": 100}, "id": 1}
-        hazards = [{"type": "bomb", "position": {"x": 110, "y": 110}, "owner_id": 2}]
+        hazards = [
+            {
+                "type": "bomb",
+                "position": {"x": 110, "y": 110},
+                "distance": 200,
+                "owner_id": 2,
+            }
+        ]
         moves = []
 
         updated_moves = handle_icicle_threat(own_player, hazards, moves)
@@ -772,9 +835,24 @@ class TestHandleIcicleThreatFunction(unittest.TestCase):
         # Case: Multiple hazards, one icicle in range
         own_player = {"position": {"x": 100, "y": 100}, "id": 1}
         hazards = [
-            {"type": "bomb", "position": {"x": 150, "y": 150}, "owner_id": 2},
-            {"type": "icicle", "position": {"x": 110, "y": 110}, "owner_id": 3},
-            {"type": "icicle", "position": {"x": 300, "y": 300}, "owner_id": 2},
+            {
+                "type": "bomb",
+                "position": {"x": 150, "y": 150},
+                "distance": 5000,
+                "owner_id": 2,
+            },
+            {
+                "type": "icicle",
+                "position": {"x": 110, "y": 110},
+                "distance": 200,
+                "owner_id": 3,
+            },
+            {
+                "type": "icicle",
+                "position": {"x": 300, "y": 300},
+                "distance": 80000,
+                "owner_id": 2,
+            },
         ]
         moves = []
 
@@ -787,7 +865,14 @@ class TestHandleIcicleThreatFunction(unittest.TestCase):
     def test_append_to_existing_moves(self):
         # Case: Existing moves already contain actions
         own_player = {"position": {"x": 100, "y": 100}, "id": 1}
-        hazards = [{"type": "icicle", "position": {"x": 110, "y": 110}, "owner_id": 2}]
+        hazards = [
+            {
+                "type": "icicle",
+                "position": {"x": 110, "y": 110},
+                "distance": 200,
+                "owner_id": 2,
+            }
+        ]
         moves = ["dash"]
 
         updated_moves = handle_icicle_threat(own_player, hazards, moves)
@@ -795,94 +880,16 @@ class TestHandleIcicleThreatFunction(unittest.TestCase):
         self.assertIn("dash", updated_moves)
 
 
-class TestHandleCollisionsFunction(unittest.TestCase):
-    def test_no_collisions(self):
-        # Case: No collisions
-        own_player = {"position": {"x": 10, "y": 10}, "collisions": []}
-        target = {"position": {"x": 20, "y": 20}, "type": "npc"}
-        moves = []
-
-        updated_moves = handle_collisions(own_player, target, moves)
-
-        self.assertEqual(updated_moves, [])
-        self.assertEqual(target["position"], {"x": 20, "y": 20})
-
-    def test_single_collision_with_attack(self):
-        # Case: Single collision requiring an attack
-        own_player = {
-            "position": {"x": 10, "y": 10},
-            "collisions": [{"type": "wolf", "relative_position": {"x": 1, "y": 1}}],
-        }
-        target = {"position": {"x": 20, "y": 20}, "type": "npc"}
-        moves = []
-
-        updated_moves = handle_collisions(own_player, target, moves)
-
-        self.assertIn("attack", updated_moves)
-        self.assertIn({"move_to": {"x": 7, "y": 7}}, updated_moves)
-        self.assertEqual(target["position"], {"x": 7, "y": 7})
-
-    def test_single_collision_no_attack(self):
-        # Case: Single collision but no attack due to target type match
-        own_player = {
-            "position": {"x": 10, "y": 10},
-            "collisions": [{"type": "rock", "relative_position": {"x": 1, "y": 1}}],
-        }
-        target = {"position": {"x": 20, "y": 20}, "type": "player"}
-        moves = []
-
-        updated_moves = handle_collisions(own_player, target, moves)
-
-        self.assertNotIn("attack", updated_moves)
-        self.assertIn({"move_to": {"x": 7, "y": 7}}, updated_moves)
-        self.assertEqual(target["position"], {"x": 7, "y": 7})
-
-    def test_multiple_collisions(self):
-        # Case: Multiple collisions with cumulative position adjustments
-        own_player = {
-            "position": {"x": 10, "y": 10},
-            "collisions": [
-                {"type": "wolf", "relative_position": {"x": 1, "y": 1}},
-                {"type": "ghoul", "relative_position": {"x": 2, "y": 2}},
-            ],
-        }
-        target = {"position": {"x": 20, "y": 20}, "type": "npc"}
-        moves = []
-
-        updated_moves = handle_collisions(own_player, target, moves)
-
-        self.assertIn("attack", updated_moves)
-        self.assertIn({"move_to": {"x": 1, "y": 1}}, updated_moves)
-        self.assertEqual(
-            target["position"], {"x": 1, "y": 1}
-        )  # Adjusted for both collisions
-
-    def test_mixed_collision_types(self):
-        # Case: Mixed valid and invalid collision types
-        own_player = {
-            "position": {"x": 10, "y": 10},
-            "collisions": [
-                {"type": "wolf", "relative_position": {"x": 1, "y": 1}},
-                {"type": "rock", "relative_position": {"x": 2, "y": 2}},
-            ],
-        }
-        target = {"position": {"x": 20, "y": 20}, "type": "npc"}
-        moves = []
-
-        updated_moves = handle_collisions(own_player, target, moves)
-
-        self.assertIn("attack", updated_moves)  # Only for "wolf"
-        self.assertIn({"move_to": {"x": 1, "y": 1}}, updated_moves)
-        self.assertEqual(
-            target["position"], {"x": 1, "y": 1}
-        )  # Adjusted only for "wolf" collision
-
-
 class TestAssessIcicleUseFunction(unittest.TestCase):
     def test_valid_target_in_range(self):
         # Case: Target is a valid type, not frozen, in range, and shield not raised
-        own_player = {"position": {"x": 100, "y": 100}, "shield_raised": False}
-        target = {"type": "ghoul", "position": {"x": 150, "y": 150}, "is_frozen": False}
+        own_player = {"position": {"x": 100, "y": 100}, "collisions": []}
+        target = {
+            "type": "ghoul",
+            "position": {"x": 150, "y": 150},
+            "distance": 5000,
+            "is_frozen": False,
+        }
         moves = []
 
         updated_moves = assess_icicle_use(own_player, target, moves)
@@ -891,8 +898,13 @@ class TestAssessIcicleUseFunction(unittest.TestCase):
 
     def test_target_out_of_range(self):
         # Case: Target is out of range
-        own_player = {"position": {"x": 100, "y": 100}, "shield_raised": False}
-        target = {"type": "ghoul", "position": {"x": 600, "y": 600}, "is_frozen": False}
+        own_player = {"position": {"x": 100, "y": 100}, "collisions": []}
+        target = {
+            "type": "ghoul",
+            "position": {"x": 600, "y": 600},
+            "distance": 500000,
+            "is_frozen": False,
+        }
         moves = []
 
         updated_moves = assess_icicle_use(own_player, target, moves)
@@ -901,8 +913,13 @@ class TestAssessIcicleUseFunction(unittest.TestCase):
 
     def test_target_already_frozen(self):
         # Case: Target is already frozen
-        own_player = {"position": {"x": 100, "y": 100}, "shield_raised": False}
-        target = {"type": "tiny", "position": {"x": 150, "y": 150}, "is_frozen": True}
+        own_player = {"position": {"x": 100, "y": 100}, "collisions": []}
+        target = {
+            "type": "tiny",
+            "position": {"x": 150, "y": 150},
+            "distance": 5000,
+            "is_frozen": True,
+        }
         moves = []
 
         updated_moves = assess_icicle_use(own_player, target, moves)
@@ -911,34 +928,44 @@ class TestAssessIcicleUseFunction(unittest.TestCase):
 
     def test_target_invalid_type(self):
         # Case: Target is not a valid type
-        own_player = {"position": {"x": 100, "y": 100}, "shield_raised": False}
-        target = {"type": "wolf", "position": {"x": 150, "y": 150}, "is_frozen": False}
+        own_player = {"position": {"x": 100, "y": 100}, "collisions": []}
+        target = {
+            "type": "chest",
+            "position": {"x": 150, "y": 150},
+            "distance": 5000,
+            "is_frozen": False,
+        }
         moves = []
 
         updated_moves = assess_icicle_use(own_player, target, moves)
 
         self.assertNotIn("special", updated_moves)
 
-    def test_player_shield_raised(self):
-        # Case: Player's shield is raised
-        own_player = {"position": {"x": 100, "y": 100}, "shield_raised": True}
+    def test_colliding_enemy_out_of_range_target(self):
+        # Case: Target is out of range but an enemy is touching the player
+        own_player = {
+            "position": {"x": 100, "y": 100},
+            "collisions": [{"type": "minotaur"}],
+        }
         target = {
-            "type": "minotaur",
-            "position": {"x": 150, "y": 150},
+            "type": "chest",
+            "position": {"x": 600, "y": 600},
+            "distance": 500000,
             "is_frozen": False,
         }
         moves = []
 
         updated_moves = assess_icicle_use(own_player, target, moves)
 
-        self.assertNotIn("special", updated_moves)
+        self.assertIn("special", updated_moves)
 
     def test_valid_target_append_to_moves(self):
         # Case: Valid target and moves already contain other actions
-        own_player = {"position": {"x": 100, "y": 100}, "shield_raised": False}
+        own_player = {"position": {"x": 100, "y": 100}, "collisions": []}
         target = {
             "type": "player",
             "position": {"x": 150, "y": 150},
+            "distance": 5000,
             "is_frozen": False,
         }
         moves = ["attack"]
@@ -947,3 +974,267 @@ class TestAssessIcicleUseFunction(unittest.TestCase):
 
         self.assertIn("special", updated_moves)
         self.assertIn("attack", updated_moves)
+
+
+class TestGetBestItemFunction(unittest.TestCase):
+    own_player = {
+        "levelling": {"speed": 2},
+        "attack_damage": 20,
+        "position": {"x": 1500, "y": 1500},
+    }
+
+    def exhaustive(self, items):
+        # Score every candidate the slow way and return the first best index
+        exponent = main.PARAMS.best_item_exponent
+        speed = 15000**exponent + 2 * 500**exponent
+        best, max_xp = None, float("-inf")
+        for i, item in enumerate(items):
+            xp = item["xp"]
+            effort = main.kill_effort(self.own_player, item)
+            effort += item["distance"] ** exponent / speed
+            for other in items:
+                distance = dist_squared_to(item["position"], other["position"])
+                if 0 < distance < main.PARAMS.neighbour_radius:
+                    xp += other["xp"]
+                    effort += main.kill_effort(self.own_player, other)
+                    effort += distance**exponent / speed
+            if xp / effort > max_xp:
+                best, max_xp = i, xp / effort
+        return best
+
+    def random_items(self, rng, n):
+        items = []
+        for i in range(n):
+            x, y = rng.uniform(0, 3000), rng.uniform(0, 3000)
+            item = {
+                "id": i,
+                "type": rng.choice(["coin", "wolf", "player"]),
+                "position": {"x": x, "y": y},
+                "xp": rng.choice([0, 10, 50, 200]),
+                "distance": (x - 1500) ** 2 + (y - 1500) ** 2 + 1,
+            }
+            if item["type"] != "coin":
+                item["health"] = rng.randint(10, 300)
+            items.append(item)
+        return items
+
+    def test_pruned_pick_matches_exhaustive(self):
+        rng = random.Random(0)
+        for _ in range(50):
+            items = self.random_items(rng, rng.randint(1, 60))
+            expected = items[self.exhaustive(items)]["id"]
+            target = get_best_item(self.own_player, items, [], [], [])
+            self.assertEqual(target["id"], expected)
+
+    def test_counts_pruned_candidates(self):
+        items = self.random_items(random.Random(1), 60)
+        with patch.dict(main.SCORING_STATS, {"scored": 0, "pruned": 0}):
+            get_best_item(self.own_player, items, [], [], [])
+            self.assertGreater(main.SCORING_STATS["pruned"], 0)
+            self.assertEqual(sum(main.SCORING_STATS.values()), 60)
+
+    def test_close_tiny_wins_outright(self):
+        items = self.random_items(random.Random(2), 10)
+        tiny = {"type": "tiny", "position": {"x": 0, "y": 0}, "xp": 1, "distance": 9}
+        self.assertIs(get_best_item(self.own_player, items + [tiny], [], [], []), tiny)
+
+    def test_item_underfoot(self):
+        coin = {"type": "coin", "position": {"x": 0, "y": 0}, "xp": 250, "distance": 0}
+        target = get_best_item(self.own_player, [coin], [], [], [])
+        self.assertEqual(target["position"], coin["position"])
+        self.assertGreater(target["xp"], 250)
+        target = get_best_cluster_item(self.own_player, [coin], 0.7, 50000)
+        self.assertEqual(target["position"], coin["position"])
+
+    def test_rejected_tiny_does_not_win(self):
+        items = self.random_items(random.Random(2), 10)
+        tiny = {"type": "tiny", "position": {"x": 0, "y": 0}, "xp": 1, "distance": 9}
+        allowed = [True] * 10 + [False]
+        target = get_best_item(
+            self.own_player, items + [tiny], [], [], [], None, allowed
+        )
+        self.assertIsNot(target, tiny)
+
+    def test_scoring_does_not_mutate_players(self):
+        items = self.random_items(random.Random(3), 20)
+        healths = [item.get("health") for item in items]
+        get_best_item(self.own_player, items, [], [], [])
+        self.assertEqual([item.get("health") for item in items], healths)
+
+
+class TestGetBestClusterItemFunction(unittest.TestCase):
+    own_player = {"levelling": {"speed": 0}, "attack_damage": 20}
+
+    def coin(self, x, y, xp=50):
+        return {
+            "type": "coin",
+            "position": {"x": x, "y": y},
+            "xp": xp,
+            "distance": x * x + y * y,
+        }
+
+    def test_enters_clump_at_nearest_coin(self):
+        clump = [self.coin(1000 + 100 * i, 0) for i in range(5)]
+        lone = self.coin(0, 1500, xp=100)
+        items = [lone] + clump
+        target = get_best_cluster_item(self.own_player, items, 0.7, 50000)
+        self.assertEqual(target["position"], clump[0]["position"])
+        self.assertEqual(clump[0]["xp"], 50)
+
+    def test_skips_disallowed_entries(self):
+        clump = [self.coin(1000 + 100 * i, 0) for i in range(5)]
+        allowed = [False, True, True, True, True]
+        target = get_best_cluster_item(
+            self.own_player, clump, 0.7, 50000, allowed=allowed
+        )
+        self.assertEqual(target["position"], clump[1]["position"])
+
+
+class TestPlayTargetSelection(unittest.TestCase):
+    def setUp(self):
+        self.enterContext(scratch_root())
+        log_dir = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(patch.object(main, "LOG_DIR", log_dir))
+        main.ROUTES.clear()
+
+    def play(self, seed):
+        """Speak message, scored candidates and the candidate list for a tick."""
+        world = World(seed=seed)
+        level_data = main.LevelData(**world.level_data(world.me, ticks=100))
+        with patch.object(main, "get_best_item", wraps=main.get_best_item) as scored:
+            moves = main.play(level_data)
+        candidates, scores = scored.call_args.args[1], scored.call_args.args[8]
+        speak = next(move["speak"] for move in moves if "speak" in move)
+        return speak, scores, candidates
+
+    def test_route_follows_scored_candidates(self):
+        for seed in range(6):
+            speak, scores, candidates = self.play(seed)
+            if not scores:
+                continue
+            said = {f'{candidates[i]["type"]}: {int(value)}' for value, i in scores}
+            self.assertIn(speak, said)
+
+    def test_rejected_candidates_never_targeted(self):
+        rng = random.Random(0)
+        masks = []
+
+        def reject_most(candidates, ctx, enabled=None):
+            masks.append(np.array([rng.random() < 0.3 for _ in candidates]))
+            return masks[-1]
+
+        tracer = Tracer(sample_rate=1.0)
+        for seed in range(6):
+            main.ROUTES.clear()
+            with patch.object(main.FILTERS, "apply", side_effect=reject_most):
+                with patch.object(main, "TRACER", tracer):
+                    _, _, candidates = self.play(seed)
+            (record,) = tracer.drain()
+            allowed = {c["id"] for c, ok in zip(candidates, masks[-1]) if ok}
+            self.assertIn(record["target"]["id"], allowed)
+
+
+class TestPlayOverload(unittest.TestCase):
+    def setUp(self):
+        self.enterContext(scratch_root())
+        self.log_dir = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(patch.object(main, "LOG_DIR", self.log_dir))
+        self.enterContext(patch.object(main, "DEAD", False))
+        self.enterContext(patch.object(main.ADMISSION, "overloaded", return_value=True))
+
+    def test_death_on_an_overloaded_tick_is_dumped(self):
+        world = World(seed=1)
+        main.forget_bot(world.me["id"])
+        for health in (100, 60, 0):
+            world.me["health"] = health
+            level_data = main.LevelData(**world.level_data(world.me, ticks=100))
+            moves = main.play(level_data)
+            if health == 100:
+                moves_before = moves
+        main.forget_bot(world.me["id"])
+        blackbox.WRITER.submit(lambda: None).result()
+
+        (dump,) = os.listdir(os.path.join(self.log_dir, "deaths"))
+        ticks, _ = blackbox.load(os.path.join(self.log_dir, "deaths", dump))
+        self.assertEqual(ticks["health"].tolist(), [100, 60, 0])
+        self.assertEqual(json.loads(ticks["moves"][0]), moves_before)
+        self.assertTrue(all(ticks["entities"]))
+
+
+class TestPlaySituations(unittest.TestCase):
+    def setUp(self):
+        self.enterContext(scratch_root())
+        self.log_dir = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(patch.object(main, "LOG_DIR", self.log_dir))
+
+    def test_new_match_logs_the_survived_life(self):
+        world = World(seed=1)
+        main.forget_bot(world.me["id"])
+        for game_id in (1, 1, 2):
+            tick = world.level_data(world.me, ticks=100)
+            tick["game_info"]["game_id"] = game_id
+            main.play(main.LevelData(**tick))
+        main.forget_bot(world.me["id"])
+
+        df = read_log(os.path.join(self.log_dir, "situations.log"))
+        self.assertEqual(df["ticks"].sum(), 2)
+        self.assertEqual(df["deaths"].sum(), 0)
+
+
+class TestBotEviction(unittest.TestCase):
+    def setUp(self):
+        self.enterContext(scratch_root())
+        self.log_dir = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(patch.object(main, "LOG_DIR", self.log_dir))
+        self.enterContext(patch.object(main, "MAX_BOTS", 2))
+        self.enterContext(patch.object(main, "BOTS", OrderedDict()))
+
+    def test_least_recently_seen_bot_is_forgotten(self):
+        world = World(seed=1)
+        for bot_id in ("a", "b", "a", "c"):
+            tick = world.level_data(world.me, ticks=100)
+            tick["own_player"]["id"] = bot_id
+            main.play(main.LevelData(**tick))
+        self.assertEqual(list(main.BOTS), ["a", "c"])
+        for store in (main.TRACKERS, main.SITUATIONS, main.BLACKBOXES):
+            self.assertNotIn("b", store)
+            self.assertIn("c", store)
+        df = read_log(os.path.join(self.log_dir, "situations.log"))
+        self.assertEqual(df["ticks"].sum(), 1)
+        for bot_id in ("a", "c"):
+            main.forget_bot(bot_id)
+
+
+class TestBodyLimit(unittest.TestCase):
+    def setUp(self):
+        self.enterContext(scratch_root())
+        self.enterContext(patch.object(main.ADMISSION, "max_body", 100_000))
+
+    def post(self, body, headers=None):
+        async def send():
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://bot"
+            ) as client:
+                return await client.post("/", content=body, headers=headers)
+
+        return asyncio.run(send())
+
+    @staticmethod
+    def chunked(payload: bytes, size=1000):
+        async def chunks():
+            for start in range(0, len(payload), size):
+                yield payload[start : start + size]
+
+        return chunks()
+
+    def test_malformed_content_length(self):
+        response = self.post(b"{}", headers={"content-length": "lots"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_chunked_body_counted(self):
+        (payload,) = synthetic_payloads(seed=0, ticks=1)
+        response = self.post(self.chunked(payload))
+        self.assertEqual(response.status_code, 200)
+        response = self.post(self.chunked(b" " * 200_000))
+        self.assertEqual(response.status_code, 413)
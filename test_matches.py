@@ -0,0 +1,78 @@
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from matches import MatchCache, MatchWorld
+
+
+def tick(remaining, obstacles=((0, 0),), map_name="m1", **game_info):
+    return SimpleNamespace(
+        game_info=dict(game_info, map_name=map_name, time_remaining_s=remaining),
+        obstacles=[{"x": x, "y": y} for x, y in obstacles],
+    )
+
+
+class TestMatchWorld(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch("staticmap.ROOT", tempfile.mkdtemp())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_rebuilds_only_for_newer_ticks(self):
+        world = MatchWorld("m1")
+        self.assertTrue(world.refresh(tick(100, [(0, 0)])))
+        # Another bot on the same tick, then one lagging a tick behind
+        self.assertFalse(world.refresh(tick(100, [(5, 5)])))
+        self.assertFalse(world.refresh(tick(101, [(5, 5)])))
+        self.assertEqual(world.obstacle_xy.tolist(), [[0, 0]])
+        self.assertTrue(world.refresh(tick(99, [(5, 5)])))
+        self.assertEqual(world.obstacle_xy.tolist(), [[5, 5]])
+        self.assertEqual(world.planner.blocked, {(0, 0)})
+        self.assertEqual((world.rebuilds, world.reuses), (2, 2))
+
+    def test_new_match_on_the_same_map(self):
+        world = MatchWorld("m1")
+        world.refresh(tick(10, [(0, 0)]))
+        self.assertTrue(world.refresh(tick(1800, [(7, 7)])))
+        self.assertEqual(world.time_remaining, 1800)
+
+    def test_missing_clock_always_rebuilds(self):
+        world = MatchWorld("m1")
+        world.refresh(tick(None))
+        self.assertTrue(world.refresh(tick(None)))
+
+    def test_obstacle_queries(self):
+        world = MatchWorld("m1")
+        world.refresh(tick(100, [(0, 0), (30, 40), (300, 0)]))
+        nearest = world.nearest_obstacle({"x": 20, "y": 40})
+        self.assertEqual(nearest, {"position": {"x": 30, "y": 40}, "distance": 100})
+        within = world.obstacles_within({"x": 0, "y": 0}, 10000)
+        self.assertEqual([o["distance"] for o in within], [0, 2500])
+
+    def test_no_obstacles(self):
+        world = MatchWorld("m1")
+        world.refresh(tick(100, []))
+        self.assertEqual(world.nearest_obstacle({"x": 0, "y": 0}), {})
+        self.assertEqual(world.obstacles_within({"x": 0, "y": 0}, 10000), [])
+
+
+class TestMatchCache(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch("staticmap.ROOT", tempfile.mkdtemp())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_shared_per_match(self):
+        cache = MatchCache(capacity=2)
+        first = cache.world(tick(100))
+        self.assertIs(cache.world(tick(100)), first)
+        self.assertIsNot(cache.world(tick(100, game_id=2)), first)
+        cache.world(tick(100, map_name="m2"))
+        self.assertEqual(len(cache), 2)
+        self.assertIsNot(cache.world(tick(100)), first)
+        self.assertEqual(cache.stats()["matches"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
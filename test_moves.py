@@ -0,0 +1,65 @@
+import unittest
+
+from moves import MoveBuilder, dedupe_moves
+
+
+class TestMoveBuilder(unittest.TestCase):
+    def test_emits_in_priority_order(self):
+        moves = MoveBuilder()
+        moves.append({"move_to": {"x": 1, "y": 2}})
+        moves.append("attack")
+        moves.append({"speak": "coin: 10"})
+        moves.append("shield")
+        moves.append({"use": "big_potion"})
+        moves.append({"redeem_skill_point": "speed"})
+        self.assertEqual(
+            moves.emit(),
+            [
+                {"redeem_skill_point": "speed"},
+                {"use": "big_potion"},
+                "shield",
+                "attack",
+                {"speak": "coin: 10"},
+                {"move_to": {"x": 1, "y": 2}},
+            ],
+        )
+
+    def test_drops_duplicates(self):
+        moves = MoveBuilder()
+        for _ in range(3):
+            moves.append("attack")
+            moves.append("shield")
+            moves.append({"use": "ring"})
+        moves.append({"use": "big_potion"})
+        self.assertEqual(len(moves), 4)
+        self.assertEqual(moves.dropped, 6)
+        self.assertEqual(
+            moves.emit(),
+            [{"use": "ring"}, {"use": "big_potion"}, "shield", "attack"],
+        )
+
+    def test_last_destination_wins(self):
+        moves = MoveBuilder()
+        moves.append({"move_to": {"x": 1, "y": 1}})
+        moves.append({"move_to": {"x": 2, "y": 2}})
+        self.assertEqual(moves.emit(), [{"move_to": {"x": 2, "y": 2}}])
+        self.assertIn({"move_to": {"x": 2, "y": 2}}, moves)
+        self.assertNotIn({"move_to": {"x": 1, "y": 1}}, moves)
+
+    def test_unknown_moves_go_last(self):
+        moves = MoveBuilder()
+        moves.append("wave")
+        moves.append("attack")
+        moves.append("wave")
+        self.assertEqual(moves.emit(), ["attack", "wave"])
+        self.assertIn("wave", moves)
+
+    def test_dedupe_moves_handles_dicts(self):
+        moves = [{"use": "ring"}, "attack", {"use": "ring"}, {"use": "big_potion"}]
+        self.assertEqual(
+            dedupe_moves(moves), [{"use": "ring"}, "attack", {"use": "big_potion"}]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+
+from opponents import PRIOR_BONUS, OpponentStore
+
+
+def player(id, health=100, potions=2, distance=100000, special=""):
+    return {
+        "id": id,
+        "health": health,
+        "distance": distance,
+        "special_equipped": special,
+        "items": {"big_potions": [1] * potions},
+    }
+
+
+class TestOpponentStore(unittest.TestCase):
+    def test_unknown_player_uses_prior(self):
+        store = OpponentStore()
+        self.assertEqual(store.health_bonus({"id": "p1"}), PRIOR_BONUS)
+        self.assertEqual(store.aggression("p1"), 0.5)
+
+    def test_learns_heal_per_potion(self):
+        store = OpponentStore()
+        store.observe([player("p1", health=20, potions=3)])
+        for _ in range(5):
+            store.observe([player("p1", health=60, potions=2)])
+            store.observe([player("p1", health=20, potions=3)])
+        # Five potions each healed 40; the prior of 100 fades
+        self.assertLess(store.heal_per_potion("p1"), 70)
+        self.assertGreater(store.heal_per_potion("p1"), 40)
+        self.assertAlmostEqual(
+            store.health_bonus({"id": "p1"}), 3 * store.heal_per_potion("p1")
+        )
+
+    def test_hidden_items_fall_back_to_prior(self):
+        store = OpponentStore()
+        store.observe([{"id": "p1", "health": 100, "distance": 5}])
+        self.assertEqual(store.health_bonus({"id": "p1"}), PRIOR_BONUS)
+
+    def test_aggression_and_specials(self):
+        store = OpponentStore()
+        for distance in (90000, 80000, 70000, 75000):
+            store.observe([player("p1", distance=distance, special="bomb")])
+        self.assertAlmostEqual(store.aggression("p1"), 2 / 3)
+        odds = store.special_odds("p1")
+        self.assertGreater(odds["bomb"], 0.5)
+        self.assertAlmostEqual(sum(odds.values()), 1)
+
+    def test_lru_eviction_keeps_memory_flat(self):
+        store = OpponentStore(capacity=4)
+        for i in range(10):
+            store.observe([player(f"p{i}")])
+            store.observe([player("p0")])
+        self.assertEqual(len(store), 4)
+        self.assertIn("p0", store)
+        self.assertNotIn("p1", store)
+        self.assertEqual(store.evictions, 6)
+        self.assertEqual(store.health.shape, (4,))
+
+    def test_evicted_slot_starts_fresh(self):
+        store = OpponentStore(capacity=1)
+        store.observe([player("p1", potions=3)])
+        store.observe([player("p1", potions=1)])
+        store.observe([player("p2", potions=2)])
+        self.assertEqual(store.potions_used[store.slots["p2"]], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import json
+import pickle
+import unittest
+
+from params import DEFAULTS, Params
+
+
+class TestParams(unittest.TestCase):
+    def test_defaults(self):
+        params = Params()
+        self.assertEqual(params.best_item_exponent, 0.7)
+        self.assertEqual(params.level_vals[20], 1184)
+
+    def test_overrides_and_unknown_names(self):
+        self.assertEqual(Params(bomb_distance=1).bomb_distance, 1)
+        with self.assertRaises(KeyError):
+            Params(not_a_param=1)
+
+    def test_read_only(self):
+        with self.assertRaises(AttributeError):
+            Params().bomb_distance = 1
+
+    def test_replace_leaves_original(self):
+        params = Params()
+        changed = params.replace(steering_exponent=0.5)
+        self.assertEqual(params.steering_exponent, 0.6)
+        self.assertEqual(changed.steering_exponent, 0.5)
+
+    def test_defaults_are_not_shared(self):
+        Params().as_dict()["potion_values"][0] = 0
+        self.assertEqual(DEFAULTS["potion_values"][0], 1548)
+
+    def test_digest_identifies_values(self):
+        self.assertEqual(Params().digest(), Params().digest())
+        self.assertNotEqual(Params().digest(), Params(bomb_distance=1).digest())
+
+    def test_name_keyed_tables_keep_their_keys(self):
+        params = Params(avoid_radii={"wolf": 1})
+        self.assertEqual(params.avoid_radii["wolf"], 1)
+
+    def test_partial_tables_keep_the_other_defaults(self):
+        params = Params(entity_caps={"items": 10}, potion_values={"0": 1000})
+        self.assertEqual(params.entity_caps["items"], 10)
+        self.assertEqual(params.entity_caps["enemies"], 150)
+        self.assertEqual(params.potion_values[0], 1000)
+        self.assertEqual(params.potion_values[1], 524)
+        self.assertEqual(Params().entity_caps["items"], 300)
+
+    def test_values_must_be_usable(self):
+        for overrides in [
+            {"neighbour_radius": 0},
+            {"best_item_exponent": -0.5},
+            {"entity_caps": {"items": 0}},
+            {"avoid_radii": {"wolf": -1}},
+            {"filters": ["dead", "no_such_filter"]},
+        ]:
+            with self.assertRaises(ValueError, msg=overrides):
+                Params(**overrides)
+
+    def test_values_must_match_their_defaults(self):
+        self.assertEqual(Params(threat_radius=1.5).threat_radius, 1.5)
+        for overrides in [
+            {"threat_radius": "abc"},
+            {"threat_radius": True},
+            {"effort_lut": 1},
+            {"potion_values": 5},
+            {"potion_values": {0: "x"}},
+            {"avoid_radii": {1: 100}},
+            {"filters": "dead"},
+        ]:
+            with self.assertRaises(TypeError, msg=overrides):
+                Params(**overrides)
+
+    def test_derived_tables_are_computed_once(self):
+        params = Params()
+        calls = []
+
+        def build(p):
+            calls.append(p)
+            return p.bomb_distance * 2
+
+        self.assertEqual(params.derived("double", build), 260000)
+        self.assertEqual(params.derived("double", build), 260000)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(params.replace(bomb_distance=1).derived("double", build), 2)
+
+    def test_json_round_trip(self):
+        """Tables keyed by int come back from JSON with str keys."""
+        params = Params(
+            potion_values={str(k): v for k, v in DEFAULTS["potion_values"].items()}
+        )
+        self.assertEqual(params, Params())
+        self.assertEqual(Params(**json.loads(json.dumps(Params().as_dict()))), Params())
+
+    def test_pickle(self):
+        self.assertEqual(
+            pickle.loads(pickle.dumps(Params(bomb_distance=5))).bomb_distance, 5
+        )
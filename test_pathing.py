@@ -0,0 +1,75 @@
+import unittest
+
+from pathing import PathPlanner
+
+
+def wall(x, y_from, y_to, cell_size=100):
+    # A vertical wall of obstacle points, one per cell
+    return [{"x": x, "y": y} for y in range(y_from, y_to + cell_size, cell_size)]
+
+
+class TestPathPlanner(unittest.TestCase):
+    def setUp(self):
+        self.planner = PathPlanner(cell_size=100)
+
+    def test_open_field_goes_straight_to_goal(self):
+        """Without obstacles the only waypoint is the goal itself."""
+        self.planner.update_map([])
+        goal = {"x": 950, "y": 50}
+        waypoints = self.planner.waypoints({"x": 50, "y": 50}, goal)
+        self.assertEqual(waypoints, [goal])
+
+    def test_same_cell_returns_goal(self):
+        goal = {"x": 60, "y": 60}
+        self.assertEqual(self.planner.next_waypoint({"x": 50, "y": 50}, goal), goal)
+
+    def test_detours_around_wall(self):
+        """A wall between start and goal forces an intermediate waypoint."""
+        self.planner.update_map(wall(550, -450, 450))
+        goal = {"x": 950, "y": 50}
+        waypoints = self.planner.waypoints({"x": 50, "y": 50}, goal)
+        self.assertGreater(len(waypoints), 1)
+        self.assertEqual(waypoints[-1], goal)
+        for waypoint in waypoints[:-1]:
+            self.assertNotIn(self.planner.cell(waypoint), self.planner.blocked)
+
+    def test_repeat_query_hits_cache(self):
+        self.planner.update_map(wall(550, -450, 450))
+        self.planner.waypoints({"x": 50, "y": 50}, {"x": 950, "y": 50})
+        self.planner.waypoints({"x": 60, "y": 40}, {"x": 940, "y": 60})
+        self.assertEqual(self.planner.misses, 1)
+        self.assertEqual(self.planner.hits, 1)
+
+    def test_unchanged_map_keeps_cache(self):
+        obstacles = wall(550, -450, 450)
+        self.planner.update_map(obstacles)
+        self.planner.waypoints({"x": 50, "y": 50}, {"x": 950, "y": 50})
+        self.assertFalse(self.planner.update_map(list(obstacles)))
+        self.assertEqual(len(self.planner.cache), 1)
+
+    def test_map_change_invalidates_cache(self):
+        self.planner.update_map(wall(550, -450, 450))
+        self.planner.waypoints({"x": 50, "y": 50}, {"x": 950, "y": 50})
+        self.assertTrue(self.planner.update_map([]))
+        self.assertEqual(len(self.planner.cache), 0)
+
+    def test_lru_eviction(self):
+        planner = PathPlanner(cell_size=100, cache_size=2)
+        planner.waypoints({"x": 0, "y": 0}, {"x": 500, "y": 0})
+        planner.waypoints({"x": 0, "y": 0}, {"x": 600, "y": 0})
+        planner.waypoints({"x": 0, "y": 0}, {"x": 500, "y": 0})
+        planner.waypoints({"x": 0, "y": 0}, {"x": 700, "y": 0})
+        self.assertEqual(list(planner.cache), [((0, 0), (5, 0)), ((0, 0), (7, 0))])
+
+    def test_unreachable_goal_falls_back_to_goal(self):
+        """An enclosed goal yields a direct move rather than no move."""
+        obstacles = [
+            {"x": 1000 + dx * 100, "y": dy * 100}
+            for dx in (-1, 0, 1)
+            for dy in (-1, 0, 1)
+            if dx or dy
+        ]
+        planner = PathPlanner(cell_size=100, margin=3)
+        planner.update_map(obstacles)
+        goal = {"x": 1050, "y": 50}
+        self.assertEqual(planner.next_waypoint({"x": 50, "y": 50}, goal), goal)
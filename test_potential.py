@@ -0,0 +1,47 @@
+import unittest
+
+import numpy as np
+
+from potential import PotentialField
+
+
+def threat(x, y, damage=10):
+    return {"position": {"x": x, "y": y}, "attack_damage": damage}
+
+
+class TestPotentialField(unittest.TestCase):
+    def test_runs_straight_away_from_one_threat(self):
+        field = PotentialField([threat(100, 0)], {"x": 0, "y": 0})
+        position = field.downhill({"x": 0, "y": 0})
+        self.assertAlmostEqual(position["x"], -200)
+        self.assertAlmostEqual(position["y"], 0)
+
+    def test_heavier_threat_dominates(self):
+        threats = [threat(100, 0, damage=10), threat(0, 100, damage=100)]
+        field = PotentialField(threats, {"x": 0, "y": 0})
+        position = field.downhill({"x": 0, "y": 0})
+        self.assertLess(position["y"], -150)
+        self.assertLess(position["x"], 0)
+
+    def test_potential_peaks_at_threat(self):
+        field = PotentialField([threat(100, 50, damage=30)], {"x": 0, "y": 0})
+        self.assertAlmostEqual(field.value({"x": 100, "y": 50}), 30)
+        peak = np.unravel_index(field.potential.argmax(), field.potential.shape)
+        self.assertEqual(peak, field.index({"x": 100, "y": 50}))
+
+    def test_matches_numeric_gradient(self):
+        threats = [threat(120, -30, 20), threat(-60, 80, 45)]
+        field = PotentialField(threats, {"x": 0, "y": 0})
+        numeric = np.gradient(field.potential, field.cell_size)
+        i, j = field.index({"x": 0, "y": 0})
+        analytic = field.gradient[i, j]
+        self.assertAlmostEqual(numeric[0][i, j], analytic[0], delta=0.02)
+        self.assertAlmostEqual(numeric[1][i, j], analytic[1], delta=0.02)
+
+    def test_no_threats_stays_put(self):
+        field = PotentialField([], {"x": 5, "y": 5})
+        self.assertEqual(field.downhill({"x": 5, "y": 5}), {"x": 5, "y": 5})
+
+
+if __name__ == "__main__":
+    unittest.main()
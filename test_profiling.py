@@ -0,0 +1,75 @@
+import marshal
+import time
+import unittest
+
+from profiling import Profiler, ProfileSession
+
+
+def busy(seconds=0.02):
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += 1
+    return total
+
+
+def allocate():
+    return [bytearray(1000) for _ in range(200)]
+
+
+class TestProfiler(unittest.TestCase):
+    def test_idle_profiler_just_calls(self):
+        profiler = Profiler()
+        self.assertEqual(profiler.call(sum, [1, 2]), 3)
+
+    def test_cprofile_next_calls(self):
+        profiler = Profiler()
+        session = profiler.start(calls=2)
+        profiler.call(busy, 0.001)
+        self.assertFalse(session.done)
+        profiler.call(busy, 0.001)
+        self.assertTrue(session.done)
+        self.assertEqual(session.status()["remaining"], 0)
+        # Later calls are not profiled
+        profiler.call(allocate)
+        self.assertIn("busy", session.pstats_text())
+        self.assertNotIn("allocate", session.pstats_text())
+        self.assertTrue(
+            any(f[2] == "busy" for f in marshal.loads(session.pstats_dump()))
+        )
+        self.assertIn("busy (test_profiling.py", session.collapsed())
+
+    def test_sampled_stacks(self):
+        profiler = Profiler()
+        session = profiler.start(calls=3, mode="sample")
+        for _ in range(3):
+            profiler.call(busy)
+        self.assertTrue(session.done)
+        stacks = session.collapsed().splitlines()
+        self.assertTrue(stacks)
+        self.assertTrue(all(";busy (test_profiling.py" in line for line in stacks))
+
+    def test_memory_diff(self):
+        profiler = Profiler()
+        session = profiler.start(calls=1, memory=True)
+        kept = profiler.call(allocate)
+        self.assertTrue(
+            any("test_profiling.py" in line for line in session.allocations)
+        )
+        self.assertEqual(len(kept), 200)
+
+    def test_one_session_at_a_time(self):
+        profiler = Profiler()
+        profiler.start(calls=1)
+        with self.assertRaises(RuntimeError):
+            profiler.start(calls=1)
+        profiler.call(busy, 0)
+        profiler.start(calls=1)
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            ProfileSession(mode="perf")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+
+from routing import RoutePlanner
+
+
+def player(speed=0):
+    return {
+        "position": {"x": 0, "y": 0},
+        "levelling": {"speed": speed},
+        "attack_damage": 10,
+    }
+
+
+def stop(id, x, y, xp, **extra):
+    own = {"x": 0, "y": 0}
+    item = {
+        "id": id,
+        "type": "coin",
+        "position": {"x": x, "y": y},
+        "xp": xp,
+        "distance": (x - own["x"]) ** 2 + (y - own["y"]) ** 2,
+    }
+    item.update(extra)
+    return item
+
+
+class TestRoutePlanner(unittest.TestCase):
+    def test_no_candidates(self):
+        planner = RoutePlanner()
+        self.assertEqual(planner.plan(player(), []), {})
+        self.assertEqual(planner.route, [])
+
+    def test_chains_clustered_coins(self):
+        """A line of coins is worth walking as a single tour."""
+        coins = [stop(f"c{i}", 100 * i, 0, 250) for i in range(1, 5)]
+        planner = RoutePlanner()
+        head = planner.plan(player(), coins)
+        self.assertEqual(head["id"], "c1")
+        self.assertEqual(planner.route, [("coin", f"c{i}") for i in range(1, 5)])
+
+    def test_greedy_fallback_matches_exact_on_small_input(self):
+        coins = [stop(f"c{i}", 100 * i, 0, 250) for i in range(1, 5)]
+        exact = RoutePlanner()
+        greedy = RoutePlanner(exact_limit=0)
+        exact.plan(player(), coins)
+        greedy.plan(player(), coins)
+        self.assertEqual(exact.route, greedy.route)
+
+    def test_zero_budget_falls_back_to_greedy(self):
+        coins = [stop(f"c{i}", 100 * i, 0, 250) for i in range(1, 5)]
+        planner = RoutePlanner(time_budget=0)
+        self.assertEqual(planner.plan(player(), coins)["id"], "c1")
+
+    def test_route_persists_and_is_repaired(self):
+        coins = [stop(f"c{i}", 100 * i, 0, 250) for i in range(1, 5)]
+        planner = RoutePlanner()
+        planner.plan(player(), coins)
+        # The first coin was collected; the rest of the tour is kept
+        head = planner.plan(player(), coins[1:])
+        self.assertEqual(head["id"], "c2")
+        self.assertEqual(planner.full_solves, 1)
+        self.assertEqual(planner.repairs, 1)
+
+    def test_repair_inserts_new_candidate(self):
+        coins = [stop(f"c{i}", 100 * i, 0, 250) for i in range(2, 5)]
+        planner = RoutePlanner()
+        planner.plan(player(), coins)
+        head = planner.plan(player(), coins + [stop("new", 100, 0, 250)])
+        self.assertEqual(head["id"], "new")
+        self.assertIn(("coin", "new"), planner.route)
+
+    def test_values_override_own_ranking(self):
+        chest = stop("chest", 100, 0, 1500)
+        coin = stop("coin", 1500, 0, 250)
+        planner = RoutePlanner(top_k=1)
+        self.assertEqual(planner.plan(player(), [chest, coin])["id"], "chest")
+        planner = RoutePlanner(top_k=1)
+        head = planner.plan(player(), [chest, coin], values=[10, 90])
+        self.assertEqual(head["id"], "coin")
+
+    def test_plan_takes_the_current_exponent(self):
+        planner = RoutePlanner(exponent=0.7)
+        planner.plan(player(), [stop("c1", 100, 0, 250)], exponent=0.5)
+        self.assertEqual(planner.exponent, 0.5)
+
+    def test_worthless_candidates_are_ignored(self):
+        planner = RoutePlanner()
+        self.assertEqual(planner.plan(player(), [stop("chest", 100, 0, 0)]), {})
+
+    def test_stops_are_keyed_by_type_and_id(self):
+        coin = stop(1, 100, 0, 250)
+        wolf = stop(1, 200, 0, 250, type="wolf")
+        planner = RoutePlanner()
+        planner.plan(player(), [coin, wolf])
+        self.assertEqual(planner.route, [("coin", 1), ("wolf", 1)])
+        # The coin was collected; the wolf with the same id stays on the tour
+        head = planner.plan(player(), [wolf])
+        self.assertEqual(head["type"], "wolf")
+        self.assertEqual(planner.repairs, 1)
+
+    def test_tour_is_rated_by_values(self):
+        """A far stop the scorer values highly, say for its neighbours, is
+        worth the detour even though its own xp isn't."""
+        coins = [stop("near", 100, 0, 250), stop("far", 2000, 0, 250)]
+        planner = RoutePlanner()
+        planner.plan(player(), coins)
+        self.assertEqual(planner.route, [("coin", "near")])
+        planner = RoutePlanner()
+        planner.plan(player(), coins, values=[100, 5000])
+        self.assertIn(("coin", "far"), planner.route)
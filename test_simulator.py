@@ -0,0 +1,78 @@
+import tempfile
+import unittest
+
+import main
+from simulator import BOMB_DAMAGE, BOMB_FUSE, World, run_episode, run_episodes
+
+STATS = ["xp", "kills", "deaths", "pickups", "damage_taken", "errors"]
+
+
+class TestWorld(unittest.TestCase):
+    def test_level_data_matches_server_shape(self):
+        world = World(seed=1)
+        level_data = main.LevelData(**world.level_data(world.me, ticks=100))
+        self.assertEqual(level_data.own_player["id"], world.me["id"])
+        self.assertNotIn("timers", level_data.own_player)
+        self.assertEqual(len(level_data.enemies), 12)
+
+    def test_bomb_explodes_after_fuse(self):
+        world = World(seed=1, n_players=0, n_enemies=0)
+        world.me["special_equipped"] = "bomb"
+        world.apply_moves(world.me, ["special"])
+        self.assertEqual(world.hazards[0]["type"], "bomb")
+        for _ in range(BOMB_FUSE):
+            world.tick += 1
+            world._update_hazards()
+        self.assertEqual(world.hazards, [])
+        self.assertEqual(world.stats["damage_taken"], BOMB_DAMAGE)
+
+    def test_shield_blocks_damage(self):
+        world = World(seed=1, n_players=0, n_enemies=0)
+        world.apply_moves(world.me, ["shield"])
+        world._damage(world.me, 50)
+        self.assertEqual(world.me["health"], 100)
+
+    def test_icicle_freezes_target(self):
+        world = World(seed=1, n_players=0, n_enemies=1)
+        enemy = world.enemies[0]
+        enemy["position"] = {
+            "x": world.me["position"]["x"] + 100,
+            "y": world.me["position"]["y"],
+        }
+        world.me["special_equipped"] = "freeze"
+        world.apply_moves(world.me, ["special"])
+        world.tick += 1
+        world._update_hazards()
+        self.assertTrue(world._active(enemy, "frozen"))
+
+    def test_pickups_respect_stock_limits(self):
+        world = World(seed=1, n_players=0, n_enemies=0)
+        world.me["items"]["big_potions"] = [1] * 6
+        potion = {
+            "id": "x",
+            "type": "big_potion",
+            "position": dict(world.me["position"]),
+        }
+        world.items = [potion]
+        world._pickups(world.me)
+        self.assertEqual(world.items, [potion])
+
+
+class TestEpisodes(unittest.TestCase):
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+
+    def test_episodes_are_deterministic(self):
+        first = run_episode(3, ticks=40, log_dir=self.log_dir)
+        second = run_episode(3, ticks=40, log_dir=self.log_dir)
+        self.assertEqual([first[k] for k in STATS], [second[k] for k in STATS])
+
+    def test_bot_state_is_released(self):
+        run_episode(4, ticks=5, log_dir=self.log_dir)
+        self.assertFalse(any(key.startswith("p4-") for key in main.TRACKERS))
+
+    def test_pool_matches_serial_run(self):
+        serial = run_episodes([5, 6], processes=1, ticks=20, log_dir=self.log_dir)
+        pooled = run_episodes([5, 6], processes=2, ticks=20, log_dir=self.log_dir)
+        for a, b in zip(serial, pooled):
+            self.assertEqual([a[k] for k in STATS], [b[k] for k in STATS])
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import staticmap
+from pathing import PathPlanner
+from staticmap import StaticMap, publish, static_map
+
+OBSTACLES = np.array([[150.0, 250.0], [-50.0, 30.0], [160.0, 260.0], [950.0, 0.0]])
+
+
+def names(paths):
+    return [os.path.basename(path) for path in paths]
+
+
+class TestStaticMap(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        staticmap.ATTACHED.clear()
+
+    def test_built_once_and_memory_mapped(self):
+        first = static_map(OBSTACLES, root=self.root)
+        self.assertIsInstance(first.xy, np.memmap)
+        self.assertEqual(first.xy.tolist(), OBSTACLES.tolist())
+        self.assertIs(static_map(OBSTACLES, root=self.root), first)
+        self.assertEqual(os.listdir(self.root), [os.path.basename(first.path)])
+
+    def test_another_process_attaches_without_rebuilding(self):
+        path = static_map(OBSTACLES, root=self.root).path
+        built = os.path.getmtime(os.path.join(path, "grid.npy"))
+        # As a fresh worker would
+        staticmap.ATTACHED.clear()
+        attached = static_map(OBSTACLES.copy(), root=self.root)
+        self.assertEqual(attached.path, path)
+        self.assertEqual(os.path.getmtime(os.path.join(path, "grid.npy")), built)
+        self.assertFalse(attached.xy.flags.writeable)
+
+    def test_evicts_least_recently_attached(self):
+        paths = [static_map(OBSTACLES + i, root=self.root).path for i in range(4)]
+        for i, path in enumerate(paths):
+            os.utime(path, (i, i))
+            if i < 3:
+                del staticmap.ATTACHED[path]
+        staticmap.evict(self.root, capacity=2)
+        self.assertEqual(sorted(os.listdir(self.root)), sorted(names(paths[2:])))
+        # Maps this process still holds are kept even over capacity
+        staticmap.evict(self.root, capacity=0)
+        self.assertEqual(os.listdir(self.root), names(paths[3:]))
+        self.assertEqual(len(static_map(OBSTACLES, root=self.root)), len(OBSTACLES))
+
+    def test_scratch_root_is_removed(self):
+        with staticmap.scratch_root() as root:
+            path = static_map(OBSTACLES).path
+            self.assertTrue(path.startswith(root))
+        self.assertFalse(os.path.exists(root))
+        self.assertNotIn(path, staticmap.ATTACHED)
+
+    def test_losing_a_publish_race(self):
+        path = static_map(OBSTACLES, root=self.root).path
+        publish(path, OBSTACLES[:1], 100)
+        self.assertEqual(len(StaticMap(path)), len(OBSTACLES))
+        self.assertEqual(os.listdir(self.root), [os.path.basename(path)])
+
+    def test_blocked_cells_match_the_planner(self):
+        planner = PathPlanner()
+        planner.update_map([{"x": x, "y": y} for x, y in OBSTACLES])
+        shared = static_map(OBSTACLES, planner.cell_size, root=self.root)
+        self.assertEqual(shared.blocked, planner.blocked)
+        self.assertFalse(planner.set_blocked(shared.blocked))
+
+    def test_different_obstacles_are_different_maps(self):
+        a = static_map(OBSTACLES, root=self.root)
+        b = static_map(OBSTACLES[:2], root=self.root)
+        self.assertNotEqual(a.path, b.path)
+        self.assertEqual(len(static_map(np.zeros((0, 2)), root=self.root)), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
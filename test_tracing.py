@@ -0,0 +1,60 @@
+import json
+import unittest
+
+from tracing import NULL_TRACE, Tracer
+
+
+def candidate(id, type="coin"):
+    return {"id": id, "type": type, "position": {"x": 0, "y": 0}}
+
+
+class TestTracer(unittest.TestCase):
+    def test_sampling_off_returns_null_trace(self):
+        tracer = Tracer(sample_rate=0)
+        trace = tracer.start("me")
+        self.assertIs(trace, NULL_TRACE)
+        self.assertFalse(trace)
+        self.assertIsNone(trace.scores)
+        trace.mark("score")
+        self.assertEqual(trace.done(["attack"]), ["attack"])
+        self.assertEqual(len(tracer.ring), 0)
+
+    def test_sampling_rate(self):
+        tracer = Tracer(sample_rate=0.25, seed=1)
+        sampled = sum(bool(tracer.start("me")) for _ in range(4000))
+        self.assertAlmostEqual(sampled / 4000, 0.25, delta=0.03)
+
+    def test_record(self):
+        tracer = Tracer(sample_rate=1)
+        trace = tracer.start("me")
+        trace.candidates = [candidate(str(i)) for i in range(7)]
+        trace.scores.extend((float(i), i) for i in range(7))
+        trace.target = {"id": "6", "type": "coin", "xp": 250, "distance": 10}
+        trace.danger = 30
+        trace.branch("attack")
+        trace.mark("score")
+        moves = ["attack"]
+        self.assertIs(trace.done(moves), moves)
+
+        record = tracer.drain()[0]
+        self.assertEqual(record["bot"], "me")
+        self.assertEqual(record["candidates"], 7)
+        self.assertEqual([s["id"] for s in record["top_scores"]], list("65432"))
+        self.assertEqual(record["target"], {"type": "coin", "id": "6", "xp": 250})
+        self.assertEqual(record["branches"], ["attack"])
+        self.assertEqual(set(record["timings_ms"]), {"score", "finish"})
+        self.assertEqual(record["moves"], ["attack"])
+
+    def test_ndjson_drains_in_batches(self):
+        tracer = Tracer(capacity=3, sample_rate=1)
+        for _ in range(5):
+            tracer.start("me").done([])
+        lines = tracer.ndjson(limit=2).splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(json.loads(lines[0])["bot"], "me")
+        self.assertEqual(len(tracer.ndjson().splitlines()), 1)
+        self.assertEqual(tracer.ndjson(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
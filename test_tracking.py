@@ -0,0 +1,92 @@
+import unittest
+
+import numpy as np
+
+from tracking import ThreatTracker, threat_distance, threat_position
+
+
+def wolf(id, x, y):
+    return {"id": id, "type": "wolf", "position": {"x": x, "y": y}}
+
+
+class TestThreatTracker(unittest.TestCase):
+    def test_first_sighting_predicts_current_position(self):
+        """With a single sample there is no velocity to project."""
+        tracker = ThreatTracker()
+        entity = wolf("w1", 100, 200)
+        tracker.update([entity])
+        self.assertEqual(entity["predicted_position"], {"x": 100, "y": 200})
+
+    def test_constant_velocity_is_projected(self):
+        tracker = ThreatTracker(lookahead=3)
+        for tick in range(5):
+            entity = wolf("w1", 100 + 10 * tick, 200 - 5 * tick)
+            tracker.update([entity])
+        self.assertAlmostEqual(entity["predicted_position"]["x"], 170)
+        self.assertAlmostEqual(entity["predicted_position"]["y"], 165)
+
+    def test_entities_are_tracked_independently(self):
+        tracker = ThreatTracker(lookahead=1)
+        for tick in range(3):
+            a = wolf("a", 10 * tick, 0)
+            b = wolf("b", 0, -20 * tick)
+            predicted = tracker.update([a, b])
+        np.testing.assert_allclose(predicted, [[30, 0], [0, -60]])
+
+    def test_predicted_distance_to_own_position(self):
+        tracker = ThreatTracker(lookahead=1)
+        for tick in range(2):
+            entity = wolf("w1", 100 - 50 * tick, 0)
+            tracker.update([entity], {"x": 0, "y": 0})
+        self.assertAlmostEqual(entity["predicted_distance"], 0)
+
+    def test_ring_only_keeps_recent_history(self):
+        """Old samples fall out of the ring, so a turn shows up quickly."""
+        tracker = ThreatTracker(history=3, lookahead=1)
+        for tick in range(10):
+            tracker.update([wolf("w1", 10 * tick, 0)])
+        for tick in range(3):
+            entity = wolf("w1", 90, 10 * (tick + 1))
+            tracker.update([entity])
+        self.assertAlmostEqual(entity["predicted_position"]["x"], 90)
+        self.assertAlmostEqual(entity["predicted_position"]["y"], 40)
+
+    def test_capacity_evicts_least_recently_seen(self):
+        tracker = ThreatTracker(capacity=2)
+        tracker.update([wolf("a", 0, 0), wolf("b", 0, 0)])
+        tracker.update([wolf("b", 0, 0)])
+        tracker.update([wolf("c", 0, 0)])
+        self.assertEqual(set(tracker.slots), {"b", "c"})
+
+    def test_over_capacity_tick_keeps_every_entity(self):
+        tracker = ThreatTracker(capacity=4, lookahead=1)
+        for t in range(3):
+            entities = [wolf(i, 10 * t, i) for i in range(6)]
+            tracker.update(entities)
+        self.assertEqual(len(tracker.slots), 6)
+        for entity in entities:
+            self.assertAlmostEqual(entity["predicted_position"]["x"], 30)
+
+    def test_entities_without_id_are_skipped(self):
+        tracker = ThreatTracker()
+        entity = {"position": {"x": 0, "y": 0}}
+        tracker.update([entity])
+        self.assertNotIn("predicted_position", entity)
+
+
+class TestThreatLookups(unittest.TestCase):
+    def test_falls_back_to_current_values(self):
+        threat = {"position": {"x": 1, "y": 2}, "distance": 5}
+        self.assertEqual(threat_position(threat, True), {"x": 1, "y": 2})
+        self.assertEqual(threat_distance(threat, True), 5)
+
+    def test_uses_prediction_when_requested(self):
+        threat = {
+            "position": {"x": 1, "y": 2},
+            "distance": 5,
+            "predicted_position": {"x": 3, "y": 4},
+            "predicted_distance": 25,
+        }
+        self.assertEqual(threat_position(threat, True), {"x": 3, "y": 4})
+        self.assertEqual(threat_position(threat, False), {"x": 1, "y": 2})
+        self.assertEqual(threat_distance(threat, True), 25)
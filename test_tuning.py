@@ -0,0 +1,86 @@
+import json
+import os
+import tempfile
+import unittest
+
+from simulator import World
+from tuning import cache_key, grid, sample, save_cache, search
+
+
+class TestCandidates(unittest.TestCase):
+    def test_grid(self):
+        space = {"bomb_distance": [1, 2], "best_item_exponent": [0.6, 0.7]}
+        self.assertEqual(len(grid(space)), 4)
+        self.assertIn({"bomb_distance": 2, "best_item_exponent": 0.6}, grid(space))
+
+    def test_sample_is_seeded(self):
+        space = {"bomb_distance": list(range(100))}
+        self.assertEqual(sample(space, 5, seed=1), sample(space, 5, seed=1))
+
+    def test_cache_key_depends_on_settings(self):
+        self.assertNotEqual(cache_key({}, {"ticks": 1}), cache_key({}, {"ticks": 2}))
+        self.assertEqual(
+            cache_key({}, {"ticks": 1}),
+            cache_key({"bomb_distance": 130000}, {"ticks": 1}),
+        )
+
+
+class TestSearch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = os.path.join(self.tmp.name, "cache.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_simulated_search_is_cached(self):
+        candidates = [{"bomb_distance": 100000}, {"bomb_distance": 160000}]
+        ranked = search(
+            candidates, seeds=[0], ticks=5, processes=2, cache_path=self.cache
+        )
+        self.assertEqual(len(ranked), 2)
+        with open(self.cache) as fp:
+            self.assertEqual(len(json.load(fp)), 2)
+
+        # A cached sweep must not start any work; no processes are allowed
+        again = search(
+            candidates, seeds=[0], ticks=5, processes=0, cache_path=self.cache
+        )
+        self.assertEqual(ranked, again)
+
+    def test_objective_direction(self):
+        settings = {"mode": "sim", "seeds": [0], "ticks": 5, "strategy": "play"}
+        candidates = [{"bomb_distance": 100000}, {"bomb_distance": 160000}]
+        summaries = [
+            {"xp_per_s": 1, "deaths": 0, "latency_ms_p99": 5},
+            {"xp_per_s": 2, "deaths": 3, "latency_ms_p99": 9},
+        ]
+        save_cache(
+            self.cache,
+            {
+                cache_key(overrides, settings): {
+                    "params": overrides,
+                    "summary": summary,
+                }
+                for overrides, summary in zip(candidates, summaries)
+            },
+        )
+        for objective, best in [("xp_per_s", 2), ("deaths", 0), ("latency_ms_p99", 5)]:
+            ranked = search(
+                candidates,
+                seeds=[0],
+                ticks=5,
+                processes=0,
+                cache_path=self.cache,
+                objective=objective,
+            )
+            self.assertEqual(ranked[0]["summary"][objective], best)
+
+    def test_replay_search(self):
+        world = World(seed=2)
+        path = os.path.join(self.tmp.name, "ticks.ndjson")
+        with open(path, "w") as fp:
+            for _ in range(3):
+                fp.write(json.dumps(world.level_data(world.me, ticks=100)) + "\n")
+        ranked = search([{}], replay_path=path, processes=1, cache_path=self.cache)
+        self.assertEqual(ranked[0]["summary"]["ticks"], 3)
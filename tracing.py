@@ -0,0 +1,128 @@
+"""Sampled per-tick decision traces, exported as newline-delimited JSON.
+
+`Tracer.start` decides once per tick whether to trace it. Unsampled ticks get
+`NULL_TRACE`, whose methods do nothing and which is falsy, so the hot path
+pays one random draw plus a few empty calls. Expensive values are computed
+under `if trace:`. A sampled tick collects the candidate count, the scores
+get_best_item computed, the chosen target, the danger at our position, the
+behavior tree nodes that fired and how long each stage took. When the tick
+finishes, the trace becomes one flat dict in a bounded ring. GET /trace
+drains the ring in batches.
+"""
+
+import heapq
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+
+TOP_SCORES = 5
+
+
+class TickTrace:
+    def __init__(self, tracer, bot_id):
+        self.tracer = tracer
+        self.bot_id = bot_id
+        self.time = time.time()
+        self.started = self.last = time.perf_counter()
+        self.timings = {}
+        self.scores = []
+        self.branches = []
+        self.candidates = []
+        self.target = None
+        self.danger = None
+
+    def __bool__(self):
+        return True
+
+    def mark(self, stage: str):
+        """Charge the time since the previous mark to `stage`."""
+        now = time.perf_counter()
+        self.timings[stage] = round((now - self.last) * 1000, 4)
+        self.last = now
+
+    def branch(self, name: str):
+        self.branches.append(name)
+
+    def done(self, moves: list) -> list:
+        self.mark("finish")
+        self.tracer.ring.append(self.record(moves))
+        return moves
+
+    def record(self, moves: list) -> dict:
+        top = []
+        for score, i in heapq.nlargest(TOP_SCORES, self.scores):
+            candidate = self.candidates[i]
+            top.append(
+                {"score": score, "type": candidate["type"], "id": candidate.get("id")}
+            )
+        target = None
+        if self.target:
+            target = {
+                "type": self.target.get("type"),
+                "id": self.target.get("id"),
+                "xp": self.target.get("xp"),
+            }
+        return {
+            "bot": self.bot_id,
+            "time": self.time,
+            "candidates": len(self.candidates),
+            "top_scores": top,
+            "target": target,
+            "danger": self.danger,
+            "branches": self.branches,
+            "timings_ms": self.timings,
+            "total_ms": round((self.last - self.started) * 1000, 4),
+            "moves": moves,
+        }
+
+
+class NullTrace:
+    scores = None
+    branches = None
+
+    def __bool__(self):
+        return False
+
+    def mark(self, stage):
+        pass
+
+    def branch(self, name):
+        pass
+
+    def done(self, moves):
+        return moves
+
+
+NULL_TRACE = NullTrace()
+
+
+class Tracer:
+    def __init__(self, capacity=4096, sample_rate=0.0, seed=None):
+        self.ring = deque(maxlen=capacity)
+        self.sample_rate = sample_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def start(self, bot_id):
+        if self.sample_rate <= 0 or self.random.random() >= self.sample_rate:
+            return NULL_TRACE
+        return TickTrace(self, bot_id)
+
+    def drain(self, limit=1000) -> list:
+        """Remove and return up to `limit` of the oldest traces."""
+        records = []
+        with self.lock:
+            while self.ring and len(records) < limit:
+                records.append(self.ring.popleft())
+        return records
+
+    def ndjson(self, limit=1000) -> str:
+        lines = [json.dumps(record, default=float) for record in self.drain(limit)]
+        return "".join(line + "\n" for line in lines)
+
+
+def from_env() -> Tracer:
+    return Tracer(sample_rate=float(os.environ.get("TRACE_SAMPLE_RATE", 0)))
@@ -0,0 +1,134 @@
+import numpy as np
+
+
+class ThreatTracker:
+    """Fixed-size ring buffers of entity positions keyed by entity id.
+
+    Every tick `update` writes the new positions, fits a least-squares velocity
+    over each entity's history and projects it `lookahead` ticks ahead, all in
+    one vectorized pass. The projection is attached to the entity dicts as
+    "predicted_position" / "predicted_distance" so the danger checks can read
+    it like any other field.
+
+    Slots go to the least recently seen entities once `capacity` is reached,
+    but never to one already seen this tick; if every slot is taken this
+    tick, the buffers grow instead.
+    """
+
+    def __init__(self, capacity=256, history=8, lookahead=3):
+        self.capacity = capacity
+        self.history = history
+        self.lookahead = lookahead
+        self.positions = np.zeros((capacity, history, 2))
+        self.ticks = np.zeros((capacity, history))
+        self.heads = np.zeros(capacity, dtype=int)
+        self.counts = np.zeros(capacity, dtype=int)
+        self.last_seen = np.zeros(capacity, dtype=int)
+        self.slots = {}
+        self.free = list(range(capacity - 1, -1, -1))
+        self.tick = 0
+
+    def update(self, entities: list, own_position: dict = None) -> np.ndarray:
+        self.tick += 1
+        tracked = [entity for entity in entities if entity.get("id") is not None]
+        if not tracked:
+            return np.zeros((0, 2))
+
+        # Ids can repeat across categories within a tick; last write wins
+        slots = np.array([self._slot(entity["id"]) for entity in tracked])
+        xy = np.array(
+            [[entity["position"]["x"], entity["position"]["y"]] for entity in tracked],
+            dtype=float,
+        )
+        heads = self.heads[slots]
+        self.positions[slots, heads] = xy
+        self.ticks[slots, heads] = self.tick
+        self.heads[slots] = (heads + 1) % self.history
+        self.counts[slots] = np.minimum(self.counts[slots] + 1, self.history)
+        self.last_seen[slots] = self.tick
+
+        predicted = xy + self.velocity(slots) * self.lookahead
+        if own_position is not None:
+            own = np.array([own_position["x"], own_position["y"]], dtype=float)
+            distances = ((predicted - own) ** 2).sum(axis=1)
+        for i, entity in enumerate(tracked):
+            entity["predicted_position"] = {
+                "x": float(predicted[i, 0]),
+                "y": float(predicted[i, 1]),
+            }
+            if own_position is not None:
+                entity["predicted_distance"] = float(distances[i])
+        return predicted
+
+    def velocity(self, slots: np.ndarray) -> np.ndarray:
+        """Per-tick velocity for each slot from a least-squares fit."""
+        ticks = self.ticks[slots]
+        positions = self.positions[slots]
+        valid = np.arange(self.history) < self.counts[slots][:, None]
+        valid &= ticks > self.tick - self.history
+
+        n = valid.sum(axis=1)
+        safe_n = np.maximum(n, 1)
+        t_mean = (ticks * valid).sum(axis=1) / safe_n
+        dt = (ticks - t_mean[:, None]) * valid
+        p_mean = (positions * valid[..., None]).sum(axis=1) / safe_n[:, None]
+        dp = (positions - p_mean[:, None, :]) * valid[..., None]
+
+        denominator = (dt**2).sum(axis=1)
+        numerator = (dt[..., None] * dp).sum(axis=1)
+        velocity = np.zeros((len(slots), 2))
+        moving = (n > 1) & (denominator > 0)
+        velocity[moving] = numerator[moving] / denominator[moving, None]
+        return velocity
+
+    def _slot(self, entity_id) -> int:
+        slot = self.slots.get(entity_id)
+        if slot is not None:
+            return slot
+        if not self.free:
+            self._evict()
+        slot = self.free.pop()
+        self.slots[entity_id] = slot
+        self.heads[slot] = 0
+        self.counts[slot] = 0
+        self.last_seen[slot] = self.tick
+        return slot
+
+    def _evict(self):
+        stale = [
+            entity_id
+            for entity_id, slot in self.slots.items()
+            if self.last_seen[slot] < self.tick - self.history
+        ]
+        if not stale:
+            # Everyone is fresh; drop the least recently seen entity
+            entity_id = min(self.slots, key=lambda i: self.last_seen[self.slots[i]])
+            if self.last_seen[self.slots[entity_id]] == self.tick:
+                self._grow()
+                return
+            stale = [entity_id]
+        for entity_id in stale:
+            self.free.append(self.slots.pop(entity_id))
+
+    def _grow(self):
+        """Double the buffers; every tracked entity keeps its slot."""
+        extra = self.capacity
+        self.positions = np.concatenate([self.positions, np.zeros_like(self.positions)])
+        self.ticks = np.concatenate([self.ticks, np.zeros_like(self.ticks)])
+        self.heads = np.concatenate([self.heads, np.zeros_like(self.heads)])
+        self.counts = np.concatenate([self.counts, np.zeros_like(self.counts)])
+        self.last_seen = np.concatenate([self.last_seen, np.zeros_like(self.last_seen)])
+        self.free = list(range(self.capacity + extra - 1, self.capacity - 1, -1))
+        self.capacity += extra
+
+
+def threat_position(threat: dict, predicted: bool) -> dict:
+    if predicted:
+        return threat.get("predicted_position", threat["position"])
+    return threat["position"]
+
+
+def threat_distance(threat: dict, predicted: bool) -> float:
+    if predicted:
+        return threat.get("predicted_distance", threat["distance"])
+    return threat["distance"]
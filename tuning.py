@@ -0,0 +1,215 @@
+"""Parallel search over the bot's tunable constants.
+
+Every candidate parameter set is evaluated either in the local simulator
+(outcome metrics such as XP/s and deaths) or by replaying recorded ticks
+(decision latency only, since a replay has no outcome). Results are cached by
+parameter hash plus evaluation settings, so re-running a sweep only evaluates
+what is new:
+
+> python tuning.py space.json --episodes 20 --processes 8
+> python tuning.py space.json --replay ticks.ndjson
+
+space.json maps parameter names to lists of values to try, e.g.
+{"best_item_exponent": [0.6, 0.7, 0.8], "bomb_distance": [100000, 130000]}
+"""
+
+import argparse
+import copy
+import hashlib
+import itertools
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import main
+import simulator
+from params import Params
+from staticmap import scratch_root
+
+CACHE_PATH = os.path.join(os.path.dirname(__file__), "tuning_cache.json")
+
+# Objectives ranked ascending; every latency_* metric is also lower-is-better
+LOWER_IS_BETTER = {"deaths", "errors", "damage_taken"}
+
+
+def grid(space: dict) -> list:
+    names = sorted(space)
+    return [
+        dict(zip(names, values))
+        for values in itertools.product(*(space[n] for n in names))
+    ]
+
+
+def sample(space: dict, n: int, seed=0) -> list:
+    rng = random.Random(seed)
+    names = sorted(space)
+    return [{name: rng.choice(space[name]) for name in names} for _ in range(n)]
+
+
+def load_ticks(path: str) -> list:
+    """Recorded LevelData payloads, one JSON object per line."""
+    with open(path) as fp:
+        return [json.loads(line) for line in fp if line.strip()]
+
+
+def replay(overrides: dict, ticks: list, strategy="play") -> dict:
+    main.PARAMS = Params(**overrides)
+    bot = getattr(main, strategy)
+    latencies = []
+    errors = 0
+    with scratch_root():
+        for tick in ticks:
+            level_data = main.LevelData(**copy.deepcopy(tick))
+            start = time.perf_counter()
+            try:
+                bot(level_data)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies)
+    return {
+        "ticks": len(ticks),
+        "errors": errors,
+        "latency_ms_mean": float(latencies.mean() * 1000) if len(ticks) else 0.0,
+        "latency_ms_p99": (
+            float(np.percentile(latencies, 99) * 1000) if len(ticks) else 0.0
+        ),
+    }
+
+
+def _evaluate(job: dict) -> tuple:
+    if job["mode"] == "replay":
+        result = replay(job["params"], load_ticks(job["replay"]), job["strategy"])
+    else:
+        result = simulator.run_episode(
+            job["seed"],
+            ticks=job["ticks"],
+            strategy=job["strategy"],
+            log_dir=job["log_dir"],
+            params=job["params"],
+        )
+    return job["key"], result
+
+
+def cache_key(overrides: dict, settings: dict) -> str:
+    encoded = json.dumps(settings, sort_keys=True).encode()
+    return Params(**overrides).digest() + "-" + hashlib.sha1(encoded).hexdigest()[:12]
+
+
+def load_cache(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as fp:
+        return json.load(fp)
+
+
+def save_cache(path: str, cache: dict):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as fp:
+        json.dump(cache, fp, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def search(
+    candidates: list,
+    seeds=range(20),
+    ticks=600,
+    replay_path=None,
+    strategy="play",
+    processes=None,
+    cache_path=CACHE_PATH,
+    objective="xp_per_s",
+) -> list:
+    """Evaluate every candidate and return them best first.
+
+    With `replay_path` the objective is always lower mean latency.
+    """
+    if replay_path:
+        stat = os.stat(replay_path)
+        settings = {
+            "mode": "replay",
+            "replay": os.path.abspath(replay_path),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "strategy": strategy,
+        }
+        objective = "latency_ms_mean"
+    else:
+        settings = {
+            "mode": "sim",
+            "seeds": list(seeds),
+            "ticks": ticks,
+            "strategy": strategy,
+        }
+
+    cache = load_cache(cache_path)
+    keys = [cache_key(overrides, settings) for overrides in candidates]
+    todo = {
+        key: overrides for key, overrides in zip(keys, candidates) if key not in cache
+    }
+
+    jobs = []
+    log_dir = os.path.join("/tmp", "bot-tuning")
+    for key, overrides in todo.items():
+        job = {
+            "key": key,
+            "params": overrides,
+            "strategy": strategy,
+            "mode": settings["mode"],
+        }
+        if replay_path:
+            jobs.append(dict(job, replay=replay_path))
+        else:
+            for seed in settings["seeds"]:
+                jobs.append(dict(job, seed=seed, ticks=ticks, log_dir=log_dir))
+
+    if jobs:
+        os.makedirs(log_dir, exist_ok=True)
+        results = {}
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            for key, result in pool.map(_evaluate, jobs):
+                results.setdefault(key, []).append(result)
+        for key, runs in results.items():
+            if replay_path:
+                cache[key] = {"params": todo[key], "summary": runs[0]}
+            else:
+                cache[key] = {"params": todo[key], "summary": simulator.summarize(runs)}
+        save_cache(cache_path, cache)
+
+    ranked = [cache[key] for key in keys]
+    reverse = not (objective in LOWER_IS_BETTER or objective.startswith("latency_"))
+    return sorted(ranked, key=lambda r: r["summary"][objective], reverse=reverse)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("space", help="JSON file of parameter name -> values")
+    parser.add_argument("--samples", type=int, help="random sets instead of a grid")
+    parser.add_argument("--episodes", type=int, default=20)
+    parser.add_argument("--ticks", type=int, default=600)
+    parser.add_argument("--replay", help="NDJSON file of recorded ticks")
+    parser.add_argument("--strategy", default="play")
+    parser.add_argument("--processes", type=int)
+    parser.add_argument("--cache", default=CACHE_PATH)
+    parser.add_argument("--objective", default="xp_per_s")
+    args = parser.parse_args()
+
+    with open(args.space) as fp:
+        space = json.load(fp)
+    candidates = sample(space, args.samples) if args.samples else grid(space)
+    ranked = search(
+        candidates,
+        seeds=range(args.episodes),
+        ticks=args.ticks,
+        replay_path=args.replay,
+        strategy=args.strategy,
+        processes=args.processes,
+        cache_path=args.cache,
+        objective=args.objective,
+    )
+    for result in ranked[:10]:
+        print(json.dumps(result["summary"]), json.dumps(result["params"]))